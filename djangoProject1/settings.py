@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 from pathlib import Path
 import os
 
+import django
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "faculty.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -55,7 +58,8 @@ ROOT_URLCONF = "djangoProject1.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates reporting render time to faculty.metrics
+        "BACKEND": "djangoProject1.templating.TimedDjangoTemplates",
         "DIRS": [BASE_DIR / 'templates']
         ,
         "APP_DIRS": True,
@@ -72,16 +76,126 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "djangoProject1.wsgi.application"
 
+# Serve the read-heavy faculty views from faculty.async_views; asgi.py turns this on.
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "") == "1"
+
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# DB_PROFILE=postgres uses PostgreSQL with persistent connections (and psycopg's pool on
+# Django 5.1+); the default sqlite profile is tuned per connection through SQLITE_PRAGMAS
+# (see faculty.db.configure_sqlite).
+
+DB_PROFILE = os.environ.get("DB_PROFILE", "sqlite")
+
+if DB_PROFILE == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("DB_NAME", "lms"),
+            "USER": os.environ.get("DB_USER", "lms"),
+            "PASSWORD": os.environ.get("DB_PASSWORD", ""),
+            "HOST": os.environ.get("DB_HOST", "127.0.0.1"),
+            "PORT": os.environ.get("DB_PORT", "5432"),
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
     }
+    if os.environ.get("DB_POOL") and django.VERSION >= (5, 1):
+        # server-side pooling replaces persistent connections
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("DB_POOL_MIN", 2)),
+            "max_size": int(os.environ.get("DB_POOL_MAX", 20)),
+        }
+else:
+    DATABASES = {
+        "default": {
+            # django.db.backends.sqlite3 with BEGIN IMMEDIATE transactions
+            "ENGINE": "djangoProject1.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+            "OPTIONS": {
+                # seconds the driver waits on a locked database before raising
+                "timeout": 20,
+            },
+            # a file rather than the shared-cache in-memory default, whose table locks
+            # fail concurrent writers at once instead of waiting on busy_timeout
+            "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+        }
+    }
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": 20000,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64000,
+    "temp_store": "memory",
+}
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# The course catalog (faculty subjects and classrooms) lives in its own alias so its backend
+# can be chosen with CATALOG_CACHE_BACKEND: locmem (default), file or redis (needs redis-py).
+
+CATALOG_CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "catalog",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CATALOG_CACHE_LOCATION", BASE_DIR / ".cache" / "catalog"),
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("CATALOG_CACHE_LOCATION", "redis://127.0.0.1:6379/1"),
+    },
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "catalog": CATALOG_CACHE_BACKENDS[os.environ.get("CATALOG_CACHE_BACKEND", "locmem")],
+}
+
+CATALOG_CACHE_ALIAS = "catalog"
+CATALOG_CACHE_TIMEOUT = 60 * 60
+
+# Sessions and authentication
+# https://docs.djangoproject.com/en/5.0/topics/http/sessions/#configuring-the-session-engine
+# SESSION_PROFILE picks the engine: cached_db (default) reads sessions from the default cache and
+# writes through to the database, signed_cookies keeps them client side with no server storage,
+# db is Django's default. Use a shared cache (redis) for "default" when running several processes.
+
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
 }
 
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get("SESSION_PROFILE", "cached_db")]
+
+# users.backends.CachedModelBackend caches the CustomUser row of authenticated requests.
+AUTHENTICATION_BACKENDS = ["users.backends.CachedModelBackend"]
+USER_CACHE_ALIAS = "default"
+USER_CACHE_TIMEOUT = 5 * 60
+
+# Seconds between last_login writes for the same user (users.signals.update_last_login).
+LAST_LOGIN_UPDATE_INTERVAL = 60 * 60
+
+# Login throttling (users.throttling), checked before the password is hashed: a token bucket of
+# LOGIN_IP_BURST attempts per client IP refilled at LOGIN_IP_PER_MINUTE, and at most
+# LOGIN_EMAIL_FAILURES failed attempts per email in any LOGIN_EMAIL_WINDOW seconds.
+LOGIN_THROTTLE = os.environ.get("LOGIN_THROTTLE", "1") == "1"
+LOGIN_THROTTLE_CACHE_ALIAS = "default"
+LOGIN_IP_BURST = 20
+LOGIN_IP_PER_MINUTE = 10
+LOGIN_EMAIL_FAILURES = 5
+LOGIN_EMAIL_WINDOW = 15 * 60
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -100,6 +214,50 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.0/topics/auth/passwords/
+# PASSWORD_HASHER_PROFILE picks the preferred hasher; the others stay listed so existing
+# hashes still verify and are upgraded to the preferred one on login. argon2 needs argon2-cffi.
+
+PASSWORD_HASHER_PROFILES = {
+    "pbkdf2": "users.hashers.TunedPBKDF2PasswordHasher",
+    "scrypt": "users.hashers.TunedScryptPasswordHasher",
+    "argon2": "users.hashers.TunedArgon2PasswordHasher",
+}
+
+PASSWORD_HASHER_PROFILE = os.environ.get("PASSWORD_HASHER_PROFILE", "pbkdf2")
+
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]] + [
+    hasher for name, hasher in PASSWORD_HASHER_PROFILES.items() if name != PASSWORD_HASHER_PROFILE
+] + [
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+
+PASSWORD_HASHER_PARAMS = {
+    "pbkdf2": {},
+    "scrypt": {"work_factor": 2 ** 14, "block_size": 8, "parallelism": 1},
+    "argon2": {"time_cost": 2, "memory_cost": 64 * 1024, "parallelism": 2},
+}
+
+# Logging
+# https://docs.djangoproject.com/en/5.0/topics/logging/
+# Application loggers (faculty.*, users.*) write key=value lines to the console at LOG_LEVEL.
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "plain": {"format": "%(asctime)s %(levelname)s %(name)s %(message)s"},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "plain"},
+    },
+    "loggers": {
+        "faculty": {"handlers": ["console"], "level": os.environ.get("LOG_LEVEL", "INFO"), "propagate": False},
+        "users": {"handlers": ["console"], "level": os.environ.get("LOG_LEVEL", "INFO"), "propagate": False},
+    },
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -121,7 +279,7 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
-AUTH_USER_MODEL = "faculty.CustomUser"
+AUTH_USER_MODEL = "users.CustomUser"
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -140,3 +298,48 @@ MAX_LECTURER_CLASSROOM = 10
 IS_OPEN_TO_CHOOSE = True
 DEFAULT_NUMBER_OF_CLASSES = 10
 DEFAULT_LECTURE_DURATION = 2
+MAX_SESSIONS_PER_SCHEDULE = 300  # upper bound of ClassroomCalendarForm's count
+HOMEWORK_PAGE_SIZE = 20
+SUBMISSIONS_PAGE_SIZE = 50
+ATTENDANCE_AT_RISK_THRESHOLD = 0.75
+
+# Query budgets: views decorated with faculty.decorators.query_budget log a warning when they go
+# over their budget. ENFORCE_QUERY_BUDGETS=1 (on in faculty.tests) makes GET requests raise instead.
+ENFORCE_QUERY_BUDGETS = os.environ.get("ENFORCE_QUERY_BUDGETS", "") == "1"
+PROFILE_QUERY_BUDGET = 6
+HOMEWORK_LIST_QUERY_BUDGET = 2
+
+# Syllabus downloads: None streams from Django, 'xsendfile' sets X-Sendfile (Apache/lighttpd),
+# 'xaccel' sets X-Accel-Redirect under SENDFILE_URL (an nginx `internal` location aliased to MEDIA_ROOT).
+SENDFILE_BACKEND = os.environ.get('SENDFILE_BACKEND') or None
+SENDFILE_URL = '/protected-media/'
+
+# Request metrics (faculty.middleware.RequestMetricsMiddleware): percentiles cover the last
+# REQUEST_METRICS_WINDOW requests of each view and are served by faculty:metrics to staff,
+# or to scrapers sending "Authorization: Bearer <METRICS_TOKEN>".
+SERVER_TIMING = True
+SLOW_REQUEST_MS = 500
+REQUEST_METRICS_WINDOW = 1000
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+
+# Background jobs (faculty.jobs), run by `manage.py run_jobs --processes N`. JOBS_EAGER=1 runs
+# them in the web process after the request's transaction commits, for development without a worker.
+JOBS_EAGER = os.environ.get("JOBS_EAGER", "") == "1"
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 10  # seconds before the first retry, doubled for each further one
+JOB_HEARTBEAT_INTERVAL = 30  # a running job's worker renews its lease this often
+JOB_LEASE = 2 * 60  # a running job without a heartbeat for this long is assumed lost with its worker
+JOB_POLL_INTERVAL = 1.0
+JOB_RETENTION = 7 * 24 * 60 * 60  # finished jobs are purged after a week
+
+# Homework due within this many hours gets deadline notifications (manage.py notify_deadlines).
+DEADLINE_NOTIFY_HOURS = 24
+
+# Results per page of faculty:search (faculty.search: SQLite FTS5, or tsvector on PostgreSQL).
+SEARCH_RESULTS = 20
+
+# Near-duplicate submissions (faculty.similarity): MinHash over word shingles of this many words.
+# Texts with fewer shingles get no signature, and pairs below the threshold are not reported.
+SIMILARITY_SHINGLE_SIZE = 3
+SIMILARITY_MIN_SHINGLES = 10
+SIMILARITY_THRESHOLD = 0.8
@@ -0,0 +1,15 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite backend that opens transactions with BEGIN IMMEDIATE.
+
+    A deferred transaction that reads and then writes cannot wait on busy_timeout when
+    another writer got in between; SQLite fails it straight away with "database is
+    locked". Taking the write lock up front makes concurrent writers queue instead.
+    Django 5.1+ offers the same through OPTIONS["transaction_mode"].
+    """
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -0,0 +1,25 @@
+import time
+
+from django.template.backends.django import DjangoTemplates, Template
+from faculty.metrics import record_template
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            record_template((time.perf_counter() - start) * 1000)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    DjangoTemplates whose templates report their render time to faculty.metrics.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from faculty.models import CustomUser, Subject, Faculty, Classroom, StudentSubject, StudentFaculty, Homework
+from faculty.models import CustomUser, Subject, Faculty, Classroom, StudentSubject, StudentFaculty, Homework, Job, \
+    Notification
 
 
 @admin.register(Subject)
@@ -32,3 +33,17 @@ class StudentFacultyAdmin(admin.ModelAdmin):
 @admin.register(Homework)
 class HomeworkAdmin(admin.ModelAdmin):
     list_display = ['title', 'description', 'due_date']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'run_at', 'started_at', 'heartbeat_at', 'finished_at',
+                    'locked_by']
+    list_filter = ['status', 'name']
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['recipient', 'homework', 'kind', 'created_at', 'read_at']
+    list_filter = ['kind']
+    raw_id_fields = ['recipient', 'homework']
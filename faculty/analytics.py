@@ -0,0 +1,111 @@
+import datetime
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from faculty.counters import count_of
+from faculty.models import AttendanceSummary, Classroom, ClassroomAttendance, ClassroomCalendar
+
+
+def _rate(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+def _held(classrooms):
+    """
+    The sessions of `classrooms` whose attendance has been taken. Sessions that were
+    scheduled but never marked would otherwise count as missed by everyone.
+    """
+    return ClassroomCalendar.objects.filter(classroom__in=classrooms, attendance_taken=True)
+
+
+def session_rates(classroom):
+    """
+    Attendance of every held session of the classroom, oldest first, in one query.
+    """
+    sessions = _held([classroom.id]).order_by('date', 'start_time') \
+        .values('id', 'date', 'start_time', present=F('present_count'))
+    return [{**session, 'rate': _rate(session['present'], classroom.enrolled_count)} for session in sessions]
+
+
+def student_rates(classroom, threshold=None, at_risk_only=False):
+    """
+    Sessions attended by every enrolled student out of the sessions held so far, read
+    from AttendanceSummary in one query; least attending students first. Students under
+    `threshold` (settings.ATTENDANCE_AT_RISK_THRESHOLD by default) are flagged at_risk.
+    """
+    threshold = settings.ATTENDANCE_AT_RISK_THRESHOLD if threshold is None else threshold
+    held = _held([classroom.id]).count()
+    attended = AttendanceSummary.objects.filter(classroom=classroom, student=OuterRef('pk')).values('attended')[:1]
+    students = classroom.students.annotate(attended=Coalesce(Subquery(attended), Value(0))) \
+        .order_by('attended', 'last_name', 'first_name')
+    if at_risk_only:
+        students = students.filter(attended__lt=math.ceil(threshold * held))
+    return [{'student': student, 'attended': student.attended, 'held': held,
+             'rate': _rate(student.attended, held), 'at_risk': held > 0 and student.attended < threshold * held}
+            for student in students]
+
+
+def weekly_trend(classrooms):
+    """
+    Attendance rate per ISO week (keyed by its Monday) over the held sessions of
+    `classrooms`, from one aggregation of the sessions' present_count grouped by date.
+    """
+    by_date = _held(classrooms).values_list('date') \
+        .annotate(sessions=Count('id'), present=Sum('present_count'), expected=Sum('classroom__enrolled_count')) \
+        .order_by()
+
+    weeks = {}
+    for date, sessions, present, expected in by_date:
+        week = weeks.setdefault(date - datetime.timedelta(days=date.weekday()),
+                                {'sessions': 0, 'present': 0, 'expected': 0})
+        week['sessions'] += sessions
+        week['present'] += present or 0
+        week['expected'] += expected or 0
+    return [{'week': week, **totals, 'rate': _rate(totals['present'], totals['expected'])}
+            for week, totals in sorted(weeks.items())]
+
+
+def faculty_report(faculty_id, threshold=None):
+    """
+    Per-classroom attendance of a faculty in one query over AttendanceSummary: sessions
+    held, enrolled students, attendance rate and students under `threshold`.
+    """
+    threshold = settings.ATTENDANCE_AT_RISK_THRESHOLD if threshold is None else threshold
+    # summaries of students still enrolled in the classroom
+    summaries = AttendanceSummary.objects.filter(classroom=OuterRef('pk'), student__classrooms=OuterRef('pk'))
+    held = ClassroomCalendar.objects.filter(classroom=OuterRef('pk'), attendance_taken=True)
+    classrooms = Classroom.objects.filter(subject__faculty=faculty_id) \
+        .annotate(held=count_of(held)) \
+        .annotate(attended=Coalesce(Subquery(summaries.order_by().values('classroom')
+                                             .annotate(total=Sum('attended')).values('total')[:1]), Value(0)),
+                  on_track=count_of(summaries.filter(attended__gte=OuterRef('held') * threshold))) \
+        .values('id', 'subject__name', 'lecturer__first_name', 'lecturer__last_name', 'enrolled_count',
+                'held', 'attended', 'on_track') \
+        .order_by('subject__name', 'id')
+    return [{**row, 'rate': _rate(row['attended'], row['held'] * row['enrolled_count']),
+             'at_risk': row['enrolled_count'] - row['on_track'] if row['held'] else 0}
+            for row in classrooms]
+
+
+def refresh_attendance_summary(classroom_ids=None):
+    """
+    Rebuild AttendanceSummary from ClassroomAttendance, for the given classrooms or all
+    of them, with one aggregation and a bulk insert. Returns the number of rows written.
+    """
+    attendance = ClassroomAttendance.objects.filter(status=True)
+    summaries = AttendanceSummary.objects.all()
+    if classroom_ids is not None:
+        attendance = attendance.filter(classroom_date__classroom_id__in=classroom_ids)
+        summaries = summaries.filter(classroom_id__in=classroom_ids)
+    counts = attendance.values_list('classroom_date__classroom_id', 'student_id') \
+        .annotate(attended=Count('id')).order_by()
+    with transaction.atomic():
+        summaries.delete()
+        created = AttendanceSummary.objects.bulk_create(
+            (AttendanceSummary(classroom_id=classroom_id, student_id=student_id, attended=attended)
+             for classroom_id, student_id, attended in counts.iterator(chunk_size=5000)),
+            batch_size=5000)
+    return len(created)
@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class FacultyConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "faculty"
+
+    def ready(self):
+        from faculty import signals, tasks  # noqa: F401
+        from faculty.db import configure_sqlite
+        from faculty.jobs import collect_metrics
+        from faculty.metrics import registry, track_queries
+        from faculty.search import create_index
+        connection_created.connect(configure_sqlite, dispatch_uid='faculty.configure_sqlite')
+        connection_created.connect(track_queries, dispatch_uid='faculty.track_queries')
+        registry.collect(collect_metrics)
+        post_migrate.connect(create_index, sender=self, dispatch_uid='faculty.create_search_index')
@@ -0,0 +1,134 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.http import JsonResponse
+from django.shortcuts import aget_object_or_404, redirect, render
+from faculty import views
+from faculty.dashboard import ahomework_dashboard, InvalidCursor
+from faculty.decorators import async_login_required, query_budget
+from faculty.forms import StudentProfileForm, ClassroomCreationForm, HomeworkForm, ClassroomCalendarForm
+from faculty.models import Classroom, Homework
+from faculty.profile import astudent_profile, alecturer_profile, alist
+
+# Async variants of the read-heavy views, routed instead of the sync ones when
+# settings.ASYNC_VIEWS is on (the ASGI entry point turns it on). GETs use the async
+# ORM; POSTs, which are rare on these pages, are handed to the sync view in a thread.
+# Templates are rendered in a thread too, since rendering may still touch the ORM.
+# Django 5.0 runs every async ORM call on the one thread-sensitive executor, so the
+# queries of a request run one after another, as in the sync views; what the async
+# path buys is not holding a worker thread while the request waits.
+
+arender = sync_to_async(render)
+
+
+async def _is_enrolled(user, classroom_id):
+    return await Classroom.objects.filter(students=user, id=classroom_id).aexists()
+
+
+@async_login_required
+@query_budget(settings.PROFILE_QUERY_BUDGET)
+async def profile_view(request):
+    if request.method == 'POST':
+        return await sync_to_async(views.profile_view)(request)
+    user = request.user
+
+    if user.is_student():
+        context = {
+            'user': user,
+            'form': StudentProfileForm(),
+            'max_classroom': settings.MAX_STUDENT_CLASSROOM,
+            'is_open_to_choose': settings.IS_OPEN_TO_CHOOSE,
+            **await astudent_profile(user),
+        }
+        return await arender(request, 'faculty/student_profile.html', context)
+
+    if user.is_lecturer():
+        context = {
+            'user': user,
+            'classroom_creation_form': ClassroomCreationForm(),
+            'debug_mode': settings.DEBUG,
+            **await alecturer_profile(user),
+        }
+        return await arender(request, 'faculty/lecturer_profile.html', context)
+
+
+@async_login_required
+async def classroom_view(request, classroom_id):
+    if request.method == 'POST':
+        return await sync_to_async(views.classroom_view)(request, classroom_id)
+    user = request.user
+    classroom = await aget_object_or_404(Classroom.objects.select_related('subject', 'lecturer'), id=classroom_id)
+
+    if user.is_student():
+        if not await _is_enrolled(user, classroom.id):
+            messages.error(request, 'You are not enrolled in this classroom.')
+            return redirect('faculty:profile')
+        return await arender(request, 'faculty/classroom_view.html', {'classroom': classroom,
+                                                                      'syllabus': classroom.syllabus})
+
+    if user.is_lecturer():
+        if classroom.lecturer_id != user.id:
+            messages.error(request, 'You are not the lecturer for this classroom.')
+            return redirect('faculty:profile')
+
+        calendar = await alist(classroom.calendar.select_related('classroom__subject', 'classroom__lecturer'))
+        enrolled_students = await alist(classroom.students.all())
+        return await arender(request, 'faculty/lecturer_classroom_view.html', {
+            'classroom': classroom,
+            'enrolled_students': enrolled_students,
+            'homework_form': HomeworkForm(),
+            'calendar_form': ClassroomCalendarForm(classroom=classroom),
+            'calendar': calendar,
+            'debug': settings.DEBUG,
+        })
+
+    messages.error(request, 'You are not authorized to view this classroom.')
+    return redirect('faculty:profile')
+
+
+@async_login_required
+async def homework_view(request, classroom_id):
+    if request.method == 'POST':
+        return await sync_to_async(views.homework_view)(request, classroom_id)
+    user = request.user
+    classroom = await aget_object_or_404(Classroom, id=classroom_id)
+    homeworks = Homework.objects.filter(classroom_id=classroom_id).order_by('-is_active', '-due_date')
+
+    if user.is_student():
+        if not await _is_enrolled(user, classroom_id):
+            messages.error(request, "You are not enrolled in this classroom.")
+            return redirect('faculty:profile')
+        return await arender(request, 'faculty/homework.html', {'homeworks': await alist(homeworks),
+                                                                'classroom': classroom})
+
+    if user.is_lecturer() and classroom.lecturer_id != user.id:
+        messages.error(request, 'You are not the lecturer for this classroom.')
+        return redirect('faculty:profile')
+
+    return await arender(request, 'faculty/homework.html', {'homeworks': await alist(homeworks),
+                                                            'homework_form': HomeworkForm(),
+                                                            'user': user,
+                                                            'classroom': classroom})
+
+
+@async_login_required
+@query_budget(settings.HOMEWORK_LIST_QUERY_BUDGET)
+async def homework_list(request):
+    if not request.user.is_student():
+        return redirect('faculty:profile')
+
+    try:
+        homeworks, next_cursor = await ahomework_dashboard(request.user, cursor=request.GET.get('cursor'),
+                                                           page_size=settings.HOMEWORK_PAGE_SIZE)
+    except InvalidCursor:
+        return redirect('faculty:homework_list')
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'results': [views.dashboard_row(homework) for homework in homeworks],
+                             'next_cursor': next_cursor})
+
+    return await arender(request, 'faculty/all_homeworks.html', {
+        'submitted_homeworks': [homework for homework in homeworks if homework.submitted],
+        'unsubmitted_homeworks': [homework for homework in homeworks if not homework.submitted],
+        'next_cursor': next_cursor,
+    })
@@ -0,0 +1,69 @@
+import logging
+
+from django.db import transaction
+from django.db.models import F
+from faculty.models import AttendanceSummary, ClassroomAttendance, ClassroomCalendar
+
+logger = logging.getLogger(__name__)
+
+
+def load_attendance(classroom_calendar):
+    """
+    Return {student_id: status} for every attendance row of the session in one query.
+    """
+    return dict(ClassroomAttendance.objects.filter(classroom_date=classroom_calendar)
+                .values_list('student_id', 'status'))
+
+
+def apply_attendance(classroom_calendar, marks):
+    """
+    Apply a roster diff for one session.
+
+    `marks` maps student_id -> bool. Present students get a row with status=True,
+    absent students lose their row. All writes happen in one transaction using
+    bulk_create, bulk_update and a single filtered delete; the session's present_count
+    and AttendanceSummary are adjusted by the difference in the same transaction.
+    """
+    present = {int(student_id) for student_id, value in marks.items() if value}
+    absent = {int(student_id) for student_id, value in marks.items() if not value}
+
+    with transaction.atomic():
+        existing = {row.student_id: row for row in
+                    ClassroomAttendance.objects.select_for_update()
+                    .filter(classroom_date=classroom_calendar, student_id__in=present | absent)
+                    .only('id', 'student_id', 'status')}
+
+        to_create = [ClassroomAttendance(classroom_date=classroom_calendar, student_id=student_id, status=True)
+                     for student_id in present if student_id not in existing]
+        to_update = []
+        for student_id in present:
+            row = existing.get(student_id)
+            if row is not None and not row.status:
+                row.status = True
+                to_update.append(row)
+        to_delete = [existing[student_id].id for student_id in absent if student_id in existing]
+        lost = [student_id for student_id in absent if student_id in existing and existing[student_id].status]
+
+        if to_create:
+            ClassroomAttendance.objects.bulk_create(to_create)
+        if to_update:
+            ClassroomAttendance.objects.bulk_update(to_update, ['status'])
+        if to_delete:
+            ClassroomAttendance.objects.filter(id__in=to_delete).delete()
+
+        classroom_id = classroom_calendar.classroom_id
+        gained = [row.student_id for row in to_create + to_update]
+        if gained:
+            AttendanceSummary.objects.bulk_create([AttendanceSummary(classroom_id=classroom_id, student_id=student_id)
+                                                   for student_id in gained], ignore_conflicts=True)
+            AttendanceSummary.objects.filter(classroom_id=classroom_id, student_id__in=gained) \
+                .update(attended=F('attended') + 1)
+        if lost:
+            AttendanceSummary.objects.filter(classroom_id=classroom_id, student_id__in=lost, attended__gt=0) \
+                .update(attended=F('attended') - 1)
+        ClassroomCalendar.objects.filter(pk=classroom_calendar.pk).update(
+            attendance_taken=True, present_count=F('present_count') + len(gained) - len(lost))
+
+    logger.debug('attendance saved session=%s created=%d updated=%d deleted=%d', classroom_calendar.id,
+                 len(to_create), len(to_update), len(to_delete))
+    return len(to_create), len(to_update), len(to_delete)
@@ -0,0 +1,29 @@
+import statistics
+
+
+def percentile(samples, q):
+    """
+    q-th percentile (1-99) of a sorted list of samples.
+    """
+    if not samples:
+        return None
+    if len(samples) == 1:
+        return round(samples[0], 3)
+    return round(statistics.quantiles(samples, n=100, method='inclusive')[q - 1], 3)
+
+
+def summarize(samples, errors, elapsed):
+    """
+    Throughput and latency percentiles for a run; `samples` are per-request
+    latencies in milliseconds of the successful requests.
+    """
+    samples = sorted(samples)
+    total = len(samples) + errors
+    return {
+        'requests': total,
+        'errors': errors,
+        'throughput_rps': round(total / elapsed, 2) if elapsed else None,
+        'p50_ms': percentile(samples, 50),
+        'p95_ms': percentile(samples, 95),
+        'p99_ms': percentile(samples, 99),
+    }
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Prefetch
+from faculty.metrics import registry
+from faculty.models import Classroom, Faculty, Subject
+
+CACHE_METRIC = 'lms_catalog_cache_total'
+registry.describe(CACHE_METRIC, 'Course catalog cache lookups by result, and invalidations.')
+
+
+def _cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def _key(faculty_id):
+    return f'catalog:faculty:{faculty_id}'
+
+
+def get_faculty_catalog(faculty_id):
+    """
+    Subjects of a faculty, each with `classrooms` (lecturer selected), served from the
+    catalog cache. Rebuilt with two queries on a miss.
+    """
+    cache = _cache()
+    subjects = cache.get(_key(faculty_id))
+    if subjects is not None:
+        registry.increment(CACHE_METRIC, result='hit')
+        return subjects
+
+    registry.increment(CACHE_METRIC, result='miss')
+    classrooms = Classroom.objects.select_related('lecturer')
+    subjects = list(Subject.objects.filter(faculty=faculty_id)
+                    .prefetch_related(Prefetch('classroom_set', queryset=classrooms, to_attr='classrooms')))
+    cache.set(_key(faculty_id), subjects, settings.CATALOG_CACHE_TIMEOUT)
+    return subjects
+
+
+def invalidate_faculties(faculty_ids):
+    faculty_ids = set(faculty_ids)
+    if faculty_ids:
+        registry.increment(CACHE_METRIC, result='invalidation')
+        _cache().delete_many([_key(faculty_id) for faculty_id in faculty_ids])
+
+
+def invalidate_subjects(subject_ids):
+    invalidate_faculties(Faculty.subjects.through.objects.filter(subject_id__in=subject_ids)
+                         .values_list('faculty_id', flat=True))
+
+
+def invalidate_classrooms(classroom_ids):
+    invalidate_subjects(Classroom.objects.filter(pk__in=classroom_ids).values_list('subject_id', flat=True))
+
@@ -1,6 +1,29 @@
+from django.db import models
+
+
 USER_STATUS_CHOICES = (
     (1, 'Active'),
     (2, 'Inactive'),
     (3, 'Graduated'),
 )
 
+WEEKDAY_CHOICES = (
+    (0, 'Monday'),
+    (1, 'Tuesday'),
+    (2, 'Wednesday'),
+    (3, 'Thursday'),
+    (4, 'Friday'),
+    (5, 'Saturday'),
+    (6, 'Sunday'),
+)
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = 'queued', 'Queued'
+    RUNNING = 'running', 'Running'
+    DONE = 'done', 'Done'
+    FAILED = 'failed', 'Failed'
+
+
+class NotificationKind(models.TextChoices):
+    DEADLINE = 'deadline', 'Deadline approaching'
@@ -0,0 +1,51 @@
+from django.db.models import Exists, F, Func, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from faculty.models import Classroom, ClassroomAttendance, ClassroomCalendar, Homework, StudentHomework
+
+
+def count_of(queryset):
+    """
+    Correlated COUNT of `queryset` as an expression, for annotate() and update(); a
+    Func rather than Count so no GROUP BY is added.
+    """
+    return Coalesce(Subquery(queryset.order_by().annotate(count=Func('pk', function='COUNT'))
+                             .values('count')[:1], output_field=IntegerField()), Value(0))
+
+
+def recount_submissions(homework_ids=None):
+    """
+    Recompute Homework.submission_count with one UPDATE, for the given homework or all.
+    """
+    homeworks = Homework.objects.all() if homework_ids is None else Homework.objects.filter(pk__in=homework_ids)
+    return homeworks.update(submission_count=count_of(StudentHomework.objects.filter(homework=OuterRef('pk'))))
+
+
+def recount_attendance(session_ids=None):
+    """
+    Recompute ClassroomCalendar.present_count with one UPDATE, for the given sessions or
+    all. attendance_taken is set where attendance rows exist; a session taken with
+    everyone absent has none, so the flag is never cleared here.
+    """
+    sessions = ClassroomCalendar.objects.all() if session_ids is None else \
+        ClassroomCalendar.objects.filter(pk__in=session_ids)
+    rows = ClassroomAttendance.objects.filter(classroom_date=OuterRef('pk'))
+    sessions.filter(Exists(rows)).update(attendance_taken=True)
+    return sessions.update(present_count=count_of(rows.filter(status=True)))
+
+
+def counter_drift():
+    """
+    Number of rows whose denormalized counter disagrees with the table it counts.
+    """
+    through = Classroom.students.through
+    return {
+        'Classroom.enrolled_count': Classroom.objects.annotate(
+            actual=count_of(through.objects.filter(classroom_id=OuterRef('pk')))
+        ).exclude(enrolled_count=F('actual')).count(),
+        'Homework.submission_count': Homework.objects.annotate(
+            actual=count_of(StudentHomework.objects.filter(homework=OuterRef('pk')))
+        ).exclude(submission_count=F('actual')).count(),
+        'ClassroomCalendar.present_count': ClassroomCalendar.objects.annotate(
+            actual=count_of(ClassroomAttendance.objects.filter(classroom_date=OuterRef('pk'), status=True))
+        ).exclude(present_count=F('actual')).count(),
+    }
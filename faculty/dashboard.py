@@ -0,0 +1,99 @@
+import base64
+import datetime
+
+from django.db.models import Case, CharField, Exists, OuterRef, Q, Subquery, Value, When
+from django.utils import timezone
+from faculty.models import Homework, StudentHomework
+
+OVERDUE = 'overdue'
+DUE_TODAY = 'due_today'
+DUE_THIS_WEEK = 'due_this_week'
+LATER = 'later'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(homework):
+    raw = f'{homework.due_date.isoformat()}|{homework.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        due_date, homework_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.datetime.fromisoformat(due_date), int(homework_id)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor(cursor)
+
+
+def _dashboard_queryset(student, cursor, now):
+    now = now or timezone.now()
+    submissions = StudentHomework.objects.filter(homework=OuterRef('pk'), student=student)
+    homeworks = Homework.objects.filter(classroom__students=student) \
+        .select_related('classroom__subject', 'classroom__lecturer') \
+        .annotate(submitted=Exists(submissions),
+                  submission_id=Subquery(submissions.values('id')[:1]),
+                  due_bucket=Case(When(due_date__lt=now, then=Value(OVERDUE)),
+                                  When(due_date__lt=now + datetime.timedelta(days=1), then=Value(DUE_TODAY)),
+                                  When(due_date__lt=now + datetime.timedelta(days=7), then=Value(DUE_THIS_WEEK)),
+                                  default=Value(LATER), output_field=CharField())) \
+        .order_by('due_date', 'id')
+
+    if cursor:
+        due_date, homework_id = decode_cursor(cursor)
+        homeworks = homeworks.filter(Q(due_date__gt=due_date) | Q(due_date=due_date, id__gt=homework_id))
+    return homeworks
+
+
+def _dashboard_page(page, page_size):
+    next_cursor = encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+    return page[:page_size], next_cursor
+
+
+def homework_dashboard(student, cursor=None, page_size=20, now=None):
+    """
+    One page of the student's homework across enrolled classrooms, ordered by due date.
+
+    Each homework carries `submitted`, `submission_id`, `due_bucket` and its classroom
+    with subject and lecturer, all fetched in a single query. Returns (homeworks,
+    next_cursor); pass next_cursor back to get the following page.
+    """
+    homeworks = _dashboard_queryset(student, cursor, now)
+    return _dashboard_page(list(homeworks[:page_size + 1]), page_size)
+
+
+async def ahomework_dashboard(student, cursor=None, page_size=20, now=None):
+    """
+    Async version of homework_dashboard().
+    """
+    homeworks = _dashboard_queryset(student, cursor, now)
+    return _dashboard_page([homework async for homework in homeworks[:page_size + 1]], page_size)
+
+
+def homework_submissions(homework, after_id=None, page_size=50):
+    """
+    One page of submissions for a homework, keyed on id. Students are selected in the
+    same query and the homework_text column is deferred until a row is opened.
+    Returns (submissions, next_after_id).
+    """
+    submissions = StudentHomework.objects.filter(homework=homework).select_related('student') \
+        .defer('homework_text').order_by('id')
+    if after_id:
+        submissions = submissions.filter(id__gt=after_id)
+    page = list(submissions[:page_size + 1])
+    next_after_id = page[page_size - 1].id if len(page) > page_size else None
+    return page[:page_size], next_after_id
+
+
+def iter_submissions(homework, batch_size=500):
+    """
+    Walk every submission of a homework in keyset batches without loading texts.
+    """
+    after_id = None
+    while True:
+        page, after_id = homework_submissions(homework, after_id, batch_size)
+        yield from page
+        if after_id is None:
+            return
@@ -0,0 +1,73 @@
+import datetime
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+from faculty.choices import NotificationKind
+from faculty.models import Classroom, Homework, Notification, StudentHomework
+from faculty.roster import chunked
+
+logger = logging.getLogger(__name__)
+
+
+def due_homework(hours=None, now=None):
+    """
+    Active homework due within the next `hours` (settings.DEADLINE_NOTIFY_HOURS), one
+    range scan of the partial due_date index on active homework.
+    """
+    now = now or timezone.now()
+    hours = settings.DEADLINE_NOTIFY_HOURS if hours is None else hours
+    return Homework.objects.filter(is_active=True, due_date__gt=now, due_date__lte=now + datetime.timedelta(hours=hours))
+
+
+def pending_notifications(homework_ids):
+    """
+    (homework_id, student_id) of every student enrolled in the homework's classroom who
+    has neither submitted it nor been notified yet, as one query: the enrollments
+    joined to the homework minus StudentHomework and Notification rows.
+    """
+    submitted = StudentHomework.objects.filter(homework=OuterRef('homework_id'), student=OuterRef('customuser_id'))
+    notified = Notification.objects.filter(homework=OuterRef('homework_id'), recipient=OuterRef('customuser_id'),
+                                           kind=NotificationKind.DEADLINE)
+    return Classroom.students.through.objects.filter(classroom__homework__in=homework_ids) \
+        .annotate(homework_id=F('classroom__homework')) \
+        .filter(~Exists(submitted), ~Exists(notified)) \
+        .values_list('homework_id', 'customuser_id') \
+        .order_by()
+
+
+def notify_deadlines(hours=None, now=None, batch_size=5000):
+    """
+    Write a DEADLINE notification for every unsubmitted student of the homework due
+    soon, streaming the pending pairs into bulk inserts of `batch_size`. Running it
+    again only adds what is new. Returns (homework scanned, notifications written);
+    pairs a concurrent run notified first are skipped by the unique constraint and not
+    counted.
+    """
+    now = now or timezone.now()
+    homework_ids = list(due_homework(hours, now).values_list('id', flat=True))
+    if not homework_ids:
+        return 0, 0
+    notifications = Notification.objects.filter(homework__in=homework_ids, kind=NotificationKind.DEADLINE)
+    with transaction.atomic():
+        before = notifications.count()
+        for chunk in chunked(pending_notifications(homework_ids).iterator(chunk_size=batch_size), batch_size):
+            Notification.objects.bulk_create([
+                Notification(homework_id=homework_id, recipient_id=student_id, kind=NotificationKind.DEADLINE,
+                             created_at=now)
+                for homework_id, student_id in chunk
+            ], batch_size=batch_size, ignore_conflicts=True)
+        written = notifications.count() - before
+    logger.info('deadline notifications homework=%d written=%d', len(homework_ids), written)
+    return len(homework_ids), written
+
+
+def close_expired_homework(now=None):
+    """
+    Deactivate every active homework past its due date with one UPDATE.
+    """
+    closed = Homework.objects.filter(is_active=True, due_date__lte=now or timezone.now()).update(is_active=False)
+    logger.info('expired homework closed=%d', closed)
+    return closed
@@ -0,0 +1,85 @@
+import logging
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from faculty import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(max_queries):
+    """
+    Count the queries a view issues (template rendering included) and complain when
+    it goes over `max_queries`. Raises QueryBudgetExceeded for GET and HEAD requests
+    when settings.ENFORCE_QUERY_BUDGETS is set (as in the tests), otherwise logs a
+    warning; a POST has already written by the time the count is known.
+
+    Queries are counted through faculty.metrics.current, which sync_to_async copies
+    into the threads running an async view's ORM calls, so async views work too.
+    """
+    def decorator(view_func):
+        def check(request, counted):
+            if counted.db_queries > max_queries:
+                message = f'{view_func.__name__} ran {counted.db_queries} queries, budget is {max_queries}'
+                if settings.ENFORCE_QUERY_BUDGETS and request.method in ('GET', 'HEAD'):
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_async_view(request, *args, **kwargs):
+                with _counting() as counted:
+                    response = await view_func(request, *args, **kwargs)
+                check(request, counted)
+                return response
+            return _wrapped_async_view
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            with _counting() as counted:
+                response = view_func(request, *args, **kwargs)
+            check(request, counted)
+            return response
+        return _wrapped_view
+    return decorator
+
+
+@contextmanager
+def _counting():
+    """
+    Collect the enclosed queries in a RequestMetrics of their own, then add them to
+    the request's, which still covers the view.
+    """
+    outer, counted = metrics.current.get(), metrics.RequestMetrics()
+    token = metrics.current.set(counted)
+    try:
+        yield counted
+    finally:
+        metrics.current.reset(token)
+        if outer is not None:
+            outer.db_queries += counted.db_queries
+            outer.db_ms += counted.db_ms
+            outer.template_ms += counted.template_ms
+
+
+def async_login_required(view_func):
+    """
+    login_required for async views (Django 5.0's decorator only wraps sync views).
+    Resolves the user with request.auser() and stores it on request.user so templates
+    do not trigger a synchronous lookup.
+    """
+    @wraps(view_func)
+    async def _wrapped_view(request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        request.user = user
+        return await view_func(request, *args, **kwargs)
+    return _wrapped_view
@@ -0,0 +1,118 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _etag(stat):
+    return f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+
+
+def _parse_range(header, size):
+    """
+    Return (start, end) for a single `bytes=` range, None when the header should be
+    ignored (missing, malformed or multi-range) and False when it cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(last_modified)
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _offload_response(path):
+    """
+    Hand the file to the front-end server (settings.SENDFILE_BACKEND): 'xsendfile'
+    for Apache/lighttpd, 'xaccel' for nginx with SENDFILE_URL mapped onto MEDIA_ROOT.
+    """
+    response = HttpResponse()
+    if settings.SENDFILE_BACKEND == 'xaccel':
+        relative = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+        response['X-Accel-Redirect'] = settings.SENDFILE_URL.rstrip('/') + '/' + relative
+    else:
+        response['X-Sendfile'] = path
+    # let the front-end server fill these in from the file itself
+    del response['Content-Type']
+    return response
+
+
+def serve_file(request, path, filename):
+    """
+    Stream a file as an attachment with ETag/Last-Modified revalidation and single
+    byte-range support. With settings.SENDFILE_BACKEND set, the bytes are left to the
+    front-end server.
+    """
+    stat = os.stat(path)
+    etag = _etag(stat)
+    last_modified = stat.st_mtime
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+    if response is not None:
+        return response
+
+    if settings.SENDFILE_BACKEND:
+        response = _offload_response(path)
+    else:
+        byte_range = None
+        if _if_range_matches(request, etag, last_modified):
+            byte_range = _parse_range(request.META.get('HTTP_RANGE'), stat.st_size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(_read_range(path, start, length), status=206)
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = str(length)
+        else:
+            response = FileResponse(open(path, 'rb'))
+
+        content_type, _ = mimetypes.guess_type(filename)
+        response['Content-Type'] = content_type or 'application/octet-stream'
+        response['Accept-Ranges'] = 'bytes'
+
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
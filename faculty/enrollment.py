@@ -0,0 +1,55 @@
+from django.db import IntegrityError, transaction
+from django.db.models import BooleanField, Case, ExpressionWrapper, F, OuterRef, Q, Value, When
+from faculty.models import Classroom
+from faculty.counters import count_of
+from faculty.catalog import invalidate_classrooms
+
+JOINED = 'joined'
+FULL = 'full'
+ALREADY_JOINED = 'already_joined'
+
+
+def enroll(classroom_id, student):
+    """
+    Enroll `student` into the classroom, never going over `max_students`.
+
+    The capacity check and the counter increment are one conditional UPDATE, so the
+    row lock (or SQLite's write lock) serializes concurrent joins. The through-table
+    insert runs in the same transaction; a duplicate enrollment hits the unique
+    constraint and rolls the increment back. When the UPDATE matches nothing, the
+    classroom is full, already has the student (ALREADY_JOINED) or does not exist
+    (Classroom.DoesNotExist is raised).
+    """
+    try:
+        with transaction.atomic():
+            updated = Classroom.objects.filter(pk=classroom_id, enrolled_count__lt=F('max_students')).update(
+                enrolled_count=F('enrolled_count') + 1,
+                is_full=Case(When(enrolled_count__gte=F('max_students') - 1, then=Value(True)),
+                             default=Value(False)),
+            )
+            if not updated:
+                return _not_enrolled(classroom_id, student)
+            Classroom.students.through.objects.create(classroom_id=classroom_id, customuser_id=student.pk)
+    except IntegrityError:
+        return ALREADY_JOINED
+    transaction.on_commit(lambda: invalidate_classrooms([classroom_id]))
+    return JOINED
+
+
+def _not_enrolled(classroom_id, student):
+    if Classroom.students.through.objects.filter(classroom_id=classroom_id, customuser_id=student.pk).exists():
+        return ALREADY_JOINED
+    if not Classroom.objects.filter(pk=classroom_id).exists():
+        raise Classroom.DoesNotExist(f'Classroom {classroom_id} does not exist')
+    return FULL
+
+
+def recount_enrollment(classroom_ids=None):
+    """
+    Recompute enrolled_count and is_full from the students M2M for the given classrooms
+    (all of them when None) with two set-based UPDATEs.
+    """
+    classrooms = Classroom.objects.all() if classroom_ids is None else Classroom.objects.filter(pk__in=classroom_ids)
+    through = Classroom.students.through
+    classrooms.update(enrolled_count=count_of(through.objects.filter(classroom_id=OuterRef('pk'))))
+    classrooms.update(is_full=ExpressionWrapper(Q(enrolled_count__gte=F('max_students')), output_field=BooleanField()))
@@ -1,10 +1,12 @@
+import datetime
 from django import forms
+from django.conf import settings
 from django.contrib.auth import password_validation
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
-from django.core.exceptions import ObjectDoesNotExist
-from faculty.models import StudentFaculty, Faculty, Classroom, Subject, ClassroomAttendance, \
-    ClassroomCalendar, \
-    Homework, StudentHomework
+from faculty.models import StudentFaculty, Faculty, Classroom, Subject, Homework, StudentHomework
+from faculty.attendance import load_attendance, apply_attendance
+from faculty.choices import WEEKDAY_CHOICES
+from faculty.scheduling import expand_sessions, find_lecturer_conflicts, create_sessions
 
 
 
@@ -19,19 +21,6 @@ class StudentProfileForm(forms.ModelForm):
         fields = ['faculty']
 
 
-class JoinClassroomForm(forms.Form):
-    classroom = forms.ModelChoiceField(queryset=Classroom.objects.none())
-
-    def __init__(self, *args, **kwargs):
-        user = kwargs.pop('user', None)
-        super().__init__(*args, **kwargs)
-        if user:
-            faculties = StudentFaculty.objects.filter(student=user).values_list('faculty', flat=True)
-            subjects = Subject.objects.filter(faculty__in=faculties)
-            classrooms = Classroom.objects.filter(subject__in=subjects).exclude(studentsubject__student=user)
-            self.fields['classroom'].queryset = classrooms
-
-
 class ClassroomCreationForm(forms.ModelForm):
     subject = forms.ModelChoiceField(queryset=Subject.objects.all())
     syllabus = forms.FileField(required=False)
@@ -42,63 +31,66 @@ class ClassroomCreationForm(forms.ModelForm):
 
 
 class ClassroomCalendarForm(forms.Form):
+    start_date = forms.DateField(label='Start Date', widget=forms.DateInput(attrs={'class': 'datepicker'}))
+    weekdays = forms.TypedMultipleChoiceField(label='Weekdays', choices=WEEKDAY_CHOICES, coerce=int,
+                                              widget=forms.CheckboxSelectMultiple())
+    start_time = forms.TimeField(label='Start Time', widget=forms.TimeInput(attrs={'class': 'timepicker'}),
+                                 help_text='Use 24-hour format')
+    count = forms.IntegerField(label='Number of Classes', min_value=1, max_value=settings.MAX_SESSIONS_PER_SCHEDULE)
+    holidays = forms.CharField(label='Holidays', required=False,
+                               help_text='Dates to skip, comma separated (YYYY-MM-DD)')
+
     def __init__(self, classroom, *args, **kwargs):
         super(ClassroomCalendarForm, self).__init__(*args, **kwargs)
-        for i in range(classroom.number_of_classes):
-            self.fields[f'date_{i}'] = forms.DateField(label=f'Date {i + 1}',
-                                                       widget=forms.DateInput(attrs={'class': 'datepicker'}))
-            self.fields[f'start_time_{i}'] = forms.TimeField(label=f'Start Time {i + 1}',
-                                                             widget=forms.TimeInput(attrs={'class': 'timepicker'}),
-                                                             help_text='Use 24-hour format')
+        self.classroom = classroom
+        self.fields['count'].initial = classroom.number_of_classes
+        self.sessions = []
+
+    def clean_holidays(self):
+        holidays = []
+        for value in self.cleaned_data['holidays'].split(','):
+            if value.strip():
+                try:
+                    holidays.append(datetime.date.fromisoformat(value.strip()))
+                except ValueError:
+                    raise forms.ValidationError(f'{value.strip()} is not a valid date')
+        return holidays
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.errors:
+            return cleaned_data
+        try:
+            self.sessions = expand_sessions(self.classroom, cleaned_data['start_date'], cleaned_data['weekdays'],
+                                            cleaned_data['start_time'], cleaned_data['count'],
+                                            holidays=cleaned_data['holidays'])
+        except ValueError as error:
+            raise forms.ValidationError(str(error))
+        conflicts = find_lecturer_conflicts(self.classroom.lecturer_id, self.sessions)
+        if conflicts:
+            raise forms.ValidationError([f'{session.date} {session.start_time} overlaps with {existing}'
+                                         for session, existing in conflicts])
+        return cleaned_data
 
     def save(self, classroom):
-        print('saving')
-        for i in range(classroom.number_of_classes):
-            date = self.cleaned_data[f'date_{i}']
-            start_time = self.cleaned_data[f'start_time_{i}']
-            ClassroomCalendar.objects.create(
-                classroom=classroom,
-                date=date,
-                start_time=start_time,
-            )
+        return create_sessions(self.sessions)
 
 
 class StudentAttendanceForm(forms.Form):
     def __init__(self, classroom_calendar, *args, **kwargs):
         super(StudentAttendanceForm, self).__init__(*args, **kwargs)
         students = classroom_calendar.classroom.students.all()
-        print([students])
-        matching_instances = ClassroomAttendance.objects.filter(classroom_date=classroom_calendar)
+        statuses = load_attendance(classroom_calendar)
         for student in students:
-            try:
-                matching_instance = matching_instances.get(student=student)
-                initial_status = matching_instance.status  # Use the existing status if a match is found
-            except ObjectDoesNotExist:
-                initial_status = False
-
             self.fields[f'{student.id}'] = forms.BooleanField(
                 label=f'{student}',
                 required=False,
-                initial=initial_status,
+                initial=statuses.get(student.id, False),
                 widget=forms.CheckboxInput()
             )
 
     def save(self, classroom_calendar):
-        for student_id, value in self.cleaned_data.items():
-            if value:
-                student_attendance, created = ClassroomAttendance.objects.get_or_create(
-                    classroom_date_id=classroom_calendar.id,
-                    student_id=int(student_id),
-                    defaults={'status': True}
-                )
-                if not created:
-                    student_attendance.status = True
-                    student_attendance.save()
-            else:
-                ClassroomAttendance.objects.filter(
-                    classroom_date_id=classroom_calendar.id,
-                    student_id=int(student_id),
-                ).delete()
+        return apply_attendance(classroom_calendar, self.cleaned_data)
 
 
 class HomeworkForm(forms.ModelForm):
@@ -0,0 +1,201 @@
+import datetime
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+from faculty.benchmarking import percentile
+from faculty.choices import JobStatus
+from faculty.models import Job
+
+logger = logging.getLogger(__name__)
+
+# name -> function, filled by @task in faculty.tasks
+TASKS = {}
+LOST = 'worker lost: no heartbeat within JOB_LEASE'
+
+
+def task(name):
+    """
+    Register a function as the job `name`. It is called with the job's payload as
+    keyword arguments, so payloads must be JSON serializable.
+    """
+    def register(func):
+        TASKS[name] = func
+        return func
+    return register
+
+
+def enqueue(name, delay=0, max_attempts=None, **payload):
+    """
+    Queue the job `name`. The row is part of the caller's transaction, so a worker
+    only sees it once that commits. With settings.JOBS_EAGER the job runs right after
+    the commit in this process instead, for development without a worker.
+    """
+    if name not in TASKS:
+        raise KeyError(f'unknown job {name!r}')
+    now = timezone.now()
+    job = Job(name=name, payload=payload, run_at=now + datetime.timedelta(seconds=delay), created_at=now,
+              max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS)
+    if settings.JOBS_EAGER:
+        transaction.on_commit(lambda: TASKS[name](**payload))
+        return job
+    job.save()
+    return job
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(worker, batch=1):
+    """
+    Mark up to `batch` due jobs as running for `worker` and return them.
+
+    Where the database has SELECT ... FOR UPDATE SKIP LOCKED (PostgreSQL, MySQL 8,
+    Oracle) concurrent workers lock disjoint rows. SQLite has no row locks, so each
+    candidate is taken with a conditional UPDATE that only succeeds while the row is
+    still queued; SQLite serialises writers, so exactly one worker wins each job.
+    """
+    now = timezone.now()
+    due = Job.objects.filter(status=JobStatus.QUEUED, run_at__lte=now).order_by('run_at', 'id')
+    claimed = {'status': JobStatus.RUNNING, 'locked_by': worker, 'started_at': now, 'heartbeat_at': now,
+               'attempts': F('attempts') + 1}
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:batch])
+            Job.objects.filter(pk__in=ids).update(**claimed)
+    else:
+        # one autocommit statement per candidate: no read transaction to upgrade
+        ids = [pk for pk in due.values_list('id', flat=True)[:batch]
+               if Job.objects.filter(pk=pk, status=JobStatus.QUEUED).update(**claimed)]
+    if not ids:
+        return []
+    return list(Job.objects.filter(pk__in=ids).order_by('run_at', 'id'))
+
+
+def _owned(job):
+    # the job's row while this claim still holds it; a lost lease hands it to another worker
+    return Job.objects.filter(pk=job.pk, status=JobStatus.RUNNING, locked_by=job.locked_by)
+
+
+def _heartbeat(job, stop, interval):
+    """
+    Renew the job's lease every `interval` seconds until `stop` is set, from a thread
+    with its own connection, so requeue_stale can tell a long job from a lost one. A
+    failed renewal, such as a write lock held past the busy timeout, is retried on the
+    next beat; the lease is several intervals long.
+    """
+    try:
+        while not stop.wait(interval):
+            try:
+                if not _owned(job).update(heartbeat_at=timezone.now()):
+                    return
+            except DatabaseError as e:
+                logger.warning('job heartbeat failed job=%s name=%s error=%s', job.pk, job.name, e)
+    finally:
+        connections.close_all()
+
+
+def run(job):
+    """
+    Run a claimed job, renewing its lease meanwhile. A job that raises is queued
+    again after an exponential backoff (JOB_RETRY_DELAY * 2 ** (attempts - 1)
+    seconds) until it has used max_attempts, then marked failed.
+    """
+    start = time.perf_counter()
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(job, stop, settings.JOB_HEARTBEAT_INTERVAL), daemon=True)
+    heartbeat.start()
+    try:
+        func = TASKS[job.name]
+        func(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            delay = settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            _owned(job).update(status=JobStatus.QUEUED, locked_by='', last_error=error,
+                               run_at=timezone.now() + datetime.timedelta(seconds=delay))
+            logger.warning('job retry job=%s name=%s attempt=%d delay_s=%d', job.pk, job.name, job.attempts, delay)
+        else:
+            _owned(job).update(status=JobStatus.FAILED, last_error=error, finished_at=timezone.now())
+            logger.error('job failed job=%s name=%s attempts=%d\n%s', job.pk, job.name, job.attempts, error)
+        return False
+    finally:
+        stop.set()
+        heartbeat.join()
+    _owned(job).update(status=JobStatus.DONE, finished_at=timezone.now(), last_error='')
+    logger.info('job done job=%s name=%s run_ms=%.1f', job.pk, job.name, (time.perf_counter() - start) * 1000)
+    return True
+
+
+def requeue_stale(lease=None):
+    """
+    Handle the running jobs whose worker has not renewed their lease for `lease`
+    seconds (settings.JOB_LEASE), as left behind by a killed worker: queue them again,
+    or mark them failed once they have used max_attempts, so a job that kills its
+    worker is not retried forever. Returns (requeued, failed).
+    """
+    lease = settings.JOB_LEASE if lease is None else lease
+    now = timezone.now()
+    stale = Job.objects.filter(status=JobStatus.RUNNING, heartbeat_at__lt=now - datetime.timedelta(seconds=lease))
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=JobStatus.FAILED, locked_by='', finished_at=now, last_error=LOST)
+    requeued = stale.update(status=JobStatus.QUEUED, locked_by='', run_at=now, last_error=LOST)
+    if failed or requeued:
+        logger.warning('stale jobs requeued=%d failed=%d', requeued, failed)
+    return requeued, failed
+
+
+def purge_finished(older_than):
+    cutoff = timezone.now() - datetime.timedelta(seconds=older_than)
+    return Job.objects.filter(status__in=[JobStatus.DONE, JobStatus.FAILED], finished_at__lt=cutoff).delete()[0]
+
+
+def queue_stats(window=None):
+    """
+    Queue depth per job name and status, age of the oldest due job and p50/p95/p99 of
+    the wait (due to started) and run (started to finished) times of the last `window`
+    finished jobs (settings.REQUEST_METRICS_WINDOW).
+    """
+    now = timezone.now()
+    window = window or settings.REQUEST_METRICS_WINDOW
+    depth = {}
+    for name, status, jobs in Job.objects.filter(status__in=[JobStatus.QUEUED, JobStatus.RUNNING, JobStatus.FAILED]) \
+            .values_list('name', 'status').annotate(jobs=Count('id')).order_by():
+        depth.setdefault(name, {})[status] = jobs
+    oldest = Job.objects.filter(status=JobStatus.QUEUED, run_at__lte=now).aggregate(oldest=Min('run_at'))['oldest']
+    finished = Job.objects.filter(status=JobStatus.DONE).order_by('-finished_at') \
+        .values_list('run_at', 'started_at', 'finished_at')[:window]
+    waits = sorted(max(0.0, (started - run_at).total_seconds()) for run_at, started, _ in finished)
+    runs = sorted((done - started).total_seconds() for _, started, done in finished)
+    return {
+        'depth': depth,
+        'oldest_due_seconds': round((now - oldest).total_seconds(), 3) if oldest else 0,
+        'wait_seconds': {f'p{q}': percentile(waits, q) for q in (50, 95, 99)},
+        'run_seconds': {f'p{q}': percentile(runs, q) for q in (50, 95, 99)},
+    }
+
+
+def collect_metrics():
+    """
+    faculty.metrics collector: queue_stats() as Prometheus gauges.
+    """
+    stats = queue_stats()
+    return [
+        ('lms_jobs', 'gauge', 'Jobs by name and status (done jobs are not counted).',
+         [({'name': name, 'status': status}, jobs)
+          for name, statuses in sorted(stats['depth'].items()) for status, jobs in sorted(statuses.items())]),
+        ('lms_jobs_oldest_due_seconds', 'gauge', 'Time the oldest due job has been waiting for a worker.',
+         [({}, stats['oldest_due_seconds'])]),
+        ('lms_job_wait_seconds', 'gauge', 'Wait of recent jobs between due and started.',
+         [({'quantile': f'0.{q}'}, stats['wait_seconds'][f'p{q}']) for q in (50, 95, 99)]),
+        ('lms_job_run_seconds', 'gauge', 'Run time of recent jobs.',
+         [({'quantile': f'0.{q}'}, stats['run_seconds'][f'p{q}']) for q in (50, 95, 99)]),
+    ]
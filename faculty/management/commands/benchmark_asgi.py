@@ -0,0 +1,158 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+
+from faculty.benchmarking import summarize
+from faculty.models import Classroom, Faculty, Homework, StudentFaculty, Subject
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = ("Compare requests per second and tail latency of the read-heavy pages served through the "
+            "WSGI handler (sync views) and the ASGI handler (faculty.async_views). Each deployment runs "
+            "in its own process against the same seeded data.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=20)
+        parser.add_argument('--classrooms', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--json', action='store_true', help="Print results as JSON")
+        parser.add_argument('--mode', choices=['wsgi', 'asgi'], help=
+                            "Internal: run one deployment against --tag's data and print JSON")
+        parser.add_argument('--tag', help="Internal: data set seeded by the parent process")
+
+    def handle(self, *args, **options):
+        if options['mode']:
+            # the test clients send Host: testserver
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                self.stdout.write(json.dumps(self.run_mode(options)))
+            return
+
+        tag = uuid.uuid4().hex[:8]
+        self.seed(tag, options)
+        results = {}
+        try:
+            for mode in ('wsgi', 'asgi'):
+                env = {**os.environ, 'ASYNC_VIEWS': '1' if mode == 'asgi' else '0'}
+                command = [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'benchmark_asgi', '--mode', mode,
+                           '--tag', tag, '--requests', str(options['requests']),
+                           '--concurrency', str(options['concurrency'])]
+                completed = subprocess.run(command, env=env, capture_output=True, text=True)
+                if completed.returncode:
+                    raise CommandError(completed.stderr)
+                results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+        finally:
+            CustomUser.objects.filter(email__startswith=f'asgi-{tag}-').delete()
+            Subject.objects.filter(name=f'asgi-{tag}').delete()
+            Faculty.objects.filter(name=f'asgi-{tag}').delete()
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for mode, result in results.items():
+            self.stdout.write(f'{mode}:')
+            for url, summary in result.items():
+                self.stdout.write(f'    {url:<30} {summary}')
+
+    def seed(self, tag, options):
+        password = make_password(None)
+        lecturer = CustomUser.objects.create(email=f'asgi-{tag}-lecturer@example.com', user_type='lecturer',
+                                             password=password, first_name='Bench', last_name='Lecturer')
+        subject = Subject.objects.create(name=f'asgi-{tag}', description='asgi benchmark')
+        faculty = Faculty.objects.create(name=f'asgi-{tag}')
+        faculty.subjects.add(subject)
+        classrooms = Classroom.objects.bulk_create([
+            Classroom(subject=subject, lecturer=lecturer, max_students=options['students'])
+            for _ in range(options['classrooms'])
+        ])
+        Homework.objects.bulk_create([
+            Homework(classroom=classroom, title=f'Homework {i}', description='benchmark')
+            for classroom in classrooms for i in range(5)
+        ])
+        students = CustomUser.objects.bulk_create([
+            CustomUser(email=f'asgi-{tag}-{i}@example.com', user_type='student', password=password,
+                       first_name='Bench', last_name=str(i))
+            for i in range(options['students'])
+        ])
+        StudentFaculty.objects.bulk_create([StudentFaculty(student=student, faculty=faculty, status='active')
+                                            for student in students])
+        for classroom in classrooms:
+            classroom.students.add(*students)
+
+    def run_mode(self, options):
+        tag = options['tag']
+        students = list(CustomUser.objects.filter(email__startswith=f'asgi-{tag}-', user_type='student'))
+        classroom_ids = list(Classroom.objects.filter(subject__name=f'asgi-{tag}').values_list('id', flat=True))
+        urls = ['/profile/', '/homeworks/'] + [f'/classroom/{classroom_ids[0]}/',
+                                               f'/classroom/{classroom_ids[0]}/homework/']
+        cookies = []
+        for student in students:
+            client = Client()
+            client.force_login(student)
+            cookies.append(client.cookies)
+        connection.close()
+
+        plan = [(urls[i % len(urls)], cookies[i % len(cookies)]) for i in range(options['requests'])]
+        if options['mode'] == 'wsgi':
+            timings, elapsed = self.drive_wsgi(plan, options['concurrency'])
+        else:
+            timings, elapsed = asyncio.run(self.drive_asgi(plan, options['concurrency']))
+
+        results = {}
+        for url in urls:
+            samples = [ms for request_url, ok, ms in timings if request_url == url and ok]
+            errors = sum(1 for request_url, ok, _ in timings if request_url == url and not ok)
+            results[url] = summarize(samples, errors, elapsed)
+        results['all'] = summarize([ms for _, ok, ms in timings if ok],
+                                   sum(1 for _, ok, _ in timings if not ok), elapsed)
+        return results
+
+    def drive_wsgi(self, plan, concurrency):
+        def fetch(item):
+            url, cookies = item
+            client = Client()
+            client.cookies = cookies
+            start = time.perf_counter()
+            try:
+                ok = client.get(url).status_code == 200
+            except Exception:
+                ok = False
+            finally:
+                connection.close()
+            return url, ok, (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            timings = list(pool.map(fetch, plan))
+        return timings, time.perf_counter() - start
+
+    async def drive_asgi(self, plan, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(item):
+            url, cookies = item
+            client = AsyncClient()
+            client.cookies = cookies
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    ok = (await client.get(url)).status_code == 200
+                except Exception:
+                    ok = False
+                return url, ok, (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        timings = await asyncio.gather(*(fetch(item) for item in plan))
+        return timings, time.perf_counter() - start
@@ -0,0 +1,105 @@
+import datetime
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from faculty.benchmarking import summarize
+from faculty.models import Classroom, ClassroomCalendar, Subject
+from faculty.scheduling import create_sessions, expand_sessions
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = ("Measure concurrent join_classroom and attendance saves against the configured database "
+            "profile. Run once per DB_PROFILE to compare them.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=300)
+        parser.add_argument('--capacity', type=int, default=200)
+        parser.add_argument('--sessions', type=int, default=30)
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument('--json', action='store_true', help="Print results as JSON")
+
+    def _timed(self, fn, items, workers):
+        def run(item):
+            start = time.perf_counter()
+            try:
+                response = fn(item)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            finally:
+                connection.close()
+            return ok, (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run, items))
+        elapsed = time.perf_counter() - start
+        samples = [round(ms, 3) for ok, ms in results if ok]
+        return summarize(samples, len(results) - len(samples), elapsed)
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8]
+        password = make_password(None)
+        lecturer = CustomUser.objects.create(email=f'bench-{tag}-lecturer@example.com', user_type='lecturer',
+                                             password=password, first_name='Bench', last_name='Lecturer')
+        subject = Subject.objects.create(name=f'bench-{tag}', description='database benchmark')
+        classroom = Classroom.objects.create(subject=subject, lecturer=lecturer, max_students=options['capacity'])
+        students = CustomUser.objects.bulk_create([
+            CustomUser(email=f'bench-{tag}-{i}@example.com', user_type='student', password=password,
+                       first_name='Bench', last_name=str(i))
+            for i in range(options['students'])
+        ])
+        create_sessions(expand_sessions(classroom, datetime.date.today(), range(5), datetime.time(9, 0),
+                                        options['sessions']))
+        session_ids = list(ClassroomCalendar.objects.filter(classroom=classroom).values_list('id', flat=True))
+
+        def logged_in(user):
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(user)
+            return client
+
+        try:
+            student_clients = [(student, logged_in(student)) for student in students]
+            lecturer_client = logged_in(lecturer)
+
+            join_url = reverse('faculty:join_classroom', args=[classroom.id])
+            joins = self._timed(lambda pair: pair[1].get(join_url), student_clients, options['workers'])
+
+            enrolled = list(classroom.students.values_list('id', flat=True))
+
+            def save_attendance(session_id):
+                # clients are not thread safe; share the lecturer's session cookie instead
+                client = Client(HTTP_HOST='localhost')
+                client.cookies = lecturer_client.cookies
+                data = {str(student_id): 'on' for student_id in enrolled[::2]}
+                return client.post(reverse('faculty:attendance', args=[classroom.id, session_id]), data)
+
+            attendance = self._timed(save_attendance, session_ids, options['workers'])
+
+            results = {
+                'db_profile': settings.DB_PROFILE,
+                'vendor': connection.vendor,
+                'workers': options['workers'],
+                'join_classroom': joins,
+                'attendance_save': attendance,
+            }
+        finally:
+            CustomUser.objects.filter(email__startswith=f'bench-{tag}-').delete()
+            subject.delete()
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            for name in ('join_classroom', 'attendance_save'):
+                self.stdout.write(f"{results['db_profile']} {name}: {results[name]}")
+
@@ -0,0 +1,205 @@
+import datetime
+import itertools
+import json
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from faculty.benchmarking import percentile, summarize
+from faculty.seeding import SEED_PASSWORD, drop_university, seed_university
+from users.choices import UserTypeChoicesForm
+from users.models import CustomUser
+
+# form posts that redirect on success; a 200 means the form was re-rendered with errors
+REDIRECTING_FLOWS = {'register', 'login', 'submit_homework', 'attendance'}
+DEFAULT_MIX = 'profile=30,homework_list=20,submit_homework=15,join_classroom=10,attendance=10,login=10,register=5'
+
+
+class Command(BaseCommand):
+    help = ("Seed a synthetic university, replay a weighted mix of LMS flows through the test client and "
+            "report throughput, latency percentiles and query counts per flow. Results can be written to "
+            "JSON and compared with an earlier run.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--faculties', type=int, default=2)
+        parser.add_argument('--subjects', type=int, default=6)
+        parser.add_argument('--classrooms', type=int, default=12)
+        parser.add_argument('--students', type=int, default=200)
+        parser.add_argument('--sessions', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=300)
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--mix', default=DEFAULT_MIX, help="flow=weight pairs, comma separated")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for data and request order")
+        parser.add_argument('--output', help="Write the results to this JSON file")
+        parser.add_argument('--compare', help="Print the change against a results file of an earlier run")
+        parser.add_argument('--keep', action='store_true', help="Keep the seeded data")
+        parser.add_argument('--login-throttle', action='store_true',
+                            help="Keep login throttling on; every replayed request comes from one client IP")
+
+    def handle(self, *args, **options):
+        mix = self.parse_mix(options['mix'])
+        rng = random.Random(options['seed'])
+        tag = uuid.uuid4().hex[:8]
+
+        start = time.perf_counter()
+        university = seed_university(tag, faculties=options['faculties'], subjects=options['subjects'],
+                                     classrooms=options['classrooms'], students=options['students'],
+                                     sessions=options['sessions'], rng=rng)
+        seed_seconds = time.perf_counter() - start
+
+        try:
+            # the test client sends Host: testserver
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                                   LOGIN_THROTTLE=settings.LOGIN_THROTTLE and options['login_throttle']):
+                flows = self.replay(university, mix, options['requests'], options['workers'], rng)
+        finally:
+            if not options['keep']:
+                drop_university(tag)
+
+        results = {
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'vendor': connection.vendor,
+            'db_profile': settings.DB_PROFILE,
+            'password_hasher': settings.PASSWORD_HASHER_PROFILE,
+            'async_views': settings.ASYNC_VIEWS,
+            'session_engine': settings.SESSION_ENGINE,
+            'login_throttle': settings.LOGIN_THROTTLE and options['login_throttle'],
+            'size': {name: options[name] for name in ('faculties', 'subjects', 'classrooms', 'students', 'sessions')},
+            'seed_seconds': round(seed_seconds, 3),
+            'requests': options['requests'],
+            'workers': options['workers'],
+            'mix': mix,
+            'flows': flows,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as stream:
+                json.dump(results, stream, indent=2)
+
+        for flow, stats in flows.items():
+            self.stdout.write(f'{flow:<16} {stats}')
+        if options['compare']:
+            with open(options['compare']) as stream:
+                self.compare(json.load(stream), results)
+
+    def parse_mix(self, value):
+        mix = {}
+        for pair in value.split(','):
+            flow, _, weight = pair.partition('=')
+            if not hasattr(self, f'flow_{flow.strip()}'):
+                raise CommandError(f'unknown flow {flow!r}')
+            mix[flow.strip()] = int(weight or 1)
+        return mix
+
+    def replay(self, university, mix, requests, workers, rng):
+        students = {user.id: user for user in CustomUser.objects.filter(id__in=university.student_ids)}
+        lecturers = {user.id: user for user in CustomUser.objects.filter(id__in=university.lecturer_ids)}
+        cookies = {}
+        for user in [*students.values(), *lecturers.values()]:
+            client = Client()
+            client.force_login(user)
+            cookies[user.id] = client.cookies
+        connection.close()
+
+        self.university = university
+        self.students = list(students.values())
+        self.registrations = itertools.count()
+        flows = rng.choices(list(mix), weights=list(mix.values()), k=requests)
+        plan = [(flow, random.Random(rng.random())) for flow in flows]
+
+        def run(item):
+            flow, flow_rng = item
+            queries = ()
+            start = time.perf_counter()
+            try:
+                with CaptureQueriesContext(connection) as queries:
+                    response = getattr(self, f'flow_{flow}')(cookies, flow_rng)
+                ok = response.status_code == 302 if flow in REDIRECTING_FLOWS else response.status_code < 400
+            except Exception:
+                ok = False
+            finally:
+                connection.close()
+            return flow, ok, (time.perf_counter() - start) * 1000, len(queries)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            timings = list(pool.map(run, plan))
+        elapsed = time.perf_counter() - start
+
+        results = {}
+        for flow in [*mix, 'all']:
+            rows = [row for row in timings if flow == 'all' or row[0] == flow]
+            samples = [round(ms, 3) for _, ok, ms, _ in rows if ok]
+            results[flow] = summarize(samples, len(rows) - len(samples), elapsed)
+            query_counts = sorted(count for _, ok, _, count in rows if ok)
+            results[flow]['queries_p50'] = percentile(query_counts, 50)
+            results[flow]['queries_max'] = query_counts[-1] if query_counts else None
+        return results
+
+    def compare(self, before, after):
+        self.stdout.write(f"compared with {before.get('created_at')}:")
+        for flow, stats in after['flows'].items():
+            old = before.get('flows', {}).get(flow)
+            if not old:
+                continue
+            changes = []
+            for key in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms', 'queries_p50'):
+                if old.get(key) and stats.get(key) is not None:
+                    changes.append(f'{key} {(stats[key] - old[key]) / old[key]:+.1%}')
+            self.stdout.write(f"{flow:<16} {', '.join(changes)}")
+
+    def client(self, cookies, user_id):
+        # clients are not thread safe; each request gets its own, sharing the session cookie
+        client = Client()
+        client.cookies = cookies[user_id]
+        return client
+
+    def enrolled(self, rng):
+        classroom_id = rng.choice([pk for pk, members in self.university.enrollments.items() if members])
+        return classroom_id, rng.choice(self.university.enrollments[classroom_id])
+
+    def flow_register(self, cookies, rng):
+        n = next(self.registrations)
+        password = f'{SEED_PASSWORD}-{n}'
+        return Client().post(reverse('users:register'), {
+            'email': f'seed-{self.university.tag}-r{n}@example.com', 'user_type': UserTypeChoicesForm.STUDENT,
+            'first_name': 'Registered', 'last_name': str(n), 'password1': password, 'password2': password,
+        })
+
+    def flow_login(self, cookies, rng):
+        return Client().post(reverse('users:login'), {'email': rng.choice(self.students).email,
+                                                      'password': SEED_PASSWORD})
+
+    def flow_profile(self, cookies, rng):
+        return self.client(cookies, rng.choice(self.students).id).get(reverse('faculty:profile'))
+
+    def flow_homework_list(self, cookies, rng):
+        return self.client(cookies, rng.choice(self.students).id).get(reverse('faculty:homework_list'))
+
+    def flow_join_classroom(self, cookies, rng):
+        classroom_id = rng.choice(self.university.classroom_ids)
+        return self.client(cookies, rng.choice(self.students).id).get(
+            reverse('faculty:join_classroom', args=[classroom_id]))
+
+    def flow_submit_homework(self, cookies, rng):
+        classroom_id, student_id = self.enrolled(rng)
+        homework_id = rng.choice(self.university.homeworks[classroom_id])
+        return self.client(cookies, student_id).post(
+            reverse('faculty:homework_submission', args=[classroom_id, homework_id]),
+            {'homework_url': 'https://example.com/solution', 'homework_text': 'synthetic answer'})
+
+    def flow_attendance(self, cookies, rng):
+        classroom_id, _ = self.enrolled(rng)
+        session_id = rng.choice(self.university.sessions[classroom_id])
+        present = rng.sample(self.university.enrollments[classroom_id],
+                             len(self.university.enrollments[classroom_id]) // 2)
+        return self.client(cookies, self.university.lecturers[classroom_id]).post(
+            reverse('faculty:attendance', args=[classroom_id, session_id]),
+            {str(student_id): 'on' for student_id in present})
@@ -0,0 +1,80 @@
+import datetime
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from faculty.models import ClassroomCalendar
+from faculty.scheduling import Timetable, _interval, find_enrollment_conflicts
+
+
+def naive_clashes(sessions, session):
+    start, end = _interval(session)
+    for existing in sessions:
+        existing_start, existing_end = _interval(existing)
+        if start < existing_end and existing_start < end:
+            return True
+    return False
+
+
+class Command(BaseCommand):
+    help = ("Compare the Timetable interval index (faculty.scheduling) with a pairwise scan on a synthetic "
+            "timetable, and optionally time the join-path check for a real student and classroom.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, default=2000, help="Sessions in the timetable")
+        parser.add_argument('--queries', type=int, default=2000, help="Sessions checked against it")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--student', type=int, help="Also time find_enrollment_conflicts for this student")
+        parser.add_argument('--classroom', type=int, help="... joining this classroom")
+        parser.add_argument('--json', action='store_true', help="Print results as JSON")
+
+    def _synthetic(self, rng, count):
+        first = datetime.date.today()
+        return [ClassroomCalendar(date=first + datetime.timedelta(days=rng.randrange(365)),
+                                  start_time=datetime.time(rng.randrange(8, 20), rng.choice((0, 15, 30, 45))),
+                                  duration=rng.randint(1, 3))
+                for _ in range(count)]
+
+    def handle(self, *args, **options):
+        if (options['student'] is None) != (options['classroom'] is None):
+            raise CommandError('--student and --classroom go together')
+        rng = random.Random(options['seed'])
+        sessions = self._synthetic(rng, options['sessions'])
+        queries = self._synthetic(rng, options['queries'])
+
+        start = time.perf_counter()
+        naive = [naive_clashes(sessions, session) for session in queries]
+        naive_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        timetable = Timetable(sessions)
+        build_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        indexed = [timetable.clashes(session) for session in queries]
+        indexed_ms = (time.perf_counter() - start) * 1000
+        if indexed != naive:
+            raise CommandError('the index and the pairwise scan disagree')
+
+        results = {
+            'sessions': len(sessions),
+            'queries': len(queries),
+            'clashes': sum(naive),
+            'pairwise_ms': round(naive_ms, 3),
+            'pairwise_us_per_query': round(naive_ms * 1000 / len(queries), 3),
+            'index_build_ms': round(build_ms, 3),
+            'index_ms': round(indexed_ms, 3),
+            'index_us_per_query': round(indexed_ms * 1000 / len(queries), 3),
+        }
+        if options['student'] is not None:
+            start = time.perf_counter()
+            conflicts = find_enrollment_conflicts(options['student'], options['classroom'])
+            results['join_check_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            results['join_conflicts'] = len(conflicts)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            for name, value in results.items():
+                self.stdout.write(f'{name:<24} {value}')
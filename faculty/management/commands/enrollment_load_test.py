@@ -0,0 +1,58 @@
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, OperationalError
+
+from faculty.enrollment import enroll
+from faculty.models import Classroom, Subject
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Fire concurrent join attempts at one classroom and check max_students is never exceeded."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--capacity', type=int, default=30)
+        parser.add_argument('--workers', type=int, default=32)
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8]
+        password = make_password(None)
+        lecturer = CustomUser.objects.create(email=f'load-{tag}-lecturer@example.com', user_type='lecturer',
+                                             password=password)
+        subject = Subject.objects.create(name=f'load-{tag}', description='enrollment load test')
+        classroom = Classroom.objects.create(subject=subject, lecturer=lecturer, max_students=options['capacity'])
+        students = CustomUser.objects.bulk_create([
+            CustomUser(email=f'load-{tag}-{i}@example.com', user_type='student', password=password)
+            for i in range(options['students'])
+        ])
+
+        def attempt(student):
+            try:
+                return enroll(classroom.id, student)
+            except OperationalError:
+                return 'error'
+            finally:
+                connection.close()
+
+        try:
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                results = Counter(pool.map(attempt, students))
+
+            classroom.refresh_from_db()
+            enrolled = classroom.students.count()
+            self.stdout.write(f"results: {dict(results)}")
+            self.stdout.write(f"enrolled: {enrolled}, counter: {classroom.enrolled_count}, "
+                              f"max_students: {classroom.max_students}, is_full: {classroom.is_full}")
+            if enrolled > classroom.max_students:
+                raise CommandError('max_students exceeded')
+            if enrolled != classroom.enrolled_count:
+                raise CommandError('enrolled_count drifted from the students M2M')
+            self.stdout.write(self.style.SUCCESS('capacity held'))
+        finally:
+            CustomUser.objects.filter(email__startswith=f'load-{tag}-').delete()
+            subject.delete()
@@ -0,0 +1,55 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from faculty.models import StudentHomework, ClassroomAttendance, StudentFaculty, Homework, ClassroomCalendar, \
+    Notification
+
+# Plan fragments that mean the table is read through an index.
+INDEX_MARKERS = ('USING INDEX', 'USING COVERING INDEX', 'USING INTEGER PRIMARY KEY',
+                 'Index Scan', 'Index Only Scan', 'Bitmap Index Scan')
+
+
+def hot_queries():
+    now = timezone.now()
+    return {
+        'homework_detail: StudentHomework(student, homework)':
+            StudentHomework.objects.filter(student_id=1, homework_id=1),
+        'homework_list: StudentHomework(student)':
+            StudentHomework.objects.filter(student_id=1),
+        'attendance form: ClassroomAttendance(classroom_date)':
+            ClassroomAttendance.objects.filter(classroom_date_id=1),
+        'attendance form: ClassroomAttendance(classroom_date, student)':
+            ClassroomAttendance.objects.filter(classroom_date_id=1, student_id=1),
+        'profile_view: StudentFaculty(student, status)':
+            StudentFaculty.objects.filter(student_id=1, status='active'),
+        'homework_view: Homework(classroom) ordered by is_active, due_date':
+            Homework.objects.filter(classroom_id=1).order_by('-is_active', '-due_date'),
+        'deadlines: Homework(due_date) WHERE is_active range':
+            Homework.objects.filter(is_active=True, due_date__gt=now, due_date__lte=now + datetime.timedelta(hours=24)),
+        'deadlines: Notification(recipient, homework, kind)':
+            Notification.objects.filter(recipient_id=1, homework_id=1, kind='deadline'),
+        'calendar: ClassroomCalendar(classroom, date)':
+            ClassroomCalendar.objects.filter(classroom_id=1, date__gte=now.date()),
+    }
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN on the hot lookup queries and fail if any of them scans a table."
+
+    def handle(self, *args, **options):
+        scans = []
+        for name, queryset in hot_queries().items():
+            plan = queryset.explain()
+            uses_index = any(marker in plan for marker in INDEX_MARKERS)
+            status = self.style.SUCCESS('index') if uses_index else self.style.ERROR('scan')
+            self.stdout.write(f'[{status}] {name}')
+            self.stdout.write('    ' + plan.replace('\n', '\n    '))
+            if not uses_index:
+                scans.append(name)
+
+        if scans:
+            raise CommandError(f'{len(scans)} hot queries do not use an index on {connection.vendor}: '
+                               + ', '.join(scans))
@@ -0,0 +1,26 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from faculty.roster import EXPORTERS, write_rows
+
+
+class Command(BaseCommand):
+    help = "Stream users, faculty memberships or classroom enrollments out as CSV/JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTERS))
+        parser.add_argument('path', nargs='?', default='-', help="File to write, defaults to stdout")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default=None,
+                            help="Defaults to the file extension, csv for stdout")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.json')) else 'csv')
+        fields, rows = EXPORTERS[options['kind']]
+
+        if path == '-':
+            write_rows(sys.stdout, fmt, fields, rows())
+        else:
+            with open(path, 'w', newline='', encoding='utf-8') as stream:
+                write_rows(stream, fmt, fields, rows())
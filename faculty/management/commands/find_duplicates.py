@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from faculty.models import StudentHomework
+from faculty.similarity import duplicate_pairs, rebuild_signatures
+
+
+class Command(BaseCommand):
+    help = ("Report near-duplicate homework submissions (faculty.similarity): MinHash signatures bucketed "
+            "by LSH band, so only submissions sharing a bucket are compared. Signatures are kept up to "
+            "date by the faculty.submission_signature job; --rebuild recomputes them first.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--homework', type=int, help="Only submissions for this homework")
+        parser.add_argument('--subject', type=int, help="Only submissions in this subject's classrooms")
+        parser.add_argument('--threshold', type=float, help="Minimum estimated similarity (0-1)")
+        parser.add_argument('--rebuild', action='store_true', help="Recompute the signatures in scope first")
+
+    def handle(self, *args, **options):
+        homework_id, subject_id, threshold = options['homework'], options['subject'], options['threshold']
+        if threshold is not None and not 0 < threshold <= 1:
+            raise CommandError('--threshold must be in (0, 1]')
+        if options['rebuild']:
+            submissions = StudentHomework.objects.all()
+            if homework_id is not None:
+                submissions = submissions.filter(homework_id=homework_id)
+            if subject_id is not None:
+                submissions = submissions.filter(classroom__subject_id=subject_id)
+            written = rebuild_signatures(submissions)
+            self.stdout.write(f'{written} signatures written')
+
+        pairs = duplicate_pairs(homework_id, subject_id, threshold)
+        submissions = StudentHomework.objects.select_related('student', 'homework') \
+            .in_bulk({submission_id for pair in pairs for submission_id in pair[:2]})
+        for a, b, score in pairs:
+            first, second = submissions[a], submissions[b]
+            self.stdout.write(f'{score:.2f}  #{a} {first.student} ({first.homework.title})  '
+                              f'#{b} {second.student} ({second.homework.title})')
+        self.stdout.write(self.style.SUCCESS(f'{len(pairs)} similar pairs'))
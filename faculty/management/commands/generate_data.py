@@ -0,0 +1,47 @@
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from faculty.seeding import drop_university, generate_university
+
+
+class Command(BaseCommand):
+    help = ("Generate a large synthetic university (users, faculties, subjects, classrooms, enrollments, "
+            "sessions, attendance, homework and submissions) for scale testing. Rows are streamed in "
+            "chunks with bulk_create; remove them again with --drop TAG.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=10000)
+        parser.add_argument('--faculties', type=int, default=10)
+        parser.add_argument('--subjects', type=int, default=100)
+        parser.add_argument('--classrooms', type=int, default=500)
+        parser.add_argument('--sessions', type=int, default=30, help="Sessions per classroom")
+        parser.add_argument('--homeworks', type=int, default=8, help="Homework per classroom")
+        parser.add_argument('--classrooms-per-student', type=int, default=4)
+        parser.add_argument('--zipf', type=float, default=1.1, help="Zipf exponent of classroom popularity")
+        parser.add_argument('--chunk-size', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--tag', help="Tag for the generated rows (random by default)")
+        parser.add_argument('--drop', metavar='TAG', help="Delete the rows generated with TAG instead")
+
+    def handle(self, *args, **options):
+        if options['drop']:
+            drop_university(options['drop'])
+            self.stdout.write(f"dropped {options['drop']}")
+            return
+
+        tag = options['tag'] or uuid.uuid4().hex[:8]
+        start = time.perf_counter()
+        counts = generate_university(
+            tag, students=options['students'], faculties=options['faculties'], subjects=options['subjects'],
+            classrooms=options['classrooms'], sessions=options['sessions'], homeworks=options['homeworks'],
+            classrooms_per_student=options['classrooms_per_student'], zipf_exponent=options['zipf'],
+            chunk_size=options['chunk_size'], rng=random.Random(options['seed']),
+            log=self.stdout.write if options['verbosity'] > 1 else None,
+        )
+        elapsed = time.perf_counter() - start
+        for model, count in counts.items():
+            self.stdout.write(f'{model:<24} {count}')
+        self.stdout.write(self.style.SUCCESS(f'generated {sum(counts.values())} rows in {elapsed:.1f}s, tag {tag}'))
@@ -0,0 +1,43 @@
+import sys
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+
+from faculty.roster import IMPORTERS, chunked, read_rows
+from users.hashing import password_hasher_pool
+
+
+class Command(BaseCommand):
+    help = "Stream users, faculty memberships or classroom enrollments from CSV/JSONL into the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('path', help="File to read, or - for stdin")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default=None,
+                            help="Defaults to the file extension")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Password hashing processes (users only), defaults to the CPU count")
+
+    def handle(self, *args, **options):
+        kind = options['kind']
+        path = options['path']
+        fmt = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.json')) else 'csv')
+        importer = IMPORTERS[kind]
+
+        created = failed = 0
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        pool = password_hasher_pool(options['workers']) if kind == 'users' else nullcontext()
+        with stream, pool:
+            for chunk in chunked(read_rows(stream, fmt), options['batch_size']):
+                if kind == 'users':
+                    count, errors = importer(chunk, pool)
+                else:
+                    count, errors = importer(chunk)
+                created += count
+                failed += len(errors)
+                for line_number, message in errors:
+                    self.stderr.write(f'line {line_number}: {message}')
+                self.stdout.write(f'{kind}: {created} created, {failed} rejected')
+
+        self.stdout.write(self.style.SUCCESS(f'Imported {created} {kind}, rejected {failed}'))
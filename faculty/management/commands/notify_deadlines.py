@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from faculty.deadlines import close_expired_homework, due_homework, notify_deadlines, pending_notifications
+from faculty.jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = ("Notify students of homework due in the next hours that they have not submitted, and "
+            "deactivate homework past its due date. Meant to run from cron every few minutes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, help="Look-ahead window, settings.DEADLINE_NOTIFY_HOURS by default")
+        parser.add_argument('--dry-run', action='store_true', help="Only count what would be written")
+        parser.add_argument('--enqueue', action='store_true', help="Leave the work to a run_jobs worker")
+
+    def handle(self, *args, **options):
+        if options['enqueue']:
+            job = enqueue('faculty.notify_deadlines', hours=options['hours'])
+            if settings.JOBS_EAGER:
+                # run on commit, which under autocommit is already done
+                self.stdout.write(f'ran {job.name} in this process (JOBS_EAGER)')
+            else:
+                self.stdout.write(f'queued job {job.pk}')
+            return
+
+        now = timezone.now()
+        if options['dry_run']:
+            homework_ids = list(due_homework(options['hours'], now).values_list('id', flat=True))
+            pending = pending_notifications(homework_ids).count() if homework_ids else 0
+            self.stdout.write(f'{len(homework_ids)} homework due, {pending} notifications pending')
+            return
+
+        homework, written = notify_deadlines(options['hours'], now)
+        closed = close_expired_homework(now)
+        self.stdout.write(f'{homework} homework due, {written} notifications written, {closed} homework closed')
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from faculty.search import rebuild, supported
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the full-text search index of subjects, homework and submissions in bulk. Needed after "
+            "writes that bypass model signals, such as generate_data or raw imports.")
+
+    def handle(self, *args, **options):
+        if not supported():
+            raise CommandError(f'full-text search is not available on {connection.vendor}')
+        start = time.perf_counter()
+        counts = rebuild()
+        for kind, rows in counts.items():
+            self.stdout.write(f'{kind:<12} {rows} rows')
+        self.stdout.write(self.style.SUCCESS(f'search index rebuilt in {time.perf_counter() - start:.1f}s'))
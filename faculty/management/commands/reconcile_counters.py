@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from faculty.analytics import refresh_attendance_summary
+from faculty.counters import counter_drift, recount_attendance, recount_submissions
+from faculty.enrollment import recount_enrollment
+from faculty.jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = ("Report and repair drift in the denormalized counters (Classroom.enrolled_count/is_full, "
+            "Homework.submission_count, ClassroomCalendar.present_count/attendance_taken) with set-based "
+            "UPDATEs. Drift comes from writes that bypass faculty.signals, such as cascading user deletes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report drift")
+        parser.add_argument('--summary', action='store_true', help="Also rebuild AttendanceSummary")
+        parser.add_argument('--enqueue', action='store_true', help="Leave the repair to a run_jobs worker")
+
+    def handle(self, *args, **options):
+        drift = counter_drift()
+        for counter, rows in drift.items():
+            self.stdout.write(f'{counter:<32} {rows} rows out of step')
+        if options['dry_run']:
+            return
+        if options['enqueue']:
+            job = enqueue('faculty.reconcile_counters', summary=options['summary'])
+            if settings.JOBS_EAGER:
+                # run on commit, which under autocommit is already done
+                self.stdout.write(f'ran {job.name} in this process (JOBS_EAGER)')
+            else:
+                self.stdout.write(f'queued job {job.pk}')
+            return
+
+        with transaction.atomic():
+            recount_enrollment()
+            recount_submissions()
+            recount_attendance()
+            if options['summary']:
+                rows = refresh_attendance_summary()
+                self.stdout.write(f'AttendanceSummary rebuilt, {rows} rows')
+        self.stdout.write(self.style.SUCCESS('counters reconciled'))
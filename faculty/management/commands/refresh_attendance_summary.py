@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from faculty.analytics import refresh_attendance_summary
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the AttendanceSummary table from ClassroomAttendance, e.g. after bulk loads that "
+            "bypass faculty.attendance.apply_attendance().")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--classroom', type=int, action='append', dest='classrooms',
+                            help="Only rebuild this classroom (repeatable)")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        rows = refresh_attendance_summary(options['classrooms'])
+        self.stdout.write(self.style.SUCCESS(f'{rows} summary rows in {time.perf_counter() - start:.2f}s'))
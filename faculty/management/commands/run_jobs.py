@@ -0,0 +1,80 @@
+import signal
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from faculty.jobs import claim, purge_finished, requeue_stale, run, worker_id
+
+MAINTENANCE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = ("Run queued background jobs (faculty.jobs) in one or more worker processes. Workers claim due "
+            "jobs from the Job table, retry failures with backoff and requeue jobs of workers that died.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help="Worker processes to run")
+        parser.add_argument('--batch', type=int, default=1, help="Jobs claimed per poll")
+        parser.add_argument('--poll', type=float, default=settings.JOB_POLL_INTERVAL,
+                            help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--once', action='store_true', help="Exit once no job is due")
+
+    def handle(self, *args, **options):
+        if options['processes'] > 1:
+            return self.supervise(options)
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        worker = worker_id()
+        self.stdout.write(f'worker {worker} started')
+        processed = failed = 0
+        last_maintenance = 0
+        try:
+            while not self.stopping:
+                close_old_connections()
+                if time.monotonic() - last_maintenance > MAINTENANCE_INTERVAL:
+                    requeue_stale()
+                    purge_finished(settings.JOB_RETENTION)
+                    last_maintenance = time.monotonic()
+                jobs = claim(worker, options['batch'])
+                if not jobs:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll'])
+                    continue
+                for job in jobs:
+                    if run(job):
+                        processed += 1
+                    else:
+                        failed += 1
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'worker {worker} stopped, {processed} jobs done, {failed} failed')
+
+    def stop(self, signum, frame):
+        # finish the claimed jobs, then leave the loop
+        self.stopping = True
+
+    def supervise(self, options):
+        command = [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'run_jobs', '--batch', str(options['batch']),
+                   '--poll', str(options['poll'])]
+        if options['once']:
+            command.append('--once')
+        children = [subprocess.Popen(command) for _ in range(options['processes'])]
+
+        def forward(signum, frame):
+            for child in children:
+                child.send_signal(signum)
+
+        signal.signal(signal.SIGTERM, forward)
+        try:
+            for child in children:
+                child.wait()
+        except KeyboardInterrupt:
+            # the children got the SIGINT from the terminal too
+            for child in children:
+                child.wait()
@@ -0,0 +1,190 @@
+import contextvars
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from faculty.benchmarking import percentile
+
+QUANTILES = (50, 95, 99)
+FIELDS = ('wall_ms', 'db_ms', 'db_queries', 'template_ms')
+
+# metrics of the request being served; copied into sync_to_async threads, so queries
+# and renders of async views are attributed too
+current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('db_queries', 'db_ms', 'template_ms')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_ms += (time.perf_counter() - start) * 1000
+
+
+def track_queries(sender, connection, **kwargs):
+    """
+    connection_created hook: time every query on the connection for RequestMetricsMiddleware.
+    """
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def record_template(elapsed_ms):
+    metrics = current.get()
+    if metrics is not None:
+        metrics.template_ms += elapsed_ms
+
+
+class Registry:
+    """
+    Per-process rolling window of the last `window` requests of every view, plus
+    cumulative counts and sums for Prometheus and labelled event counters.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.totals = {}
+        self.counters = {}
+        self.descriptions = {}
+        self.collectors = []
+
+    def observe(self, view, wall_ms, metrics):
+        values = (wall_ms, metrics.db_ms, metrics.db_queries, metrics.template_ms)
+        with self.lock:
+            if view not in self.samples:
+                self.samples[view] = deque(maxlen=self.window)
+                self.totals[view] = [0] + [0.0] * len(FIELDS)
+            self.samples[view].append(values)
+            totals = self.totals[view]
+            totals[0] += 1
+            for i, value in enumerate(values, start=1):
+                totals[i] += value
+
+    def describe(self, name, help_text):
+        self.descriptions[name] = help_text
+
+    def collect(self, collector):
+        """
+        Add a callable run at scrape time, returning [(name, type, help, [(labels, value)])]
+        for state kept outside this process, such as the job queue.
+        """
+        self.collectors.append(collector)
+
+    def collected(self):
+        """
+        {name: {'label=value,...': value}} from the collectors.
+        """
+        result = {}
+        for collector in self.collectors:
+            for name, _, _, samples in collector():
+                result[name] = {','.join(f'{key}={text}' for key, text in labels.items()): value
+                                for labels, value in samples}
+        return result
+
+    def increment(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+            self.totals.clear()
+            self.counters.clear()
+
+    def snapshot(self):
+        """
+        {view: {'count': n, 'wall_ms': {'p50': .., 'p95': .., 'p99': ..}, ...}}
+        over the rolling window; 'count' is cumulative.
+        """
+        with self.lock:
+            samples = {view: list(values) for view, values in self.samples.items()}
+            counts = {view: totals[0] for view, totals in self.totals.items()}
+        result = {}
+        for view, values in sorted(samples.items()):
+            result[view] = {'count': counts[view]}
+            for i, field in enumerate(FIELDS):
+                column = sorted(value[i] for value in values)
+                result[view][field] = {f'p{q}': percentile(column, q) for q in QUANTILES}
+        return result
+
+    def counter_snapshot(self):
+        """
+        {name: {'label=value,...': count}}
+        """
+        with self.lock:
+            counters = dict(self.counters)
+        result = {}
+        for (name, labels), count in sorted(counters.items()):
+            result.setdefault(name, {})[','.join(f'{key}={value}' for key, value in labels)] = count
+        return result
+
+    def prometheus(self):
+        """
+        The snapshot in Prometheus text exposition format, as summaries in seconds.
+        """
+        snapshot = self.snapshot()
+        with self.lock:
+            totals = {view: list(values) for view, values in self.totals.items()}
+        lines = []
+        for i, (field, name, help_text) in enumerate([
+            ('wall_ms', 'lms_request_duration_seconds', 'Wall time of the request.'),
+            ('db_ms', 'lms_request_db_duration_seconds', 'Time spent in database queries.'),
+            ('db_queries', 'lms_request_db_queries', 'Database queries per request.'),
+            ('template_ms', 'lms_request_template_duration_seconds', 'Time spent rendering templates.'),
+        ]):
+            scale = 1 if field == 'db_queries' else 1000
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} summary')
+            for view, stats in snapshot.items():
+                label = _label(view)
+                for q in QUANTILES:
+                    value = stats[field][f'p{q}']
+                    lines.append(f'{name}{{view="{label}",quantile="0.{q}"}} {_number(value, scale)}')
+                lines.append(f'{name}_sum{{view="{label}"}} {_number(totals[view][i + 1], scale)}')
+                lines.append(f'{name}_count{{view="{label}"}} {totals[view][0]}')
+        with self.lock:
+            counters = dict(self.counters)
+        names = sorted({name for name, _ in counters})
+        for name in names:
+            lines.append(f'# HELP {name} {self.descriptions.get(name, name)}')
+            lines.append(f'# TYPE {name} counter')
+            for (counter, labels), count in sorted(counters.items()):
+                if counter == name:
+                    label = ','.join(f'{key}="{_label(str(value))}"' for key, value in labels)
+                    lines.append(f'{name}{{{label}}} {count}')
+        for collector in self.collectors:
+            for name, kind, help_text, samples in collector():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    label = ','.join(f'{key}="{_label(str(text))}"' for key, text in labels.items())
+                    lines.append(f'{name}{{{label}}} {_number(value, 1)}' if label else f'{name} {_number(value, 1)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _label(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _number(value, scale):
+    return 'NaN' if value is None else repr(round(value / scale, 6))
+
+
+registry = Registry(getattr(settings, 'REQUEST_METRICS_WINDOW', 1000))
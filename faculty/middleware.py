@@ -0,0 +1,64 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from faculty import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """
+    Time every request: wall time, number and time of DB queries and template
+    rendering. Feeds faculty.metrics.registry, adds a Server-Timing header when
+    settings.SERVER_TIMING is on and logs requests slower than SLOW_REQUEST_MS.
+    Works for both sync and async stacks; put it first in MIDDLEWARE.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request_metrics, token, start = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        return self.finish(request, response, request_metrics, start)
+
+    async def __acall__(self, request):
+        request_metrics, token, start = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        return self.finish(request, response, request_metrics, start)
+
+    def start(self):
+        request_metrics = metrics.RequestMetrics()
+        return request_metrics, metrics.current.set(request_metrics), time.perf_counter()
+
+    def finish(self, request, response, request_metrics, start):
+        wall_ms = (time.perf_counter() - start) * 1000
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        metrics.registry.observe(view, wall_ms, request_metrics)
+
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'app;dur={wall_ms:.1f}, '
+                f'db;dur={request_metrics.db_ms:.1f};desc="{request_metrics.db_queries} queries", '
+                f'tpl;dur={request_metrics.template_ms:.1f}'
+            )
+        if wall_ms >= settings.SLOW_REQUEST_MS:
+            logger.warning('slow request view=%s method=%s status=%s wall_ms=%.1f db_queries=%d db_ms=%.1f '
+                           'template_ms=%.1f', view, request.method, response.status_code, wall_ms,
+                           request_metrics.db_queries, request_metrics.db_ms, request_metrics.template_ms)
+        return response
@@ -0,0 +1,120 @@
+# Generated by Django 5.0.4 on 2026-10-18 12:52
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Classroom',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_full', models.BooleanField(default=False, verbose_name='Is Full')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Is Active')),
+                ('max_students', models.IntegerField(default=20, verbose_name='Max Students')),
+                ('syllabus', models.FileField(blank=True, null=True, upload_to='syllabus/', verbose_name='Syllabus')),
+                ('number_of_classes', models.IntegerField(default=10, verbose_name='Number of Classes')),
+            ],
+            options={
+                'verbose_name': 'Classroom',
+                'verbose_name_plural': 'Classrooms',
+            },
+        ),
+        migrations.CreateModel(
+            name='ClassroomAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.BooleanField(default=False, verbose_name='Status')),
+            ],
+            options={
+                'verbose_name': 'Classroom Attendance',
+                'verbose_name_plural': 'Classroom Attendances',
+            },
+        ),
+        migrations.CreateModel(
+            name='ClassroomCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('start_time', models.TimeField(verbose_name='Start Time')),
+                ('duration', models.IntegerField(default=2, verbose_name='Duration')),
+            ],
+            options={
+                'verbose_name': 'Classroom Calendar',
+                'verbose_name_plural': 'Classroom Calendars',
+            },
+        ),
+        migrations.CreateModel(
+            name='Faculty',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Name')),
+            ],
+            options={
+                'verbose_name': 'Faculty',
+                'verbose_name_plural': 'Faculties',
+            },
+        ),
+        migrations.CreateModel(
+            name='Homework',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=100, verbose_name='Title')),
+                ('description', models.TextField(verbose_name='Description')),
+                ('due_date', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Due_date')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Is_Active')),
+            ],
+            options={
+                'verbose_name': 'Homework',
+                'verbose_name_plural': 'Homeworks',
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentFaculty',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[(1, 'Active'), (2, 'Inactive'), (3, 'Graduated')], default='active', max_length=10, verbose_name='User Type')),
+            ],
+            options={
+                'verbose_name': 'Student Faculty',
+                'verbose_name_plural': 'Student Faculties',
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentHomework',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('homework_text', models.TextField(blank=True, default=None, null=True, verbose_name='Homework_text')),
+                ('homework_url', models.URLField(verbose_name='Homework URL')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StudentSubject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'verbose_name': 'Student Subject',
+                'verbose_name_plural': 'Student Subjects',
+            },
+        ),
+        migrations.CreateModel(
+            name='Subject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Name')),
+                ('description', models.TextField(verbose_name='Description')),
+            ],
+            options={
+                'verbose_name': 'Subject',
+                'verbose_name_plural': 'Subjects',
+            },
+        ),
+    ]
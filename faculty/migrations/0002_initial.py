@@ -0,0 +1,98 @@
+# Generated by Django 5.0.4 on 2026-10-18 12:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('faculty', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classroom',
+            name='lecturer',
+            field=models.ForeignKey(limit_choices_to={'user_type': 'lecturer'}, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Lecturers'),
+        ),
+        migrations.AddField(
+            model_name='classroom',
+            name='students',
+            field=models.ManyToManyField(limit_choices_to={'user_type': 'student'}, related_name='classrooms', to=settings.AUTH_USER_MODEL, verbose_name='Students'),
+        ),
+        migrations.AddField(
+            model_name='classroomattendance',
+            name='student',
+            field=models.ForeignKey(limit_choices_to={'user_type': 'student'}, on_delete=django.db.models.deletion.CASCADE, related_name='attendance', to=settings.AUTH_USER_MODEL, verbose_name='Student'),
+        ),
+        migrations.AddField(
+            model_name='classroomcalendar',
+            name='classroom',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calendar', to='faculty.classroom', verbose_name='Classroom'),
+        ),
+        migrations.AddField(
+            model_name='classroomattendance',
+            name='classroom_date',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance', to='faculty.classroomcalendar', verbose_name='Classroom'),
+        ),
+        migrations.AddField(
+            model_name='faculty',
+            name='lectures',
+            field=models.ManyToManyField(limit_choices_to={'user_type': 'lecturer'}, related_name='faculty', to=settings.AUTH_USER_MODEL, verbose_name='Lecturers'),
+        ),
+        migrations.AddField(
+            model_name='homework',
+            name='classroom',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='faculty.classroom', verbose_name='Classroom'),
+        ),
+        migrations.AddField(
+            model_name='studentfaculty',
+            name='faculty',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='faculty.faculty', verbose_name='Faculty'),
+        ),
+        migrations.AddField(
+            model_name='studentfaculty',
+            name='student',
+            field=models.ForeignKey(limit_choices_to={'user_type': 'student'}, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Student'),
+        ),
+        migrations.AddField(
+            model_name='studenthomework',
+            name='classroom',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='faculty.classroom', verbose_name='Classroom'),
+        ),
+        migrations.AddField(
+            model_name='studenthomework',
+            name='homework',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='faculty.homework', verbose_name='Homework'),
+        ),
+        migrations.AddField(
+            model_name='studenthomework',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='homework', to=settings.AUTH_USER_MODEL, verbose_name='Student'),
+        ),
+        migrations.AddField(
+            model_name='studentsubject',
+            name='classroom',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='faculty.classroom', verbose_name='Subject'),
+        ),
+        migrations.AddField(
+            model_name='studentsubject',
+            name='student',
+            field=models.ForeignKey(limit_choices_to={'user_type': 'student'}, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Student'),
+        ),
+        migrations.AddField(
+            model_name='faculty',
+            name='subjects',
+            field=models.ManyToManyField(related_name='faculty', to='faculty.subject', verbose_name='Subjects'),
+        ),
+        migrations.AddField(
+            model_name='classroom',
+            name='subject',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='faculty.subject', verbose_name='Subjects'),
+        ),
+    ]
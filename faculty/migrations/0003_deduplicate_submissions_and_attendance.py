@@ -0,0 +1,28 @@
+from django.db import migrations
+from django.db.models import Max
+
+
+def keep_latest(model, *fields):
+    # the row with the highest id of each group is the latest submission or mark
+    latest = model.objects.values(*fields).annotate(latest=Max('id')).values('latest')
+    model.objects.exclude(id__in=latest).delete()
+
+
+def deduplicate(apps, schema_editor):
+    """
+    Drop duplicate StudentHomework(student, homework) and ClassroomAttendance
+    (classroom_date, student) rows, which the unique constraints added next reject.
+    """
+    keep_latest(apps.get_model('faculty', 'StudentHomework'), 'student', 'homework')
+    keep_latest(apps.get_model('faculty', 'ClassroomAttendance'), 'classroom_date', 'student')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faculty', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,189 @@
+# Generated by Django 5.0.4 on 2026-10-18 12:52
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faculty', '0003_deduplicate_submissions_and_attendance'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attended', models.PositiveIntegerField(default=0, verbose_name='Attended')),
+            ],
+            options={
+                'verbose_name': 'Attendance Summary',
+                'verbose_name_plural': 'Attendance Summaries',
+            },
+        ),
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Name')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Payload')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('max_attempts', models.PositiveIntegerField(default=5, verbose_name='Max Attempts')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Run At')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Created At')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True, verbose_name='Heartbeat At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('locked_by', models.CharField(blank=True, max_length=64, verbose_name='Locked By')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last Error')),
+            ],
+            options={
+                'verbose_name': 'Job',
+                'verbose_name_plural': 'Jobs',
+            },
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('deadline', 'Deadline approaching')], max_length=20, verbose_name='Kind')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Created At')),
+                ('read_at', models.DateTimeField(blank=True, null=True, verbose_name='Read At')),
+            ],
+            options={
+                'verbose_name': 'Notification',
+                'verbose_name_plural': 'Notifications',
+            },
+        ),
+        migrations.CreateModel(
+            name='SubmissionBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(verbose_name='Key')),
+            ],
+            options={
+                'verbose_name': 'Submission Band',
+                'verbose_name_plural': 'Submission Bands',
+            },
+        ),
+        migrations.CreateModel(
+            name='SubmissionSignature',
+            fields=[
+                ('submission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='faculty.studenthomework', verbose_name='Submission')),
+                ('signature', models.BinaryField(verbose_name='Signature')),
+                ('shingles', models.PositiveIntegerField(verbose_name='Shingles')),
+            ],
+            options={
+                'verbose_name': 'Submission Signature',
+                'verbose_name_plural': 'Submission Signatures',
+            },
+        ),
+        migrations.AddField(
+            model_name='classroom',
+            name='enrolled_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Enrolled Count'),
+        ),
+        migrations.AddField(
+            model_name='classroomcalendar',
+            name='attendance_taken',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Attendance Taken'),
+        ),
+        migrations.AddField(
+            model_name='classroomcalendar',
+            name='present_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Present Count'),
+        ),
+        migrations.AddField(
+            model_name='homework',
+            name='submission_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Submission Count'),
+        ),
+        migrations.AddIndex(
+            model_name='classroomcalendar',
+            index=models.Index(fields=['classroom', 'date'], name='calendar_classroom_date'),
+        ),
+        migrations.AddIndex(
+            model_name='homework',
+            index=models.Index(fields=['classroom', '-is_active', '-due_date'], name='homework_classroom_active_due'),
+        ),
+        migrations.AddIndex(
+            model_name='homework',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['due_date'], name='homework_active_due'),
+        ),
+        migrations.AddIndex(
+            model_name='studentfaculty',
+            index=models.Index(fields=['student', 'status'], name='studentfaculty_student_status'),
+        ),
+        migrations.AddConstraint(
+            model_name='classroomattendance',
+            constraint=models.UniqueConstraint(fields=('classroom_date', 'student'), name='unique_attendance_student'),
+        ),
+        migrations.AddConstraint(
+            model_name='studenthomework',
+            constraint=models.UniqueConstraint(fields=('student', 'homework'), name='unique_student_homework'),
+        ),
+        migrations.AddField(
+            model_name='attendancesummary',
+            name='classroom',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summary', to='faculty.classroom', verbose_name='Classroom'),
+        ),
+        migrations.AddField(
+            model_name='attendancesummary',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summary', to=settings.AUTH_USER_MODEL, verbose_name='Student'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'run_at'], name='job_status_run_at'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='homework',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='faculty.homework', verbose_name='Homework'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='recipient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL, verbose_name='Recipient'),
+        ),
+        migrations.AddField(
+            model_name='submissionband',
+            name='homework',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='faculty.homework', verbose_name='Homework'),
+        ),
+        migrations.AddField(
+            model_name='submissionband',
+            name='submission',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='faculty.studenthomework', verbose_name='Submission'),
+        ),
+        migrations.AddField(
+            model_name='submissionsignature',
+            name='homework',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='faculty.homework', verbose_name='Homework'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendancesummary',
+            constraint=models.UniqueConstraint(fields=('classroom', 'student'), name='unique_attendance_summary'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'read_at'], name='notification_recipient_read'),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('recipient', 'homework', 'kind'), name='unique_notification'),
+        ),
+        migrations.AddIndex(
+            model_name='submissionband',
+            index=models.Index(fields=['key'], name='submission_band_key'),
+        ),
+        migrations.AddIndex(
+            model_name='submissionband',
+            index=models.Index(fields=['homework', 'key'], name='submission_band_homework_key'),
+        ),
+    ]
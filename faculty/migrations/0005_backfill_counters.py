@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def backfill(apps, schema_editor):
+    """
+    Fill the counters added by 0004 (enrolled_count/is_full, submission_count,
+    present_count/attendance_taken) and AttendanceSummary from the rows they count;
+    they start at their defaults on an existing database.
+    """
+    # the recount functions use the live models, which match the schema as of 0004
+    from faculty.analytics import refresh_attendance_summary
+    from faculty.counters import recount_attendance, recount_submissions
+    from faculty.enrollment import recount_enrollment
+
+    recount_enrollment()
+    recount_submissions()
+    recount_attendance()
+    refresh_attendance_summary()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faculty', '0004_indexes_counters_and_new_models'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,7 @@
 from django.db import models
 from django.utils import timezone
 from users.models import CustomUser
-from faculty.choices import USER_STATUS_CHOICES
+from faculty.choices import USER_STATUS_CHOICES, JobStatus, NotificationKind
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
@@ -42,6 +42,7 @@ class Classroom(models.Model):
     is_full = models.BooleanField(default=False, verbose_name=_("Is Full"))
     is_active = models.BooleanField(default=True, verbose_name=_("Is Active"))
     max_students = models.IntegerField(verbose_name=_("Max Students"), default=settings.MAX_CLASSROOM_SIZE)
+    enrolled_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("Enrolled Count"))
     syllabus = models.FileField(upload_to='syllabus/', verbose_name=_("Syllabus"), blank=True, null=True)
     number_of_classes = models.IntegerField(verbose_name=_("Number of Classes"),
                                             default=settings.DEFAULT_NUMBER_OF_CLASSES)
@@ -60,10 +61,17 @@ class Homework(models.Model):
     description = models.TextField(verbose_name=_('Description'))
     due_date = models.DateTimeField(default=timezone.now, verbose_name=_('Due_date'))
     is_active = models.BooleanField(verbose_name=_('Is_Active'), default=True)
+    submission_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_('Submission Count'))
 
     class Meta:
         verbose_name = _('Homework')
         verbose_name_plural = _('Homeworks')
+        indexes = [
+            models.Index(fields=['classroom', '-is_active', '-due_date'], name='homework_classroom_active_due'),
+            # deadline scans: active homework due in a time range, see faculty.deadlines. Partial,
+            # as SQLite compiles is_active=True to a bare column test no index column can match.
+            models.Index(fields=['due_date'], condition=models.Q(is_active=True), name='homework_active_due'),
+        ]
 
     def __str__(self):
         return self.title
@@ -77,6 +85,11 @@ class StudentHomework(models.Model):
     homework_text = models.TextField(blank=True, null=True, default=None, verbose_name=_('Homework_text'))
     homework_url = models.URLField(max_length=200, verbose_name=_('Homework URL'))
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'homework'], name='unique_student_homework'),
+        ]
+
 
 class StudentFaculty(models.Model):
     student = models.ForeignKey(CustomUser, on_delete=models.CASCADE,
@@ -89,6 +102,9 @@ class StudentFaculty(models.Model):
     class Meta:
         verbose_name = _('Student Faculty')
         verbose_name_plural = _('Student Faculties')
+        indexes = [
+            models.Index(fields=['student', 'status'], name='studentfaculty_student_status'),
+        ]
 
     def __str__(self):
         return f"{self.student}: {self.faculty} >> {self.status}"
@@ -100,10 +116,15 @@ class ClassroomCalendar(models.Model):
     date = models.DateField(verbose_name=_("Date"))
     start_time = models.TimeField(verbose_name=_("Start Time"))
     duration = models.IntegerField(verbose_name=_("Duration"), default=settings.DEFAULT_LECTURE_DURATION)
+    attendance_taken = models.BooleanField(default=False, editable=False, verbose_name=_("Attendance Taken"))
+    present_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("Present Count"))
 
     class Meta:
         verbose_name = _('Classroom Calendar')
         verbose_name_plural = _('Classroom Calendars')
+        indexes = [
+            models.Index(fields=['classroom', 'date'], name='calendar_classroom_date'),
+        ]
 
     def __str__(self):
         return f"{self.classroom}: {self.date} {self.start_time} - {self.duration}Hours"
@@ -119,11 +140,36 @@ class ClassroomAttendance(models.Model):
     class Meta:
         verbose_name = _('Classroom Attendance')
         verbose_name_plural = _('Classroom Attendances')
+        constraints = [
+            models.UniqueConstraint(fields=['classroom_date', 'student'], name='unique_attendance_student'),
+        ]
 
     def __str__(self):
         return f"{self.classroom_date}"
 
 
+class AttendanceSummary(models.Model):
+    """
+    Sessions attended per student and classroom, kept up to date by
+    faculty.attendance.apply_attendance() and rebuilt by refresh_attendance_summary.
+    """
+    classroom = models.ForeignKey(Classroom, on_delete=models.CASCADE, related_name="attendance_summary",
+                                  verbose_name=_("Classroom"))
+    student = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="attendance_summary",
+                                verbose_name=_("Student"))
+    attended = models.PositiveIntegerField(default=0, verbose_name=_("Attended"))
+
+    class Meta:
+        verbose_name = _('Attendance Summary')
+        verbose_name_plural = _('Attendance Summaries')
+        constraints = [
+            models.UniqueConstraint(fields=['classroom', 'student'], name='unique_attendance_summary'),
+        ]
+
+    def __str__(self):
+        return f"{self.student}: {self.classroom} >> {self.attended}"
+
+
 class StudentSubject(models.Model):
     student = models.ForeignKey(CustomUser, on_delete=models.CASCADE,
                                 limit_choices_to={'user_type': 'student'}, verbose_name=_("Student"))
@@ -135,3 +181,100 @@ class StudentSubject(models.Model):
 
     def __str__(self):
         return f"{self.student}: {self.classroom}"
+
+
+class Job(models.Model):
+    """
+    A unit of background work for `manage.py run_jobs`, see faculty.jobs.
+    """
+    name = models.CharField(max_length=100, verbose_name=_("Name"))
+    payload = models.JSONField(default=dict, blank=True, verbose_name=_("Payload"))
+    status = models.CharField(max_length=10, choices=JobStatus.choices, default=JobStatus.QUEUED,
+                              verbose_name=_("Status"))
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_("Attempts"))
+    max_attempts = models.PositiveIntegerField(default=settings.JOB_MAX_ATTEMPTS, verbose_name=_("Max Attempts"))
+    run_at = models.DateTimeField(default=timezone.now, verbose_name=_("Run At"))
+    created_at = models.DateTimeField(default=timezone.now, verbose_name=_("Created At"))
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Started At"))
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Heartbeat At"))
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Finished At"))
+    locked_by = models.CharField(max_length=64, blank=True, verbose_name=_("Locked By"))
+    last_error = models.TextField(blank=True, verbose_name=_("Last Error"))
+
+    class Meta:
+        verbose_name = _('Job')
+        verbose_name_plural = _('Jobs')
+        indexes = [
+            # the claim query: oldest due job in a status
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} {self.status}"
+
+
+class Notification(models.Model):
+    """
+    A message for a user about a homework, written in bulk by faculty.deadlines.
+    """
+    recipient = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="notifications",
+                                  verbose_name=_("Recipient"))
+    homework = models.ForeignKey(Homework, on_delete=models.CASCADE, related_name="notifications",
+                                 verbose_name=_("Homework"))
+    kind = models.CharField(max_length=20, choices=NotificationKind.choices, verbose_name=_("Kind"))
+    created_at = models.DateTimeField(default=timezone.now, verbose_name=_("Created At"))
+    read_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Read At"))
+
+    class Meta:
+        verbose_name = _('Notification')
+        verbose_name_plural = _('Notifications')
+        constraints = [
+            models.UniqueConstraint(fields=['recipient', 'homework', 'kind'], name='unique_notification'),
+        ]
+        indexes = [
+            models.Index(fields=['recipient', 'read_at'], name='notification_recipient_read'),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient}: {self.homework} >> {self.kind}"
+
+
+class SubmissionSignature(models.Model):
+    """
+    The MinHash signature of a submission's text, see faculty.similarity.
+    """
+    submission = models.OneToOneField(StudentHomework, on_delete=models.CASCADE, primary_key=True,
+                                      related_name="signature", verbose_name=_("Submission"))
+    homework = models.ForeignKey(Homework, on_delete=models.CASCADE, verbose_name=_("Homework"))
+    signature = models.BinaryField(verbose_name=_("Signature"))
+    shingles = models.PositiveIntegerField(verbose_name=_("Shingles"))
+
+    class Meta:
+        verbose_name = _('Submission Signature')
+        verbose_name_plural = _('Submission Signatures')
+
+    def __str__(self):
+        return f"{self.submission_id}: {self.shingles} shingles"
+
+
+class SubmissionBand(models.Model):
+    """
+    One LSH band key of a submission's signature; submissions sharing a key are
+    candidate near-duplicates.
+    """
+    submission = models.ForeignKey(StudentHomework, on_delete=models.CASCADE, related_name="bands",
+                                   verbose_name=_("Submission"))
+    homework = models.ForeignKey(Homework, on_delete=models.CASCADE, verbose_name=_("Homework"))
+    key = models.BigIntegerField(verbose_name=_("Key"))
+
+    class Meta:
+        verbose_name = _('Submission Band')
+        verbose_name_plural = _('Submission Bands')
+        indexes = [
+            # candidates across all homework, and within one
+            models.Index(fields=['key'], name='submission_band_key'),
+            models.Index(fields=['homework', 'key'], name='submission_band_homework_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.submission_id}: {self.key}"
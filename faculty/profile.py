@@ -0,0 +1,73 @@
+from asgiref.sync import sync_to_async
+from faculty.models import StudentFaculty, Classroom
+from faculty.catalog import get_faculty_catalog
+
+
+def student_profile(user):
+    """
+    Read model for the student profile page.
+
+    The active faculty is filtered in the database and the faculty's subjects and
+    classrooms come from the catalog cache, so rendering the page does not issue
+    per-row queries. Enrollment counts come from Classroom.enrolled_count.
+    """
+    faculty = StudentFaculty.objects.filter(student=user, status='active').select_related('faculty').first()
+    has_faculties = faculty is not None or StudentFaculty.objects.filter(student=user).exists()
+
+    enrolled_classrooms = list(_enrolled_classrooms(user))
+    return _student_context(faculty, has_faculties, enrolled_classrooms,
+                            get_faculty_catalog(faculty.faculty_id) if faculty else [])
+
+
+async def astudent_profile(user):
+    """
+    Async version of student_profile().
+    """
+    faculty = await StudentFaculty.objects.filter(student=user, status='active').select_related('faculty').afirst()
+    has_faculties = faculty is not None or await StudentFaculty.objects.filter(student=user).aexists()
+    enrolled_classrooms = await alist(_enrolled_classrooms(user))
+    subjects = await sync_to_async(get_faculty_catalog)(faculty.faculty_id) if faculty else []
+    return _student_context(faculty, has_faculties, enrolled_classrooms, subjects)
+
+
+def _enrolled_classrooms(user):
+    return Classroom.objects.filter(students=user).select_related('subject', 'lecturer')
+
+
+async def alist(queryset):
+    """
+    Evaluate a queryset with the async ORM.
+    """
+    return [obj async for obj in queryset]
+
+
+def _student_context(faculty, has_faculties, enrolled_classrooms, subjects):
+    enrolled_ids = {classroom.id for classroom in enrolled_classrooms}
+    for subject in subjects:
+        subject.open_classrooms = [classroom for classroom in subject.classrooms
+                                   if not classroom.is_full and classroom.id not in enrolled_ids]
+    return {
+        'faculty': faculty,
+        'has_faculties': has_faculties,
+        'subjects': subjects,
+        'enrolled_classrooms': enrolled_classrooms,
+    }
+
+
+def lecturer_profile(user):
+    """
+    Read model for the lecturer profile page.
+    """
+    classrooms = list(Classroom.objects.filter(lecturer=user).select_related('subject'))
+    return {
+        'classrooms': classrooms,
+    }
+
+
+async def alecturer_profile(user):
+    """
+    Async version of lecturer_profile().
+    """
+    return {
+        'classrooms': await alist(Classroom.objects.filter(lecturer=user).select_related('subject')),
+    }
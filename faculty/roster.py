@@ -0,0 +1,237 @@
+import csv
+import json
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from faculty.choices import USER_STATUS_CHOICES
+from faculty.models import Classroom, Faculty, StudentFaculty
+from faculty.enrollment import recount_enrollment
+from faculty.catalog import invalidate_classrooms
+from users.models import CustomUser
+
+USER_FIELDS = ['email', 'first_name', 'last_name', 'user_type', 'is_authorized']
+FACULTY_FIELDS = ['email', 'faculty', 'status']
+ENROLLMENT_FIELDS = ['email', 'classroom']
+USER_TYPES = ('student', 'lecturer')
+# a status may be given by choice value or label; stored as the lowercase label, as the
+# rest of the app reads it
+STATUSES = {str(value): label.lower() for value, label in USER_STATUS_CHOICES}
+STATUSES.update({label.lower(): label.lower() for _, label in USER_STATUS_CHOICES})
+
+
+class RowError(Exception):
+    pass
+
+
+def read_rows(stream, fmt):
+    """
+    Yield (line_number, dict) from a CSV (with header) or JSONL stream without
+    loading it into memory. A JSONL line that is not a JSON object is yielded as a
+    RowError, which the importers report with the other rejected rows.
+    """
+    if fmt == 'csv':
+        for reader_line, row in enumerate(csv.DictReader(stream), start=2):
+            yield reader_line, row
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                row = RowError(f'invalid JSON: {e}')
+            else:
+                if not isinstance(row, dict):
+                    row = RowError('expected a JSON object')
+            yield line_number, row
+
+
+def write_rows(stream, fmt, fields, rows):
+    if fmt == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(fields)
+        writer.writerows(rows)
+    else:
+        for row in rows:
+            stream.write(json.dumps(dict(zip(fields, row)), default=str) + '\n')
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _parsed(chunk, errors):
+    for line_number, row in chunk:
+        if isinstance(row, RowError):
+            errors.append((line_number, str(row)))
+        else:
+            yield line_number, row
+
+
+def _email(row):
+    email = CustomUser.objects.normalize_email((row.get('email') or '').strip())
+    try:
+        validate_email(email)
+    except ValidationError:
+        raise RowError(f'invalid email {email!r}')
+    return email
+
+
+def _flag(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y')
+
+
+def _user_ids(emails):
+    return dict(CustomUser.objects.filter(email__in=emails).values_list('email', 'id'))
+
+
+def import_users(chunk, pool=None):
+    """
+    Validate and insert one chunk of user rows. Returns (created, errors) where errors
+    is a list of (line_number, message). Passwords are hashed in `pool`, or in a
+    pool created for the call.
+    """
+    errors = []
+    valid = {}
+    for line_number, row in _parsed(chunk, errors):
+        try:
+            email = _email(row)
+            if row.get('user_type') not in USER_TYPES:
+                raise RowError(f"user_type must be one of {', '.join(USER_TYPES)}")
+            if email in valid:
+                raise RowError(f'duplicate email {email}')
+        except RowError as e:
+            errors.append((line_number, str(e)))
+            continue
+        valid[email] = (line_number, row)
+
+    for email in _user_ids(valid):
+        errors.append((valid.pop(email)[0], f'{email} already exists'))
+
+    users = []
+    for email, (_, row) in valid.items():
+        data = {'email': email, 'password': row.get('password') or '', 'user_type': row['user_type'],
+                'first_name': row.get('first_name') or '', 'last_name': row.get('last_name') or ''}
+        if row.get('is_authorized') not in (None, ''):
+            data['is_authorized'] = _flag(row['is_authorized'])
+        users.append(data)
+    created = CustomUser.objects.create_users_bulk(users, batch_size=len(users) or 1, pool=pool,
+                                                   ignore_conflicts=True)
+    # a user created since the check above makes the insert a no-op; the salted password
+    # hashes tell the rows inserted here from those
+    passwords = dict(CustomUser.objects.filter(email__in=valid).values_list('email', 'password'))
+    inserted = 0
+    for user in created:
+        if passwords.get(user.email) == user.password:
+            inserted += 1
+        else:
+            errors.append((valid[user.email][0], f'{user.email} already exists'))
+    return inserted, errors
+
+
+def import_faculties(chunk):
+    """
+    Insert one chunk of StudentFaculty rows; `faculty` may be a faculty id or name.
+    """
+    errors = []
+    faculties = {str(pk): pk for pk in Faculty.objects.values_list('id', flat=True)}
+    faculties.update({name: pk for pk, name in Faculty.objects.values_list('id', 'name')})
+    parsed = []
+    for line_number, row in _parsed(chunk, errors):
+        try:
+            email = _email(row)
+            faculty_id = faculties.get(str(row.get('faculty', '')).strip())
+            if faculty_id is None:
+                raise RowError(f"unknown faculty {row.get('faculty')!r}")
+            status = STATUSES.get(str(row.get('status') or 'active').strip().lower())
+            if status is None:
+                raise RowError(f"status must be one of {', '.join(sorted(set(STATUSES.values())))}")
+        except RowError as e:
+            errors.append((line_number, str(e)))
+            continue
+        parsed.append((line_number, email, faculty_id, status))
+
+    user_ids = _user_ids({email for _, email, _, _ in parsed})
+    existing = set(StudentFaculty.objects.filter(student_id__in=user_ids.values())
+                   .values_list('student_id', 'faculty_id'))
+    to_create = []
+    for line_number, email, faculty_id, status in parsed:
+        student_id = user_ids.get(email)
+        if student_id is None:
+            errors.append((line_number, f'unknown user {email}'))
+        elif (student_id, faculty_id) not in existing:
+            existing.add((student_id, faculty_id))
+            to_create.append(StudentFaculty(student_id=student_id, faculty_id=faculty_id, status=status))
+    StudentFaculty.objects.bulk_create(to_create)
+    return len(to_create), errors
+
+
+def import_enrollments(chunk):
+    """
+    Insert one chunk of Classroom.students rows straight into the through table, then
+    recount the touched classrooms. Capacity is not enforced here; this is an
+    administrative load. Students already in the classroom are skipped, not counted.
+    """
+    errors = []
+    parsed = []
+    for line_number, row in _parsed(chunk, errors):
+        try:
+            email = _email(row)
+            classroom_id = int(row.get('classroom'))
+        except (RowError, TypeError, ValueError) as e:
+            errors.append((line_number, str(e) if isinstance(e, RowError) else 'classroom must be an id'))
+            continue
+        parsed.append((line_number, email, classroom_id))
+
+    user_ids = _user_ids({email for _, email, _ in parsed})
+    classroom_ids = set(Classroom.objects.filter(id__in={c for _, _, c in parsed}).values_list('id', flat=True))
+    through = Classroom.students.through
+    to_create = []
+    for line_number, email, classroom_id in parsed:
+        if email not in user_ids:
+            errors.append((line_number, f'unknown user {email}'))
+        elif classroom_id not in classroom_ids:
+            errors.append((line_number, f'unknown classroom {classroom_id}'))
+        else:
+            to_create.append(through(classroom_id=classroom_id, customuser_id=user_ids[email]))
+
+    touched = {row.classroom_id for row in to_create}
+    enrolled = through.objects.filter(classroom_id__in=touched)
+    with transaction.atomic():
+        before = enrolled.count()
+        through.objects.bulk_create(to_create, ignore_conflicts=True)
+        inserted = enrolled.count() - before
+        recount_enrollment(touched)
+    invalidate_classrooms(touched)
+    return inserted, errors
+
+
+def export_users():
+    return CustomUser.objects.order_by('id').values_list(*USER_FIELDS).iterator(chunk_size=2000)
+
+
+def export_faculties():
+    return StudentFaculty.objects.order_by('id') \
+        .values_list('student__email', 'faculty__name', 'status').iterator(chunk_size=2000)
+
+
+def export_enrollments():
+    return Classroom.students.through.objects.order_by('id') \
+        .values_list('customuser__email', 'classroom_id').iterator(chunk_size=2000)
+
+
+IMPORTERS = {
+    'users': import_users,
+    'faculties': import_faculties,
+    'enrollments': import_enrollments,
+}
+
+EXPORTERS = {
+    'users': (USER_FIELDS, export_users),
+    'faculties': (FACULTY_FIELDS, export_faculties),
+    'enrollments': (ENROLLMENT_FIELDS, export_enrollments),
+}
@@ -0,0 +1,119 @@
+import datetime
+from bisect import bisect_left
+from itertools import accumulate
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from faculty.models import Classroom, ClassroomCalendar
+
+
+def expand_sessions(classroom, start_date, weekdays, start_time, count, holidays=(),
+                    duration=settings.DEFAULT_LECTURE_DURATION):
+    """
+    Expand a weekly recurrence into `count` unsaved ClassroomCalendar rows, starting at
+    `start_date`, on the given weekdays (0 = Monday) and skipping `holidays`. Raises
+    ValueError when the sessions would run past the last representable date.
+    """
+    weekdays = {int(day) for day in weekdays}
+    if not weekdays:
+        raise ValueError('At least one weekday is required')
+    holidays = set(holidays)
+
+    sessions = []
+    day = start_date
+    while len(sessions) < count:
+        if day.weekday() in weekdays and day not in holidays:
+            sessions.append(ClassroomCalendar(classroom=classroom, date=day, start_time=start_time,
+                                              duration=duration))
+        if day == datetime.date.max and len(sessions) < count:
+            raise ValueError('The schedule runs past the last representable date')
+        day += datetime.timedelta(days=1)
+    return sessions
+
+
+def _interval(session):
+    start = datetime.datetime.combine(session.date, session.start_time)
+    return start, start + datetime.timedelta(hours=session.duration)
+
+
+class Timetable:
+    """
+    Sessions sorted by start with the running maximum of their ends, so whether an
+    interval overlaps any of them is one bisect: O(log n) per question after an
+    O(n log n) build, instead of a scan over every session.
+    """
+
+    def __init__(self, sessions):
+        intervals = sorted(((*_interval(session), session) for session in sessions), key=lambda item: item[0])
+        self.starts = [start for start, _, _ in intervals]
+        self.ends = [end for _, end, _ in intervals]
+        self.sessions = [session for _, _, session in intervals]
+        self.max_ends = list(accumulate(self.ends, max))
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def clashes(self, session):
+        start, end = _interval(session)
+        # sessions starting before `end`; one of them overlaps when the latest end is after `start`
+        before = bisect_left(self.starts, end)
+        return before > 0 and self.max_ends[before - 1] > start
+
+    def conflicts(self, session):
+        """
+        The sessions overlapping `session`, walking back from the bisect only while
+        an overlap is still possible.
+        """
+        start, end = _interval(session)
+        i = bisect_left(self.starts, end)
+        found = []
+        while i > 0 and self.max_ends[i - 1] > start:
+            i -= 1
+            if self.ends[i] > start:
+                found.append(self.sessions[i])
+        found.reverse()
+        return found
+
+
+def _for_messages(sessions):
+    # conflicts are reported with str(session), which needs the subject and lecturer
+    return sessions.select_related('classroom__subject', 'classroom__lecturer')
+
+
+def find_lecturer_conflicts(lecturer_id, sessions):
+    """
+    Return (new_session, existing_session) pairs that overlap with sessions the lecturer
+    already teaches. Existing sessions are loaded with one query over the date range,
+    from the day before so sessions running past midnight count.
+    """
+    if not sessions:
+        return []
+    dates = {session.date for session in sessions}
+    timetable = Timetable(_for_messages(ClassroomCalendar.objects.filter(
+        classroom__lecturer_id=lecturer_id, date__range=(min(dates) - datetime.timedelta(days=1), max(dates)))))
+    return [(session, existing) for session in sessions for existing in timetable.conflicts(session)]
+
+
+def find_enrollment_conflicts(student_id, classroom_id, today=None):
+    """
+    Return (classroom_session, existing_session) pairs where an upcoming session of the
+    classroom overlaps one of the student's other classrooms. One query loads both.
+    """
+    today = today or timezone.localdate()
+    enrolled = Classroom.students.through.objects.filter(customuser_id=student_id).values('classroom_id')
+    new, existing = [], []
+    for session in _for_messages(ClassroomCalendar.objects.filter(
+            Q(classroom_id=classroom_id) | Q(classroom_id__in=enrolled), date__gte=today)):
+        (new if session.classroom_id == classroom_id else existing).append(session)
+    if not new or not existing:
+        return []
+    timetable = Timetable(existing)
+    return [(session, clash) for session in new for clash in timetable.conflicts(session)]
+
+
+def create_sessions(sessions):
+    """
+    Persist expanded sessions, possibly for several classrooms, with one bulk_create.
+    """
+    return ClassroomCalendar.objects.bulk_create(sessions)
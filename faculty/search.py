@@ -0,0 +1,222 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import F, IntegerField, TextField, Value
+from django.db.models.functions import Cast, Coalesce, Concat
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from faculty.models import Homework, StudentHomework, Subject
+
+TABLE = 'search_index'
+# doc_id = object_id * len(KINDS) + code, so every object has a stable row to replace
+KINDS = {'subject': 0, 'homework': 1, 'submission': 2}
+COLUMNS = ['title', 'body', 'kind', 'object_id', 'parent_id', 'classroom_id', 'subject_id', 'owner_id']
+# markers put around matches by the database, swapped for <mark> after HTML escaping
+START, STOP = '\x02', '\x03'
+SNIPPET_WORDS = 24
+TITLE_WEIGHT = 10.0
+
+SCHEMA = {
+    'sqlite': [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+        "title, body, scope, kind UNINDEXED, object_id UNINDEXED, parent_id UNINDEXED, classroom_id UNINDEXED, "
+        "subject_id UNINDEXED, owner_id UNINDEXED, tokenize='porter unicode61')",
+    ],
+    'postgresql': [
+        f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+        "doc_id bigint PRIMARY KEY, title text NOT NULL, body text NOT NULL, kind varchar(20) NOT NULL, "
+        "object_id bigint NOT NULL, parent_id bigint, classroom_id bigint, subject_id bigint, owner_id bigint, "
+        "document tsvector GENERATED ALWAYS AS (setweight(to_tsvector('english', title), 'A') || "
+        "setweight(to_tsvector('english', body), 'B')) STORED)",
+        f"CREATE INDEX IF NOT EXISTS {TABLE}_document ON {TABLE} USING GIN (document)",
+    ],
+}
+
+
+def supported():
+    return connection.vendor in SCHEMA
+
+
+def create_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Create the index table for the database's backend; a post_migrate hook, since an
+    FTS5 virtual table cannot be a model.
+    """
+    database = connections[using]
+    if database.vendor not in SCHEMA:
+        return
+    with database.cursor() as cursor:
+        for statement in SCHEMA[database.vendor]:
+            cursor.execute(statement)
+
+
+def _sources():
+    """
+    kind -> queryset selecting the index columns of every object, aliased with an
+    ix_ prefix so they cannot clash with model fields.
+    """
+    def columns(kind, **values):
+        null = Value(None, output_field=IntegerField())
+        values = {'doc_id': F('id') * len(KINDS) + Value(KINDS[kind]), 'kind': Value(kind), 'object_id': F('id'),
+                  **{column: null for column in ('parent_id', 'classroom_id', 'subject_id', 'owner_id')}, **values}
+        return {f'ix_{column}': value for column, value in values.items()}
+
+    sources = {
+        'subject': Subject.objects.annotate(**columns(
+            'subject', title=F('name'), body=F('description'), subject_id=F('id'))),
+        'homework': Homework.objects.annotate(**columns(
+            'homework', title=F('title'), body=F('description'), classroom_id=F('classroom_id'),
+            subject_id=F('classroom__subject_id'))),
+        'submission': StudentHomework.objects.annotate(**columns(
+            'submission', title=F('homework__title'),
+            body=Concat(Coalesce('homework_text', Value('')), Value(' '), 'homework_url', output_field=TextField()),
+            parent_id=F('homework_id'), classroom_id=F('classroom_id'), subject_id=F('classroom__subject_id'),
+            owner_id=F('student_id'))),
+    }
+    columns = ['doc_id', *COLUMNS]
+    if connection.vendor == 'sqlite':
+        # FTS5 filters UNINDEXED columns row by row, so the filters are tokens of an indexed column
+        sources = {kind: queryset.annotate(ix_scope=Concat(
+            Value(f'k{kind} s'), _token('ix_subject_id'), Value(' c'), _token('ix_classroom_id'),
+            Value(' o'), _token('ix_owner_id'), output_field=TextField())) for kind, queryset in sources.items()}
+        columns.append('scope')
+    return {kind: queryset.values(*(f'ix_{column}' for column in columns)).order_by()
+            for kind, queryset in sources.items()}
+
+
+def _token(column):
+    return Coalesce(Cast(column, TextField()), Value('none'))
+
+
+def _insert_from(queryset):
+    compiler = queryset.query.get_compiler(connection=connection)
+    sql, params = compiler.as_sql()
+    # the INSERT columns in the order the compiler selected them
+    columns = [alias.removeprefix('ix_') for _, _, alias in compiler.select]
+    columns = ['rowid' if column == 'doc_id' and connection.vendor == 'sqlite' else column for column in columns]
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABLE} ({', '.join(columns)}) {sql}", params)
+        return cursor.rowcount
+
+
+def remove(kind, ids):
+    if not supported() or not ids:
+        return
+    key = 'rowid' if connection.vendor == 'sqlite' else 'doc_id'
+    doc_ids = [pk * len(KINDS) + KINDS[kind] for pk in ids]
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE {key} IN ({', '.join(['%s'] * len(doc_ids))})", doc_ids)
+
+
+def index(kind, ids):
+    """
+    Re-index the given objects of `kind`: one DELETE by doc_id and one INSERT ... SELECT.
+    """
+    if not supported() or not ids:
+        return
+    with transaction.atomic():
+        remove(kind, ids)
+        _insert_from(_sources()[kind].filter(pk__in=ids))
+
+
+def rebuild():
+    """
+    Refill the whole index with one INSERT ... SELECT per kind. Returns {kind: rows}.
+    """
+    create_index()
+    counts = {}
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE}")
+        for kind, queryset in _sources().items():
+            counts[kind] = _insert_from(queryset)
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+    return counts
+
+
+def _match_query(text, kinds, classroom_ids, owner_id, subject_id):
+    """
+    An FTS5 query: every word of `text` in the title or body, the last one as a prefix,
+    and the filters as alternatives of scope tokens.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    terms = ' '.join(f'"{word}"' for word in words) + '*'
+    scopes = []
+    if kinds:
+        scopes.append([f'k{kind}' for kind in kinds])
+    if classroom_ids is not None:
+        scopes.append(['cnone', *(f'c{pk}' for pk in classroom_ids)])
+    if owner_id is not None:
+        scopes.append([f'k{kind}' for kind in KINDS if kind != 'submission'] + [f'o{owner_id}'])
+    if subject_id is not None:
+        scopes.append([f's{subject_id}'])
+    query = f'{{title body}} : ({terms})'
+    for tokens in scopes:
+        query += ' AND scope : (' + ' OR '.join(f'"{token}"' for token in tokens) + ')'
+    return query
+
+
+def _where(kinds, classroom_ids, owner_id, subject_id):
+    conditions, params = [], []
+    if kinds:
+        conditions.append(f"kind IN ({', '.join(['%s'] * len(kinds))})")
+        params.extend(kinds)
+    if classroom_ids is not None:
+        classroom_ids = list(classroom_ids) or [0]
+        conditions.append(f"(classroom_id IS NULL OR classroom_id IN ({', '.join(['%s'] * len(classroom_ids))}))")
+        params.extend(classroom_ids)
+    if owner_id is not None:
+        conditions.append("(kind != 'submission' OR owner_id = %s)")
+        params.append(owner_id)
+    if subject_id is not None:
+        conditions.append("subject_id = %s")
+        params.append(subject_id)
+    return ''.join(f' AND {condition}' for condition in conditions), params
+
+
+def _highlight(text):
+    return mark_safe(escape(text or '').replace(START, '<mark>').replace(STOP, '</mark>'))
+
+
+def search(text, kinds=None, classroom_ids=None, owner_id=None, subject_id=None, limit=20):
+    """
+    Ranked matches of `text`, best first, as dicts with kind, object_id, parent_id,
+    classroom_id, highlighted title and body snippet (safe HTML) and score.
+
+    Subjects are always visible. With `classroom_ids`, homework and submissions are
+    limited to those classrooms; with `owner_id`, submissions to that student's.
+    """
+    if not supported():
+        return []
+    if connection.vendor == 'sqlite':
+        query = _match_query(text, kinds, classroom_ids, owner_id, subject_id)
+        if query is None:
+            return []
+        sql = (f"SELECT kind, object_id, parent_id, classroom_id, highlight({TABLE}, 0, %s, %s), "
+               f"snippet({TABLE}, 1, %s, %s, '…', {SNIPPET_WORDS}), "
+               f"bm25({TABLE}, {TITLE_WEIGHT}, 1.0, 0.0) AS score "
+               f"FROM {TABLE} WHERE {TABLE} MATCH %s ORDER BY score LIMIT %s")
+        params = [START, STOP, START, STOP, query, limit]
+    else:
+        if not text.strip():
+            return []
+        where, params = _where(kinds, classroom_ids, owner_id, subject_id)
+        options = f'StartSel={START}, StopSel={STOP}'
+        sql = (f"SELECT kind, object_id, parent_id, classroom_id, "
+               f"ts_headline('english', title, query, %s), ts_headline('english', body, query, %s), "
+               f"ts_rank_cd(document, query) AS score "
+               f"FROM {TABLE}, websearch_to_tsquery('english', %s) query WHERE document @@ query{where} "
+               f"ORDER BY score DESC LIMIT %s")
+        params = [f'{options}, HighlightAll=true', f'{options}, MaxWords={SNIPPET_WORDS}, MinWords=8',
+                  text, *params, limit]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [{'kind': kind, 'object_id': object_id, 'parent_id': parent_id, 'classroom_id': classroom_id,
+             'title': _highlight(title), 'snippet': _highlight(snippet), 'score': abs(score)}
+            for kind, object_id, parent_id, classroom_id, title, snippet, score in rows]
@@ -0,0 +1,351 @@
+import bisect
+import datetime
+import itertools
+import random
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from faculty.models import AttendanceSummary, Classroom, ClassroomAttendance, ClassroomCalendar, Faculty, \
+    Homework, StudentFaculty, StudentHomework, Subject
+from faculty.analytics import refresh_attendance_summary
+from faculty.counters import recount_attendance, recount_submissions
+from faculty.roster import chunked
+from faculty.scheduling import expand_sessions
+from users.models import CustomUser
+
+SEED_PASSWORD = 'Seed-password-2024'
+SEMESTER_WEEKS = 15
+
+
+class University:
+    """
+    Ids of the rows created by seed_university(), grouped by kind.
+    """
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.lecturer_ids = []
+        self.student_ids = []
+        self.faculty_ids = []
+        self.subject_ids = []
+        self.classroom_ids = []
+        # classroom_id -> lecturer_id, [student_id], [session_id], [homework_id]
+        self.lecturers = {}
+        self.enrollments = {}
+        self.sessions = {}
+        self.homeworks = {}
+
+    def email(self, kind, i):
+        return f'seed-{self.tag}-{kind}{i}@example.com'
+
+
+def seed_university(tag, faculties=2, subjects=6, classrooms=12, students=200, sessions=8, homeworks=3,
+                    classrooms_per_student=3, capacity=None, password=SEED_PASSWORD, rng=None):
+    """
+    Create a synthetic university with bulk inserts: lecturers and students (all with
+    `password`), faculties sharing the subjects round robin, classrooms per subject,
+    student enrollments within their faculty, weekly sessions and homework.
+
+    Every name and email carries `tag` so drop_university(tag) can remove it again.
+    Returns a University with the created ids.
+    """
+    rng = rng or random.Random(0)
+    university = University(tag)
+    encoded = make_password(password)
+    capacity = capacity or max(1, students * classrooms_per_student // max(1, classrooms) * 2)
+    now = timezone.now()
+
+    with transaction.atomic():
+        lecturers = CustomUser.objects.bulk_create([
+            CustomUser(email=university.email('l', i), user_type='lecturer', password=encoded,
+                       first_name='Lecturer', last_name=str(i), is_authorized=True)
+            for i in range(max(1, classrooms // 2))
+        ])
+        student_rows = CustomUser.objects.bulk_create([
+            CustomUser(email=university.email('s', i), user_type='student', password=encoded,
+                       first_name='Student', last_name=str(i), is_authorized=True)
+            for i in range(students)
+        ])
+        subject_rows = Subject.objects.bulk_create([
+            Subject(name=f'seed-{tag} subject {i}', description='synthetic subject') for i in range(subjects)
+        ])
+        faculty_rows = Faculty.objects.bulk_create([
+            Faculty(name=f'seed-{tag} faculty {i}') for i in range(faculties)
+        ])
+        Faculty.subjects.through.objects.bulk_create([
+            Faculty.subjects.through(faculty_id=faculty_rows[i % faculties].id, subject_id=subject.id)
+            for i, subject in enumerate(subject_rows)
+        ])
+
+        classroom_rows = [
+            Classroom(subject=subject_rows[i % subjects], lecturer=lecturers[i % len(lecturers)],
+                      max_students=capacity)
+            for i in range(classrooms)
+        ]
+        by_faculty = {}
+        for i, classroom in enumerate(classroom_rows):
+            by_faculty.setdefault(i % subjects % faculties, []).append(i)
+
+        student_faculty = []
+        members = [[] for _ in classroom_rows]
+        for student in student_rows:
+            faculty = rng.randrange(faculties)
+            student_faculty.append(StudentFaculty(student=student, faculty=faculty_rows[faculty], status='active'))
+            open_rooms = [i for i in by_faculty.get(faculty, []) if len(members[i]) < capacity]
+            for i in rng.sample(open_rooms, min(classrooms_per_student, len(open_rooms))):
+                members[i].append(student.id)
+        for classroom, student_ids in zip(classroom_rows, members):
+            classroom.enrolled_count = len(student_ids)
+            classroom.is_full = len(student_ids) >= capacity
+
+        StudentFaculty.objects.bulk_create(student_faculty, batch_size=1000)
+        Classroom.objects.bulk_create(classroom_rows)
+        through = Classroom.students.through
+        through.objects.bulk_create([
+            through(classroom_id=classroom.id, customuser_id=student_id)
+            for classroom, student_ids in zip(classroom_rows, members) for student_id in student_ids
+        ], batch_size=1000)
+
+        session_rows = []
+        for i, classroom in enumerate(classroom_rows):
+            session_rows += expand_sessions(classroom, now.date(), (i % 5, (i + 2) % 5),
+                                            datetime.time(8 + i % 10), sessions)
+        ClassroomCalendar.objects.bulk_create(session_rows, batch_size=1000)
+        homework_rows = Homework.objects.bulk_create([
+            Homework(classroom=classroom, title=f'Homework {n}', description='synthetic homework',
+                     due_date=now + datetime.timedelta(days=7 * n - 3))
+            for classroom in classroom_rows for n in range(homeworks)
+        ], batch_size=1000)
+
+    university.lecturer_ids = [user.id for user in lecturers]
+    university.student_ids = [user.id for user in student_rows]
+    university.faculty_ids = [faculty.id for faculty in faculty_rows]
+    university.subject_ids = [subject.id for subject in subject_rows]
+    university.classroom_ids = [classroom.id for classroom in classroom_rows]
+    for classroom, student_ids in zip(classroom_rows, members):
+        university.lecturers[classroom.id] = classroom.lecturer_id
+        university.enrollments[classroom.id] = student_ids
+        university.sessions[classroom.id] = []
+        university.homeworks[classroom.id] = []
+    for session in session_rows:
+        university.sessions[session.classroom_id].append(session.id)
+    for homework in homework_rows:
+        university.homeworks[homework.classroom_id].append(homework.id)
+    return university
+
+
+def drop_university(tag):
+    """
+    Delete everything seed_university(tag) created.
+    """
+    with transaction.atomic():
+        # subjects first: the classroom cascade then skips per-row counter upkeep (see faculty.signals)
+        Subject.objects.filter(name__startswith=f'seed-{tag} ').delete()
+        Faculty.objects.filter(name__startswith=f'seed-{tag} ').delete()
+        CustomUser.objects.filter(email__startswith=f'seed-{tag}-').delete()
+
+
+def zipf_cum_weights(n, exponent):
+    """
+    Cumulative weights of ranks 1..n under a Zipf law, for random.choices(cum_weights=...).
+    """
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, n + 1)))
+
+
+def _propensity(student_id):
+    # stable per-student diligence in [0.55, 0.98) without keeping a million floats around
+    return 0.55 + 0.43 * ((student_id * 2654435761) % 2 ** 32) / 2 ** 32
+
+
+def _due_date(rng, semester_start):
+    """
+    Homework deadlines cluster around midterms (week 7) and finals (week 14); the rest
+    are spread over the semester.
+    """
+    roll = rng.random()
+    if roll < 0.25:
+        week = rng.gauss(7, 0.7)
+    elif roll < 0.5:
+        week = rng.gauss(14, 0.7)
+    else:
+        week = rng.uniform(1, SEMESTER_WEEKS)
+    week = min(max(week, 0.5), SEMESTER_WEEKS)
+    return semester_start + datetime.timedelta(weeks=week, hours=rng.choice((12, 18, 23)))
+
+
+class _Writer:
+    """
+    Buffers unsaved rows per model and writes them with bulk_create, one transaction per chunk.
+    """
+
+    def __init__(self, chunk_size, log):
+        self.chunk_size = chunk_size
+        self.log = log
+        self.buffers = {}
+        self.counts = {}
+        self.started = time.perf_counter()
+
+    def add(self, row):
+        model = type(row)
+        buffer = self.buffers.setdefault(model, [])
+        buffer.append(row)
+        if len(buffer) >= self.chunk_size:
+            self.flush(model)
+
+    def flush(self, model=None):
+        for model in [model] if model else list(self.buffers):
+            rows, self.buffers[model] = self.buffers.get(model, []), []
+            if rows:
+                self.write(model, rows)
+
+    def write(self, model, rows):
+        with transaction.atomic():
+            created = model.objects.bulk_create(rows, batch_size=self.chunk_size)
+        total = self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(rows)
+        if self.log:
+            self.log(f'{model.__name__}: {total} rows, {time.perf_counter() - self.started:.1f}s')
+        return created
+
+
+def generate_university(tag, students=10000, faculties=10, subjects=100, classrooms=500, sessions=30,
+                        homeworks=8, classrooms_per_student=4, zipf_exponent=1.1, semester_start=None,
+                        chunk_size=10000, rng=None, log=None):
+    """
+    Stream a large synthetic university into the database for scale testing.
+
+    Rows are written in chunks with bulk_create; Faculty.subjects and Classroom.students
+    rows go straight into their through tables. Classroom popularity follows a Zipf law
+    within each faculty, attendance depends on a per-student diligence that fades over the
+    semester, and homework deadlines (with the submissions they carry) spike around
+    midterms and finals. Only past sessions get attendance; absent students have no row,
+    as with apply_attendance().
+
+    Everything is tagged like seed_university(), so drop_university(tag) removes it.
+    Returns {model name: rows written}.
+    """
+    rng = rng or random.Random(0)
+    university = University(tag)
+    writer = _Writer(chunk_size, log)
+    encoded = make_password(SEED_PASSWORD)
+    today = timezone.now().date()
+    semester_start = semester_start or today - datetime.timedelta(weeks=SEMESTER_WEEKS // 2)
+    semester_start_at = timezone.make_aware(datetime.datetime.combine(semester_start, datetime.time()))
+
+    lecturer_ids = []
+    for chunk in chunked(range(max(1, classrooms // 3)), chunk_size):
+        lecturer_ids += [user.id for user in writer.write(CustomUser, [
+            CustomUser(email=university.email('l', i), user_type='lecturer', password=encoded,
+                       first_name='Lecturer', last_name=str(i), is_authorized=True)
+            for i in chunk
+        ])]
+    faculty_rows = writer.write(Faculty, [Faculty(name=f'seed-{tag} faculty {i}') for i in range(faculties)])
+    subject_rows = writer.write(Subject, [Subject(name=f'seed-{tag} subject {i}', description='synthetic subject')
+                                          for i in range(subjects)])
+    writer.write(Faculty.subjects.through, [
+        Faculty.subjects.through(faculty_id=faculty_rows[i % faculties].id, subject_id=subject.id)
+        for i, subject in enumerate(subject_rows)
+    ])
+
+    # classroom ids per faculty, most popular first
+    classroom_rows = []
+    for chunk in chunked(range(classrooms), chunk_size):
+        classroom_rows += writer.write(Classroom, [
+            Classroom(subject=subject_rows[i % subjects], lecturer_id=rng.choice(lecturer_ids),
+                      max_students=settings.MAX_CLASSROOM_SIZE)
+            for i in chunk
+        ])
+    by_faculty = [[] for _ in faculty_rows]
+    for i, classroom in enumerate(classroom_rows):
+        by_faculty[i % subjects % faculties].append(classroom.id)
+    for ranked in by_faculty:
+        rng.shuffle(ranked)
+    cum_weights = [zipf_cum_weights(len(ranked), zipf_exponent) for ranked in by_faculty]
+    # student ids per classroom, for the attendance and submissions below
+    members = {classroom.id: [] for classroom in classroom_rows}
+
+    through = Classroom.students.through
+    for chunk in chunked(range(students), chunk_size):
+        rows = writer.write(CustomUser, [
+            CustomUser(email=university.email('s', i), user_type='student', password=encoded,
+                       first_name='Student', last_name=str(i), is_authorized=True)
+            for i in chunk
+        ])
+        for student in rows:
+            faculty = rng.randrange(faculties)
+            writer.add(StudentFaculty(student_id=student.id, faculty_id=faculty_rows[faculty].id,
+                                      status='active' if rng.random() < 0.95 else 'inactive'))
+            ranked = by_faculty[faculty]
+            if not ranked:
+                continue
+            wanted = min(len(ranked), rng.randint(1, classrooms_per_student))
+            picked = set()
+            # sample without replacement by redrawing duplicates; cheap while wanted << len(ranked)
+            for _ in range(wanted * 4):
+                picked.add(ranked[bisect.bisect(cum_weights[faculty], rng.random() * cum_weights[faculty][-1])])
+                if len(picked) == wanted:
+                    break
+            for classroom_id in picked:
+                members[classroom_id].append(student.id)
+                writer.add(through(classroom_id=classroom_id, customuser_id=student.id))
+    writer.flush()
+
+    # popular classrooms were opened with more seats
+    for classroom in classroom_rows:
+        classroom.enrolled_count = len(members[classroom.id])
+        classroom.max_students = max(settings.MAX_CLASSROOM_SIZE, classroom.enrolled_count)
+        classroom.is_full = classroom.enrolled_count >= classroom.max_students
+    for chunk in chunked(classroom_rows, chunk_size):
+        with transaction.atomic():
+            Classroom.objects.bulk_update(chunk, ['enrolled_count', 'max_students', 'is_full'])
+
+    session_rows = []
+    for chunk in chunked(enumerate(classroom_rows), max(1, chunk_size // sessions)):
+        session_rows += writer.write(ClassroomCalendar, [
+            session for i, classroom in chunk
+            for session in expand_sessions(classroom, semester_start, (i % 5, (i + 2) % 5),
+                                           datetime.time(8 + i % 10), sessions)
+        ])
+    homework_rows = []
+    for chunk in chunked(classroom_rows, max(1, chunk_size // max(1, homeworks))):
+        homework_rows += writer.write(Homework, [
+            Homework(classroom=classroom, title=f'Homework {n}', description='synthetic homework',
+                     due_date=_due_date(rng, semester_start_at))
+            for classroom in chunk for n in range(homeworks)
+        ])
+    sessions_by_classroom = {}
+    for session in session_rows:
+        if session.date < today:
+            sessions_by_classroom.setdefault(session.classroom_id, []).append(session)
+    homeworks_by_classroom = {}
+    for homework in homework_rows:
+        homeworks_by_classroom.setdefault(homework.classroom_id, []).append(homework)
+
+    now = timezone.now()
+    for classroom in classroom_rows:
+        past_sessions = sessions_by_classroom.get(classroom.id, [])
+        for n, session in enumerate(past_sessions):
+            fade = 1 - 0.25 * n / max(1, len(past_sessions))
+            for student_id in members[classroom.id]:
+                if rng.random() < _propensity(student_id) * fade:
+                    writer.add(ClassroomAttendance(classroom_date_id=session.id, student_id=student_id, status=True))
+        for homework in homeworks_by_classroom.get(classroom.id, []):
+            # exam-season homework is handed in more reliably; future deadlines are still open
+            week = (homework.due_date - semester_start_at).days / 7
+            rate = 1.0 if min(abs(week - 7), abs(week - 14)) < 1.5 else 0.85
+            if homework.due_date > now:
+                rate *= 0.3
+            for student_id in members[classroom.id]:
+                if rng.random() < _propensity(student_id) * rate:
+                    writer.add(StudentHomework(student_id=student_id, homework_id=homework.id,
+                                               classroom_id=classroom.id,
+                                               homework_url=f'https://example.com/submissions/{student_id}',
+                                               homework_text='synthetic answer'))
+    writer.flush()
+    # bulk_create bypasses the counter upkeep of apply_attendance() and faculty.signals
+    recount_attendance([session.id for session in session_rows])
+    recount_submissions([homework.id for homework in homework_rows])
+    writer.counts[AttendanceSummary.__name__] = refresh_attendance_summary([classroom.id for classroom in classroom_rows])
+    return writer.counts
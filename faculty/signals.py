@@ -0,0 +1,112 @@
+from django.db.models import F, QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from faculty.models import Classroom, ClassroomCalendar, Faculty, Homework, StudentHomework, Subject
+from faculty.enrollment import recount_enrollment
+from faculty.catalog import invalidate_classrooms, invalidate_faculties, invalidate_subjects
+from faculty.jobs import enqueue
+from faculty import search
+
+
+@receiver(m2m_changed, sender=Classroom.students.through)
+def sync_enrolled_count(sender, instance, action, reverse, pk_set, **kwargs):
+    # Keeps Classroom.enrolled_count in step with students.add/remove/clear made
+    # outside faculty.enrollment (admin, shell); enroll() maintains it itself.
+    if action == 'pre_clear' and reverse:
+        instance._cleared_classroom_ids = list(instance.classrooms.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        classroom_ids = [instance.pk]
+    elif action == 'post_clear':
+        classroom_ids = getattr(instance, '_cleared_classroom_ids', [])
+    else:
+        classroom_ids = pk_set
+    recount_enrollment(classroom_ids)
+    invalidate_classrooms(classroom_ids)
+
+
+@receiver(post_save, sender=Subject)
+@receiver(pre_delete, sender=Subject)
+def invalidate_subject_catalog(sender, instance, **kwargs):
+    invalidate_subjects([instance.pk])
+
+
+@receiver(post_save, sender=Faculty)
+@receiver(pre_delete, sender=Faculty)
+def invalidate_faculty_catalog(sender, instance, **kwargs):
+    invalidate_faculties([instance.pk])
+
+
+@receiver(m2m_changed, sender=Faculty.subjects.through)
+def invalidate_faculty_subjects(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            invalidate_faculties([instance.pk])
+    elif action == 'pre_clear':
+        invalidate_faculties(instance.faculty.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        invalidate_faculties(pk_set)
+
+
+@receiver(post_save, sender=Classroom)
+@receiver(pre_delete, sender=Classroom)
+def invalidate_classroom_catalog(sender, instance, **kwargs):
+    invalidate_subjects([instance.subject_id])
+
+
+def _cascaded_from(origin, *models):
+    # post_delete's origin is the instance or queryset whose delete() started the cascade
+    return issubclass(origin.model if isinstance(origin, QuerySet) else type(origin), models)
+
+
+@receiver(post_delete, sender=ClassroomCalendar)
+def refresh_summary_after_session_delete(sender, instance, origin=None, **kwargs):
+    # the session's attendance rows went with it; nothing to do when the classroom went too
+    if origin is not None and _cascaded_from(origin, Classroom, Subject):
+        return
+    enqueue('faculty.refresh_attendance_summary', classroom_ids=[instance.classroom_id])
+
+
+@receiver(post_save, sender=StudentHomework)
+def count_submission(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Homework.objects.filter(pk=instance.homework_id).update(submission_count=F('submission_count') + 1)
+
+
+@receiver(post_delete, sender=StudentHomework)
+def uncount_submission(sender, instance, origin=None, **kwargs):
+    if origin is not None and _cascaded_from(origin, Homework, Classroom, Subject):
+        return
+    Homework.objects.filter(pk=instance.homework_id, submission_count__gt=0) \
+        .update(submission_count=F('submission_count') - 1)
+
+
+SEARCH_KINDS = {Subject: 'subject', Homework: 'homework', StudentHomework: 'submission'}
+
+
+@receiver(post_save, sender=Subject)
+@receiver(post_save, sender=Homework)
+@receiver(post_save, sender=StudentHomework)
+def index_for_search(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    search.index(SEARCH_KINDS[sender], [instance.pk])
+    if sender is Homework and not created:
+        # submissions are indexed under their homework's title
+        search.index('submission', list(instance.studenthomework_set.values_list('id', flat=True)))
+
+
+@receiver(post_save, sender=StudentHomework)
+def update_submission_signature(sender, instance, raw=False, **kwargs):
+    # MinHash is pure Python, so it stays out of the request that saved the form
+    if not raw:
+        enqueue('faculty.submission_signature', submission_id=instance.pk)
+
+
+@receiver(post_delete, sender=Subject)
+@receiver(post_delete, sender=Homework)
+@receiver(post_delete, sender=StudentHomework)
+def unindex_for_search(sender, instance, **kwargs):
+    search.remove(SEARCH_KINDS[sender], [instance.pk])
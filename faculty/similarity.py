@@ -0,0 +1,186 @@
+import hashlib
+import re
+import struct
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from faculty.models import StudentHomework, SubmissionBand, SubmissionSignature
+from faculty.roster import chunked
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+MASK = 0xFFFFFFFF
+# added per bin skipped when an empty bin borrows a neighbour's minimum
+OFFSET = 0x9E3779B1
+SIGNATURE = struct.Struct(f'<{NUM_PERM}I')
+
+
+def shingles(text, size=None):
+    """
+    64-bit hashes of every run of `size` consecutive words (settings.SIMILARITY_SHINGLE_SIZE)
+    of the lowercased text.
+    """
+    size = size or settings.SIMILARITY_SHINGLE_SIZE
+    words = re.findall(r'\w+', (text or '').lower())
+    return {int.from_bytes(hashlib.blake2b(' '.join(words[i:i + size]).encode(), digest_size=8).digest(), 'little')
+            for i in range(len(words) - size + 1)}
+
+
+def minhash(hashes):
+    """
+    A one-permutation MinHash: each hash goes to one of NUM_PERM bins by its low
+    bits and the bin keeps the minimum of the rest, cut to 32 bits. Empty bins take
+    the next non-empty bin's minimum, offset by the distance (rotation densification).
+    One pass over the shingles instead of NUM_PERM, which matters in pure Python.
+    """
+    bins = [None] * NUM_PERM
+    for value in hashes:
+        slot, value = value % NUM_PERM, (value // NUM_PERM) & MASK
+        if bins[slot] is None or value < bins[slot]:
+            bins[slot] = value
+    signature = []
+    for slot in range(NUM_PERM):
+        distance = 0
+        while bins[(slot + distance) % NUM_PERM] is None:
+            distance += 1
+        signature.append((bins[(slot + distance) % NUM_PERM] + distance * OFFSET) & MASK)
+    return signature
+
+
+def pack(signature):
+    return SIGNATURE.pack(*signature)
+
+
+def unpack(data):
+    return SIGNATURE.unpack(bytes(data))
+
+
+def band_keys(signature):
+    """
+    One signed 64-bit key per band of ROWS values. Two submissions share a key when a
+    whole band matches, which for Jaccard similarity s happens with probability
+    1 - (1 - s ** ROWS) ** BANDS: about 0.95 at s=0.8 and 0.06 at s=0.5.
+    """
+    return [int.from_bytes(hashlib.blake2b(struct.pack(f'<H{ROWS}I', band, *signature[band * ROWS:(band + 1) * ROWS]),
+                                           digest_size=8).digest(), 'little', signed=True)
+            for band in range(BANDS)]
+
+
+def similarity(a, b):
+    """
+    Estimated Jaccard similarity of two signatures: the fraction of equal minimums.
+    """
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def _rows(submission_id, homework_id, text):
+    hashes = shingles(text)
+    if len(hashes) < settings.SIMILARITY_MIN_SHINGLES:
+        return None, []
+    signature = minhash(hashes)
+    return (SubmissionSignature(submission_id=submission_id, homework_id=homework_id, signature=pack(signature),
+                                shingles=len(hashes)),
+            [SubmissionBand(submission_id=submission_id, homework_id=homework_id, key=key)
+             for key in band_keys(signature)])
+
+
+def update_signature(submission_id):
+    """
+    Recompute the signature and LSH bands of one submission; texts with fewer than
+    SIMILARITY_MIN_SHINGLES shingles get none, as they would match by chance.
+    """
+    submission = StudentHomework.objects.only('id', 'homework_id', 'homework_text').filter(pk=submission_id).first()
+    if submission is None:
+        return
+    signature, bands = _rows(submission.id, submission.homework_id, submission.homework_text)
+    with transaction.atomic():
+        SubmissionSignature.objects.filter(submission_id=submission_id).delete()
+        SubmissionBand.objects.filter(submission_id=submission_id).delete()
+        if signature is not None:
+            signature.save(force_insert=True)
+            SubmissionBand.objects.bulk_create(bands)
+
+
+def rebuild_signatures(submissions=None, batch_size=1000):
+    """
+    Recompute the signatures of `submissions` (a StudentHomework queryset, all by
+    default) in batches. Returns the number of signatures written.
+    """
+    submissions = StudentHomework.objects.all() if submissions is None else submissions
+    written = 0
+    with transaction.atomic():
+        SubmissionSignature.objects.filter(submission__in=submissions).delete()
+        SubmissionBand.objects.filter(submission__in=submissions).delete()
+        rows = submissions.order_by().values_list('id', 'homework_id', 'homework_text').iterator(chunk_size=batch_size)
+        for chunk in chunked(rows, batch_size):
+            signatures, bands = [], []
+            for submission_id, homework_id, text in chunk:
+                signature, submission_bands = _rows(submission_id, homework_id, text)
+                if signature is not None:
+                    signatures.append(signature)
+                    bands.extend(submission_bands)
+            SubmissionSignature.objects.bulk_create(signatures, batch_size=batch_size)
+            SubmissionBand.objects.bulk_create(bands, batch_size=batch_size)
+            written += len(signatures)
+    return written
+
+
+def _scope(queryset, homework_id=None, subject_id=None):
+    if homework_id is not None:
+        queryset = queryset.filter(homework_id=homework_id)
+    if subject_id is not None:
+        queryset = queryset.filter(homework__classroom__subject_id=subject_id)
+    return queryset
+
+
+def _verified(pairs, threshold):
+    """
+    Keep the candidate pairs whose signatures agree on at least `threshold`.
+    """
+    ids = {submission_id for pair in pairs for submission_id in pair}
+    signatures = {}
+    for chunk in chunked(ids, 5000):
+        signatures.update((submission_id, unpack(data)) for submission_id, data in
+                          SubmissionSignature.objects.filter(submission_id__in=chunk)
+                          .values_list('submission_id', 'signature'))
+    matches = []
+    for a, b in pairs:
+        score = similarity(signatures[a], signatures[b])
+        if score >= threshold:
+            matches.append((a, b, score))
+    return sorted(matches, key=lambda match: (-match[2], match[0], match[1]))
+
+
+def similar_submissions(submission_id, homework_id=None, subject_id=None, threshold=None):
+    """
+    [(other_submission_id, similarity)] of the submissions sharing an LSH band with
+    this one and passing `threshold` (settings.SIMILARITY_THRESHOLD), most similar
+    first, optionally limited to a homework or a subject's classrooms.
+    """
+    threshold = settings.SIMILARITY_THRESHOLD if threshold is None else threshold
+    keys = SubmissionBand.objects.filter(submission_id=submission_id).values('key')
+    candidates = _scope(SubmissionBand.objects.filter(key__in=keys), homework_id, subject_id) \
+        .exclude(submission_id=submission_id).values_list('submission_id', flat=True).distinct()
+    pairs = [(submission_id, other) for other in candidates]
+    return [(b, score) for _, b, score in _verified(pairs, threshold)]
+
+
+def duplicate_pairs(homework_id=None, subject_id=None, threshold=None):
+    """
+    [(submission_id, submission_id, similarity)] of the near-duplicates within a
+    homework, a subject's classrooms or everything. Candidates come from grouping the
+    band keys, so only submissions sharing a bucket are ever compared.
+    """
+    threshold = settings.SIMILARITY_THRESHOLD if threshold is None else threshold
+    buckets = defaultdict(list)
+    for key, submission_id in _scope(SubmissionBand.objects.all(), homework_id, subject_id) \
+            .values_list('key', 'submission_id').iterator(chunk_size=10000):
+        buckets[key].append(submission_id)
+    pairs = set()
+    for members in buckets.values():
+        if len(members) > 1:
+            members.sort()
+            pairs.update((a, b) for i, a in enumerate(members) for b in members[i + 1:])
+    return _verified(pairs, threshold)
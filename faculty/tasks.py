@@ -0,0 +1,63 @@
+import gzip
+import logging
+import os
+import shutil
+
+from django.db import transaction
+from faculty.analytics import refresh_attendance_summary
+from faculty.counters import recount_attendance, recount_submissions
+from faculty.deadlines import close_expired_homework, notify_deadlines
+from faculty.enrollment import recount_enrollment
+from faculty.jobs import task
+from faculty.models import Classroom
+from faculty.similarity import update_signature
+
+logger = logging.getLogger(__name__)
+
+# keep the .gz copy only when it saves at least this fraction of the file
+MIN_GZIP_SAVING = 0.1
+
+
+@task('faculty.process_syllabus')
+def process_syllabus(classroom_id):
+    """
+    Write a gzip copy next to an uploaded syllabus, for front-end servers that serve
+    precompressed files (nginx gzip_static behind SENDFILE_BACKEND='xaccel').
+    """
+    classroom = Classroom.objects.only('id', 'syllabus').filter(pk=classroom_id).first()
+    if classroom is None or not classroom.syllabus:
+        return
+    path = classroom.syllabus.path
+    compressed = path + '.gz'
+    with open(path, 'rb') as source, gzip.open(compressed, 'wb') as target:
+        shutil.copyfileobj(source, target)
+    size, compressed_size = os.path.getsize(path), os.path.getsize(compressed)
+    if compressed_size > size * (1 - MIN_GZIP_SAVING):
+        os.remove(compressed)
+    logger.info('syllabus processed classroom=%s bytes=%d gzip_bytes=%d', classroom_id, size, compressed_size)
+
+
+@task('faculty.refresh_attendance_summary')
+def refresh_summary(classroom_ids=None):
+    refresh_attendance_summary(classroom_ids)
+
+
+@task('faculty.reconcile_counters')
+def reconcile_counters(summary=False):
+    with transaction.atomic():
+        recount_enrollment()
+        recount_submissions()
+        recount_attendance()
+        if summary:
+            refresh_attendance_summary()
+
+
+@task('faculty.notify_deadlines')
+def notify_and_close(hours=None):
+    notify_deadlines(hours)
+    close_expired_homework()
+
+
+@task('faculty.submission_signature')
+def submission_signature(submission_id):
+    update_signature(submission_id)
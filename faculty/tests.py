@@ -1,3 +1,884 @@
-from django.test import TestCase
+import datetime
+import io
+import random
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import OperationalError, connections
+from django.db.models import F
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from faculty import async_views, jobs, similarity
+from faculty.analytics import faculty_report, session_rates, student_rates, weekly_trend
+from faculty.attendance import apply_attendance, load_attendance
+from faculty.catalog import CACHE_METRIC, get_faculty_catalog
+from faculty.choices import JobStatus
+from faculty.counters import counter_drift
+from faculty.dashboard import homework_submissions, iter_submissions
+from faculty.deadlines import close_expired_homework, notify_deadlines
+from faculty.enrollment import ALREADY_JOINED, FULL, JOINED, enroll
+from faculty.forms import ClassroomCalendarForm
+from faculty.metrics import registry
+from faculty.models import AttendanceSummary, Classroom, ClassroomAttendance, ClassroomCalendar, Faculty, Homework, \
+    Job, Notification, StudentFaculty, StudentHomework, Subject, SubmissionSignature
+from faculty.roster import import_enrollments, import_faculties, import_users, read_rows
+from faculty.search import search
+from faculty.scheduling import Timetable, expand_sessions
+from faculty.seeding import generate_university
+from users.models import CustomUser
+
+
+def make_users(prefix, user_type, count):
+    return CustomUser.objects.bulk_create([
+        CustomUser(email=f'{prefix}{i}@example.com', user_type=user_type, first_name=prefix, last_name=str(i))
+        for i in range(count)
+    ])
+
+
+def async_get(path, user, **data):
+    request = AsyncRequestFactory().get(path, data)
+
+    async def auser():
+        return user
+    request.auser = auser
+    return request
+
+
+calls = []
+
+
+@jobs.task('tests.record')
+def record(n, fail_times=0, seconds=0):
+    calls.append(n)
+    time.sleep(seconds)
+    if calls.count(n) <= fail_times:
+        raise RuntimeError('boom')
+
+
+class EnrollmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        lecturer = CustomUser.objects.create(email='lecturer@example.com', user_type='lecturer')
+        cls.students = make_users('student', 'student', 3)
+        cls.classroom = Classroom.objects.create(subject=Subject.objects.create(name='Subject', description=''),
+                                                 lecturer=lecturer, max_students=2)
+
+    def test_full_classroom(self):
+        self.assertEqual(enroll(self.classroom.id, self.students[0]), JOINED)
+        self.assertEqual(enroll(self.classroom.id, self.students[1]), JOINED)
+        self.assertEqual(enroll(self.classroom.id, self.students[2]), FULL)
+        # an enrolled student rejoining a full classroom is told so, not that it is full
+        self.assertEqual(enroll(self.classroom.id, self.students[0]), ALREADY_JOINED)
+        self.classroom.refresh_from_db()
+        self.assertEqual((self.classroom.enrolled_count, self.classroom.is_full), (2, True))
+
+    def test_missing_classroom(self):
+        with self.assertRaises(Classroom.DoesNotExist):
+            enroll(self.classroom.id + 1, self.students[0])
+        self.client.force_login(self.students[0])
+        response = self.client.get(reverse('faculty:join_classroom', args=[self.classroom.id + 1]))
+        self.assertEqual(response.status_code, 404)
+
+
+class ConcurrentEnrollmentTests(TransactionTestCase):
+    """
+    Students joining at the same time never push a classroom over max_students.
+    """
+
+    def test_capacity(self):
+        lecturer = CustomUser.objects.create(email='lecturer@example.com', user_type='lecturer')
+        classroom = Classroom.objects.create(subject=Subject.objects.create(name='Subject', description=''),
+                                             lecturer=lecturer, max_students=5)
+        students = make_users('student', 'student', 20)
+        start, results = threading.Barrier(len(students)), []
+
+        def join(student):
+            try:
+                start.wait()
+                results.append(enroll(classroom.id, student))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=join, args=[student]) for student in students]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(results), [FULL] * 15 + [JOINED] * 5)
+        classroom.refresh_from_db()
+        self.assertEqual((classroom.enrolled_count, classroom.is_full), (5, True))
+        self.assertEqual(classroom.students.count(), 5)
+
+
+class CatalogCacheTests(TestCase):
+    """
+    The catalog is served from the cache until a subject, faculty or classroom edit
+    invalidates it; hits and misses are reported on /metrics.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lecturer = CustomUser.objects.create(email='lecturer@example.com', user_type='lecturer', is_staff=True)
+        cls.subject = Subject.objects.create(name='Algebra', description='')
+        cls.faculty = Faculty.objects.create(name='Faculty')
+        cls.faculty.subjects.add(cls.subject)
+
+    def setUp(self):
+        caches['catalog'].clear()
+        registry.reset()
+
+    def catalog(self):
+        return [(subject.name, len(subject.classrooms)) for subject in get_faculty_catalog(self.faculty.id)]
+
+    def test_invalidation(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(self.catalog(), [('Algebra', 0)])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.catalog(), [('Algebra', 0)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.subject.name = 'Linear Algebra'
+            self.subject.save()
+        self.assertEqual(self.catalog(), [('Linear Algebra', 0)])
+        with self.captureOnCommitCallbacks(execute=True):
+            Classroom.objects.create(subject=self.subject, lecturer=self.lecturer)
+        self.assertEqual(self.catalog(), [('Linear Algebra', 1)])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.faculty.subjects.add(Subject.objects.create(name='Geometry', description=''))
+        self.assertEqual(sorted(self.catalog()), [('Geometry', 0), ('Linear Algebra', 1)])
+
+        self.client.force_login(self.lecturer)
+        counters = self.client.get(reverse('faculty:metrics'), {'format': 'json'}).json()['counters']
+        self.assertEqual(counters[CACHE_METRIC]['result=hit'], 1)
+        self.assertEqual(counters[CACHE_METRIC]['result=miss'], 4)
+        prometheus = self.client.get(reverse('faculty:metrics')).content.decode()
+        self.assertIn(f'{CACHE_METRIC}{{result="miss"}} 4', prometheus)
+
+
+class RosterImportTests(TestCase):
+    """
+    Bad rows, malformed JSONL lines included, are reported by line; rows that were
+    already there are not counted as created.
+    """
+
+    def rows(self, text, fmt='jsonl'):
+        return list(read_rows(io.StringIO(text), fmt))
+
+    def test_users(self):
+        chunk = self.rows('{"email": "a@example.com", "user_type": "student"}\n'
+                          '{"email": "b@example.com", "user_type"\n'
+                          '\n'
+                          '["c@example.com", "student"]\n'
+                          '{"email": "d@example.com", "user_type": "admin"}\n')
+        created, errors = import_users(chunk)
+        self.assertEqual(created, 1)
+        self.assertEqual([line_number for line_number, _ in errors], [2, 4, 5])
+        self.assertTrue(errors[0][1].startswith('invalid JSON'))
+        self.assertEqual(errors[1][1], 'expected a JSON object')
+        self.assertEqual(import_users(chunk[:1]), (0, [(1, 'a@example.com already exists')]))
+
+    def test_faculties_and_enrollments(self):
+        student = CustomUser.objects.create(email='a@example.com', user_type='student')
+        faculty = Faculty.objects.create(name='Faculty')
+        created, errors = import_faculties(self.rows('email,faculty,status\n'
+                                                     'a@example.com,Faculty,Graduated\n'
+                                                     'a@example.com,Faculty,expelled\n', 'csv'))
+        self.assertEqual(created, 1)
+        self.assertEqual(errors, [(3, 'status must be one of active, graduated, inactive')])
+        self.assertEqual(StudentFaculty.objects.get(student=student, faculty=faculty).status, 'graduated')
+
+        lecturer = CustomUser.objects.create(email='lecturer@example.com', user_type='lecturer')
+        classroom = Classroom.objects.create(subject=Subject.objects.create(name='Subject', description=''),
+                                             lecturer=lecturer)
+        chunk = self.rows(f'email,classroom\na@example.com,{classroom.id}\na@example.com,{classroom.id}\n', 'csv')
+        self.assertEqual(import_enrollments(chunk), (1, []))
+        self.assertEqual(import_enrollments(chunk), (0, []))
+        classroom.refresh_from_db()
+        self.assertEqual(classroom.enrolled_count, 1)
+
+
+class GenerateUniversityTests(TestCase):
+    def test_counters_match(self):
+        counts = generate_university('test', students=60, faculties=2, subjects=4, classrooms=9, sessions=4,
+                                     homeworks=2, chunk_size=50, semester_start=datetime.date(2026, 1, 5))
+        self.assertEqual(counts['CustomUser'], 63)
+        self.assertTrue(counts['ClassroomAttendance'])
+        self.assertTrue(counts['StudentHomework'])
+        self.assertEqual(set(counter_drift().values()), {0})
+        # attendance and submissions only come from enrolled students
+        self.assertFalse(ClassroomAttendance.objects.exclude(student__classrooms=F('classroom_date__classroom')))
+        self.assertFalse(StudentHomework.objects.exclude(student__classrooms=F('classroom')))
+
+
+class DeadlineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        lecturer = CustomUser.objects.create(email='lecturer@example.com', user_type='lecturer')
+        cls.classroom = Classroom.objects.create(subject=Subject.objects.create(name='Subject', description=''),
+                                                 lecturer=lecturer)
+        cls.students = make_users('student', 'student', 3)
+        cls.classroom.students.add(*cls.students)
+        cls.now = timezone.now()
+        cls.due = Homework.objects.create(classroom=cls.classroom, title='Due', description='',
+                                          due_date=cls.now + datetime.timedelta(hours=2))
+        cls.expired = Homework.objects.create(classroom=cls.classroom, title='Expired', description='',
+                                              due_date=cls.now - datetime.timedelta(hours=2))
+        Homework.objects.create(classroom=cls.classroom, title='Later', description='',
+                                due_date=cls.now + datetime.timedelta(days=7))
+        StudentHomework.objects.create(student=cls.students[0], homework=cls.due, classroom=cls.classroom,
+                                       homework_url='https://example.com/')
+
+    def test_notified_once(self):
+        self.assertEqual(notify_deadlines(24, self.now), (1, 2))
+        self.assertEqual(notify_deadlines(24, self.now), (1, 0))
+        self.assertEqual(set(Notification.objects.values_list('homework', 'recipient')),
+                         {(self.due.id, student.id) for student in self.students[1:]})
+
+    def test_close_expired(self):
+        self.assertEqual(close_expired_homework(self.now), 1)
+        self.assertEqual(close_expired_homework(self.now), 0)
+        self.assertEqual(list(Homework.objects.filter(is_active=False)), [self.expired])
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def stale(self, job):
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - datetime.timedelta(hours=1))
+
+    def test_retry(self):
+        job = jobs.enqueue('tests.record', n=1, fail_times=1, max_attempts=2)
+        self.assertFalse(jobs.run(jobs.claim('worker')[0]))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.QUEUED, 1))
+        self.assertIn('boom', job.last_error)
+        # backing off until run_at
+        self.assertEqual(jobs.claim('worker'), [])
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertTrue(jobs.run(jobs.claim('worker')[0]))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.last_error), (JobStatus.DONE, 2, ''))
+
+        job = jobs.enqueue('tests.record', n=2, fail_times=1, max_attempts=1)
+        self.assertFalse(jobs.run(jobs.claim('worker')[0]))
+        self.assertEqual(Job.objects.get(pk=job.pk).status, JobStatus.FAILED)
+
+    def test_lease(self):
+        job = jobs.enqueue('tests.record', n=1, max_attempts=2)
+        claimed = jobs.claim('lost')[0]
+        # a long job still heartbeating keeps its lease
+        Job.objects.filter(pk=job.pk).update(started_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(jobs.requeue_stale(), (0, 0))
+        self.stale(job)
+        self.assertEqual(jobs.requeue_stale(), (1, 0))
+        # the worker that lost the lease cannot finish the job any more
+        jobs.run(claimed)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, JobStatus.QUEUED)
+
+        self.stale(jobs.claim('killed')[0])
+        self.assertEqual(jobs.requeue_stale(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.last_error), (JobStatus.FAILED, jobs.LOST))
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager(self):
+        out = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconcile_counters', enqueue=True, stdout=out)
+        self.assertIn('ran faculty.reconcile_counters in this process', out.getvalue())
+        self.assertFalse(Job.objects.exists())
+
+
+class JobHeartbeatTests(TransactionTestCase):
+    @override_settings(JOB_HEARTBEAT_INTERVAL=0.05)
+    def test_survives_errors(self):
+        job = jobs.enqueue('tests.record', n=1, seconds=0.5)
+        job = jobs.claim('worker')[0]
+        owned = jobs._owned
+        failures = iter([OperationalError('database is locked')])
+
+        def flaky_owned(job):
+            error = next(failures, None)
+            if error:
+                raise error
+            return owned(job)
+
+        with mock.patch.object(jobs, '_owned', flaky_owned), self.assertLogs('faculty.jobs', 'WARNING') as logs:
+            self.assertTrue(jobs.run(job))
+        self.assertIn('database is locked', logs.output[0])
+        self.assertGreater(Job.objects.get(pk=job.pk).heartbeat_at, job.started_at)
+
+
+class SyllabusDownloadTests(TestCase):
+    """
+    Syllabus downloads answer byte ranges, unsatisfiable ranges, If-Range and
+    conditional requests.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.media_root)
+        lecturer = CustomUser.objects.create(email='lecturer@example.com', user_type='lecturer')
+        cls.classroom = Classroom.objects.create(subject=Subject.objects.create(name='Subject', description=''),
+                                                 lecturer=lecturer)
+        cls.content = bytes(range(256)) * 400
+        with override_settings(MEDIA_ROOT=cls.media_root):
+            cls.classroom.syllabus.save('syllabus.pdf', ContentFile(cls.content))
+
+    def setUp(self):
+        media = override_settings(MEDIA_ROOT=self.media_root, SENDFILE_BACKEND=None)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def get(self, **headers):
+        return self.client.get(reverse('faculty:download_file', args=[self.classroom.id]), headers=headers)
+
+    def test_full(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="syllabus.pdf"')
+
+    def test_ranges(self):
+        size = len(self.content)
+        for header, (start, end) in [('bytes=100-199', (100, 199)), ('bytes=-50', (size - 50, size - 1)),
+                                     (f'bytes={size - 10}-', (size - 10, size - 1)),
+                                     (f'bytes=0-{size * 2}', (0, size - 1))]:
+            with self.subTest(header):
+                response = self.get(range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{size}')
+                self.assertEqual(b''.join(response.streaming_content), self.content[start:end + 1])
+        for header in (f'bytes={size}-', 'bytes=-0', 'bytes=20-10'):
+            with self.subTest(header):
+                response = self.get(range=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], f'bytes */{size}')
+        # multi-range and malformed headers get the whole file
+        self.assertEqual(self.get(range='bytes=0-1,5-6').status_code, 200)
+
+    def test_revalidation(self):
+        first = self.get()
+        etag, last_modified = first['ETag'], first['Last-Modified']
+        self.assertEqual(self.get(if_none_match=etag).status_code, 304)
+        self.assertEqual(self.get(if_modified_since=last_modified).status_code, 304)
+        self.assertEqual(self.get(range='bytes=0-9', if_range=etag).status_code, 206)
+        self.assertEqual(self.get(range='bytes=0-9', if_range=last_modified).status_code, 206)
+        # the file changed since the client's copy: the whole file, not a range of the new one
+        self.assertEqual(self.get(range='bytes=0-9', if_range='"stale"').status_code, 200)
+
+    def test_offloaded(self):
+        with override_settings(SENDFILE_BACKEND='xaccel'):
+            response = self.get()
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.classroom.syllabus.name}')
+        self.assertEqual(response.content, b'')
+
+
+class CounterTests(TestCase):
+    """
+    The denormalized counters follow saves and deletes made outside the services that
+    maintain them, and reconcile_counters repairs what drifts anyway.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        lecturer = CustomUser.objects.create(email='lecturer@example.com', user_type='lecturer')
+        cls.classroom = Classroom.objects.create(subject=Subject.objects.create(name='Subject', description=''),
+                                                 lecturer=lecturer, max_students=3)
+        cls.students = make_users('student', 'student', 3)
+        cls.homework = Homework.objects.create(classroom=cls.classroom, title='Homework', description='',
+                                               due_date=timezone.now() + datetime.timedelta(days=1))
+
+    def counts(self):
+        self.classroom.refresh_from_db()
+        self.homework.refresh_from_db()
+        return self.classroom.enrolled_count, self.classroom.is_full, self.homework.submission_count
+
+    def submit(self, student):
+        return StudentHomework.objects.create(student=student, homework=self.homework, classroom=self.classroom,
+                                              homework_url='https://example.com/')
+
+    def test_enrollment(self):
+        self.classroom.students.add(*self.students)
+        self.assertEqual(self.counts()[:2], (3, True))
+        self.classroom.students.remove(self.students[0])
+        self.assertEqual(self.counts()[:2], (2, False))
+        self.students[1].classrooms.clear()
+        self.assertEqual(self.counts()[:2], (1, False))
+        self.students[0].classrooms.add(self.classroom)
+        self.classroom.students.clear()
+        self.assertEqual(self.counts()[:2], (0, False))
+
+    def test_submissions(self):
+        submissions = [self.submit(student) for student in self.students]
+        self.assertEqual(self.counts()[2], 3)
+        submissions[0].homework_text = 'edited'
+        submissions[0].save()
+        self.assertEqual(self.counts()[2], 3)
+        submissions[0].delete()
+        self.assertEqual(self.counts()[2], 2)
+        # cascades from a deleted student count too
+        self.students[1].delete()
+        self.assertEqual(self.counts()[2], 1)
+        StudentHomework.objects.all().delete()
+        self.assertEqual(self.counts()[2], 0)
+
+    @override_settings(JOBS_EAGER=True)
+    def test_session_delete(self):
+        self.classroom.students.add(*self.students)
+        sessions = ClassroomCalendar.objects.bulk_create([
+            ClassroomCalendar(classroom=self.classroom, date=datetime.date(2026, 1, 5 + i),
+                              start_time=datetime.time(10))
+            for i in range(2)
+        ])
+        for session in sessions:
+            apply_attendance(session, {self.students[0].id: True, self.students[1].id: True})
+        apply_attendance(sessions[1], {self.students[1].id: False})
+        sessions[1].refresh_from_db()
+        self.assertEqual(sessions[1].present_count, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            sessions[0].delete()
+        self.assertEqual(dict(AttendanceSummary.objects.values_list('student', 'attended')), {self.students[0].id: 1})
+
+    def test_reconcile(self):
+        self.classroom.students.add(self.students[0])
+        self.submit(self.students[0])
+        Classroom.objects.update(enrolled_count=3, is_full=True)
+        Homework.objects.update(submission_count=0)
+        self.assertEqual(counter_drift()['Classroom.enrolled_count'], 1)
+        call_command('reconcile_counters', stdout=io.StringIO())
+        self.assertEqual(self.counts(), (1, False, 1))
+        self.assertEqual(set(counter_drift().values()), {0})
+
+
+class SearchTests(TestCase):
+    """
+    The index follows saves and deletes through signals; results are ranked with title
+    matches first and scoped to what the user may see.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        lecturers = make_users('lecturer', 'lecturer', 2)
+        cls.students = make_users('student', 'student', 2)
+        cls.algebra = Subject.objects.create(name='Linear algebra', description='Vector spaces and eigenvalues')
+        chemistry = Subject.objects.create(name='Organic chemistry', description='Carbon compounds')
+        cls.classrooms = [Classroom.objects.create(subject=subject, lecturer=lecturer)
+                          for subject, lecturer in zip((cls.algebra, chemistry), lecturers)]
+        for classroom, student in zip(cls.classrooms, cls.students):
+            classroom.students.add(student)
+        due = timezone.now() + datetime.timedelta(days=1)
+        cls.homework = [
+            Homework.objects.create(classroom=cls.classrooms[0], title='Eigenvalues of a rotation', description='',
+                                    due_date=due),
+            Homework.objects.create(classroom=cls.classrooms[1], title='Reaction rates',
+                                    description='Plot the eigenvalues of the rate matrix', due_date=due),
+        ]
+        cls.submissions = [
+            StudentHomework.objects.create(student=student, homework=homework, classroom=homework.classroom,
+                                           homework_url='https://example.com/', homework_text='Complex conjugates')
+            for student, homework in zip(cls.students, cls.homework)
+        ]
+
+    def found(self, text, **scope):
+        return [(result['kind'], result['object_id']) for result in search(text, **scope)]
+
+    def test_ranked(self):
+        results = self.found('eigenvalues', kinds=['homework', 'subject'])
+        # the title match outranks the body matches
+        self.assertEqual(results[0], ('homework', self.homework[0].id))
+        self.assertEqual(set(results[1:]), {('homework', self.homework[1].id), ('subject', self.algebra.id)})
+        # the last word is a prefix
+        self.assertEqual(set(self.found('conjug')), {('submission', submission.id) for submission in self.submissions})
+        [result] = search('rotation', kinds=['homework'])
+        self.assertEqual(str(result['title']), 'Eigenvalues of a <mark>rotation</mark>')
+
+    def test_signals(self):
+        homework = self.homework[0]
+        homework.title = 'Diagonalization'
+        homework.save()
+        self.assertEqual(self.found('rotation'), [])
+        # submissions are indexed under their homework's title
+        self.assertEqual(set(self.found('diagonalization')),
+                         {('homework', homework.id), ('submission', self.submissions[0].id)})
+        self.submissions[0].delete()
+        self.assertEqual(self.found('diagonalization'), [('homework', homework.id)])
+        # the subject's classroom and homework go with it
+        self.algebra.delete()
+        self.assertEqual(self.found('diagonalization'), [])
+        self.assertEqual(self.found('vector'), [])
+
+    def test_scoped(self):
+        student = self.students[0]
+        scoped = set(self.found('eigenvalues', classroom_ids=[self.classrooms[0].id], owner_id=student.id))
+        self.assertEqual(scoped, {('homework', self.homework[0].id), ('subject', self.algebra.id),
+                                  ('submission', self.submissions[0].id)})
+        self.assertEqual(set(self.found('conjugates', classroom_ids=[self.classrooms[0].id], owner_id=student.id)),
+                         {('submission', self.submissions[0].id)})
+        self.assertEqual(self.found('eigenvalues', subject_id=self.classrooms[1].subject_id),
+                         [('homework', self.homework[1].id)])
+
+        self.client.force_login(student)
+        results = self.client.get(reverse('faculty:search'), {'q': 'conjugates', 'format': 'json'}).json()['results']
+        self.assertEqual([result['object_id'] for result in results], [self.submissions[0].id])
+        self.assertEqual(results[0]['url'], reverse('faculty:homework_detail',
+                                                    args=[self.classrooms[0].id, self.homework[0].id]))
+
+
+def essay(seed, words=150):
+    rng = random.Random(seed)
+    return ' '.join(f'{rng.choice(["alpha", "beta", "gamma", "delta", "omega"])}{rng.randrange(50)}'
+                    for _ in range(words))
+
+
+@override_settings(JOBS_EAGER=True)
+class SimilarityTests(TestCase):
+    """
+    Near-identical submissions are paired, unrelated and too short ones are not.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        lecturer = CustomUser.objects.create(email='lecturer@example.com', user_type='lecturer')
+        cls.classroom = Classroom.objects.create(subject=Subject.objects.create(name='Subject', description=''),
+                                                 lecturer=lecturer)
+        cls.students = make_users('student', 'student', 5)
+        cls.homework = Homework.objects.create(classroom=cls.classroom, title='Essay', description='',
+                                               due_date=timezone.now() + datetime.timedelta(days=1))
+
+    def submit(self, texts):
+        with self.captureOnCommitCallbacks(execute=True):
+            return [StudentHomework.objects.create(student=student, homework=self.homework, classroom=self.classroom,
+                                                   homework_url='https://example.com/', homework_text=text).id
+                    for student, text in zip(self.students, texts)]
+
+    def test_duplicates(self):
+        original = essay(1)
+        edited = ' '.join(original.split()[:140] + ['changed'] * 10)
+        first, edited, unrelated, _, short = self.submit([original, edited, essay(2), essay(3), 'too short'])
+        # signatures come from the job queued on save
+        self.assertEqual(SubmissionSignature.objects.count(), 4)
+
+        pairs = similarity.duplicate_pairs(self.homework.id)
+        self.assertEqual([(a, b) for a, b, _ in pairs], [(first, edited)])
+        self.assertGreaterEqual(pairs[0][2], 0.8)
+        self.assertEqual([other_id for other_id, _ in similarity.similar_submissions(edited)], [first])
+        self.assertEqual(similarity.similar_submissions(unrelated), [])
+        self.assertEqual(similarity.similar_submissions(short), [])
+
+        self.assertEqual(similarity.rebuild_signatures(), 4)
+        self.assertEqual(similarity.duplicate_pairs(subject_id=self.classroom.subject_id), pairs)
+
+    def test_resubmission(self):
+        first, second = self.submit([essay(1), essay(1)])
+        self.assertEqual(similarity.duplicate_pairs(), [(first, second, 1.0)])
+        with self.captureOnCommitCallbacks(execute=True):
+            StudentHomework.objects.filter(pk=second).update(homework_text=essay(4))
+            StudentHomework.objects.get(pk=second).save()
+        self.assertEqual(similarity.duplicate_pairs(), [])
+
+
+class SchedulingTests(TestCase):
+    """
+    Recurrences expand in memory, clashes with the lecturer's other classrooms are
+    rejected and a schedule is saved with one INSERT.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lecturer = CustomUser.objects.create(email='lecturer@example.com', user_type='lecturer')
+        subject = Subject.objects.create(name='Subject', description='')
+        cls.classroom, cls.other = Classroom.objects.bulk_create([
+            Classroom(subject=subject, lecturer=cls.lecturer, number_of_classes=4) for _ in range(2)
+        ])
+        # Monday 5 January 2026, 22:00 to midnight
+        ClassroomCalendar.objects.create(classroom=cls.other, date=datetime.date(2026, 1, 5),
+                                         start_time=datetime.time(22))
+
+    def form(self, **data):
+        data = {'start_date': '2026-01-05', 'weekdays': ['0', '2'], 'start_time': '10:00', 'count': 4,
+                'holidays': '', **data}
+        return ClassroomCalendarForm(self.classroom, data)
+
+    def test_expand(self):
+        sessions = expand_sessions(self.classroom, datetime.date(2026, 1, 1), [0, 2], datetime.time(10), 5,
+                                   holidays=[datetime.date(2026, 1, 7)])
+        self.assertEqual([session.date.isoformat() for session in sessions],
+                         ['2026-01-05', '2026-01-12', '2026-01-14', '2026-01-19', '2026-01-21'])
+        with self.assertRaises(ValueError):
+            expand_sessions(self.classroom, datetime.date.max - datetime.timedelta(days=3), [0], datetime.time(10), 2)
+
+    def test_timetable(self):
+        sessions = [ClassroomCalendar(date=datetime.date(2026, 1, 5), start_time=datetime.time(hour), duration=2)
+                    for hour in (8, 9, 14)]
+        timetable = Timetable(sessions)
+        probe = ClassroomCalendar(date=datetime.date(2026, 1, 5), start_time=datetime.time(10), duration=1)
+        self.assertTrue(timetable.clashes(probe))
+        self.assertEqual(timetable.conflicts(probe), [sessions[1]])
+        probe.start_time = datetime.time(11)
+        self.assertFalse(timetable.clashes(probe))
+
+    def test_save(self):
+        form = self.form()
+        self.assertTrue(form.is_valid(), form.errors)
+        with self.assertNumQueries(1):
+            form.save(self.classroom)
+        self.assertEqual(list(ClassroomCalendar.objects.filter(classroom=self.classroom)
+                              .values_list('date', flat=True).order_by('date')),
+                         [datetime.date(2026, 1, day) for day in (5, 7, 12, 14)])
+
+    def test_conflicts(self):
+        form = self.form(start_time='23:00')
+        self.assertFalse(form.is_valid())
+        self.assertEqual(len(form.non_field_errors()), 1)
+        self.assertIn('2026-01-05 23:00:00 overlaps with', form.non_field_errors()[0])
+        # a session running past midnight clashes with the next morning
+        ClassroomCalendar.objects.create(classroom=self.other, date=datetime.date(2026, 1, 6),
+                                         start_time=datetime.time(23))
+        self.assertFalse(self.form(start_date='2026-01-07', weekdays=['2'], start_time='00:30', count=1).is_valid())
+
+    def test_count_bounded(self):
+        form = self.form(count=settings.MAX_SESSIONS_PER_SCHEDULE + 1)
+        self.assertFalse(form.is_valid())
+        self.assertIn('count', form.errors)
+
+
+class SubmissionsWorkbenchTests(TestCase):
+    """
+    Lecturers page through a homework's submissions by id with the students selected
+    and the texts deferred until a submission is opened.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lecturer, cls.stranger = make_users('lecturer', 'lecturer', 2)
+        cls.classroom = Classroom.objects.create(subject=Subject.objects.create(name='Subject', description=''),
+                                                 lecturer=cls.lecturer)
+        cls.homework = Homework.objects.create(classroom=cls.classroom, title='Homework', description='',
+                                               due_date=timezone.now() + datetime.timedelta(days=1))
+        cls.submissions = StudentHomework.objects.bulk_create([
+            StudentHomework(student=student, homework=cls.homework, classroom=cls.classroom,
+                            homework_url=f'https://example.com/{i}', homework_text=f'answer {i}')
+            for i, student in enumerate(make_users('student', 'student', 7))
+        ])
+
+    def test_pages(self):
+        ids, after_id = [], None
+        while True:
+            with self.assertNumQueries(1):
+                page, after_id = homework_submissions(self.homework, after_id, page_size=3)
+                self.assertTrue(all(submission.student.email for submission in page))
+            self.assertTrue(all('homework_text' in submission.get_deferred_fields() for submission in page))
+            ids += [submission.id for submission in page]
+            if after_id is None:
+                break
+        self.assertEqual(ids, [submission.id for submission in self.submissions])
+        self.assertEqual([submission.id for submission in iter_submissions(self.homework, batch_size=7)], ids)
+
+    @override_settings(SUBMISSIONS_PAGE_SIZE=4)
+    def test_views(self):
+        url = reverse('faculty:homework_submissions', args=[self.classroom.id, self.homework.id])
+        self.client.force_login(self.lecturer)
+        first = self.client.get(url, {'format': 'json'}).json()
+        second = self.client.get(url, {'format': 'json', 'after': first['next_after']}).json()
+        self.assertEqual([len(first['results']), len(second['results']), second['next_after']], [4, 3, None])
+        self.assertEqual(first['results'][0]['homework_url'], 'https://example.com/0')
+
+        response = self.client.get(url, {'format': 'jsonl'})
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 7)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        submission = self.submissions[0]
+        response = self.client.get(reverse('faculty:submission_detail',
+                                           args=[self.classroom.id, self.homework.id, submission.id]))
+        self.assertContains(response, 'answer 0')
+
+        self.client.force_login(self.stranger)
+        self.assertRedirects(self.client.get(url), reverse('faculty:profile'), fetch_redirect_response=False)
+
+
+class AttendanceQueryCountTests(TestCase):
+    """
+    Loading and saving a session's attendance issues the same queries for 10 students
+    as for 200.
+    """
+
+    def session(self, students):
+        lecturer = CustomUser.objects.create(email=f'lecturer{students}@example.com', user_type='lecturer')
+        classroom = Classroom.objects.create(subject=Subject.objects.create(name='Subject', description=''),
+                                             lecturer=lecturer, max_students=students)
+        roster = make_users(f'student{students}-', 'student', students)
+        classroom.students.add(*roster)
+        calendar = ClassroomCalendar.objects.create(classroom=classroom, date=datetime.date(2026, 1, 5),
+                                                    start_time=datetime.time(10))
+        return calendar, [student.id for student in roster]
+
+    def test_constant_queries(self):
+        for students in (10, 200):
+            with self.subTest(students=students):
+                calendar, ids = self.session(students)
+                with self.assertNumQueries(1):
+                    load_attendance(calendar)
+                # everyone present: savepoint, locked read, attendance insert, summary insert and
+                # update, session update, release
+                with self.assertNumQueries(7):
+                    apply_attendance(calendar, {student_id: True for student_id in ids})
+                # the first half absent: one delete and a summary decrement instead of the inserts
+                marks = {student_id: i >= students // 2 for i, student_id in enumerate(ids)}
+                with self.assertNumQueries(6):
+                    self.assertEqual(apply_attendance(calendar, marks), (0, 0, students // 2))
+                with self.assertNumQueries(1):
+                    statuses = load_attendance(calendar)
+
+                present = students - students // 2
+                self.assertEqual(len(statuses), present)
+                calendar.refresh_from_db()
+                self.assertEqual(calendar.present_count, present)
+                self.assertEqual(AttendanceSummary.objects.filter(classroom_id=calendar.classroom_id, attended=1)
+                                 .count(), present)
+
+
+class AttendanceReportTests(TestCase):
+    """
+    Only sessions whose attendance was taken count as held; a past session nobody
+    marked does not count against the students.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        lecturer = CustomUser.objects.create(email='lecturer@example.com', user_type='lecturer')
+        subject = Subject.objects.create(name='Subject', description='')
+        cls.faculty = Faculty.objects.create(name='Faculty')
+        cls.faculty.subjects.add(subject)
+        cls.classroom = Classroom.objects.create(subject=subject, lecturer=lecturer)
+        cls.students = make_users('student', 'student', 2)
+        cls.classroom.students.add(*cls.students)
+        cls.classroom.refresh_from_db()
+        first, second, _ = ClassroomCalendar.objects.bulk_create([
+            ClassroomCalendar(classroom=cls.classroom, date=datetime.date(2026, 1, 5 + i), start_time=datetime.time(10))
+            for i in range(3)
+        ])
+        apply_attendance(first, {cls.students[0].id: True, cls.students[1].id: True})
+        apply_attendance(second, {cls.students[0].id: True, cls.students[1].id: False})
+
+    def test_held_sessions(self):
+        self.assertEqual([session['present'] for session in session_rates(self.classroom)], [2, 1])
+        rates = {row['student'].id: (row['attended'], row['held'], row['at_risk'])
+                 for row in student_rates(self.classroom, threshold=0.75)}
+        self.assertEqual(rates, {self.students[0].id: (2, 2, False), self.students[1].id: (1, 2, True)})
+        [row] = faculty_report(self.faculty.id, threshold=0.75)
+        self.assertEqual((row['held'], row['attended'], row['at_risk'], row['rate']), (2, 3, 1, 0.75))
+        [week] = weekly_trend([self.classroom.id])
+        self.assertEqual((week['sessions'], week['present'], week['expected']), (2, 3, 4))
+
+
+@override_settings(ENFORCE_QUERY_BUDGETS=True)
+class ProfileQueryBudgetTests(TestCase):
+    """
+    profile_view stays within PROFILE_QUERY_BUDGET however many faculties, subjects
+    and classrooms the user has; going over it raises QueryBudgetExceeded.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lecturers = make_users('lecturer', 'lecturer', 5)
+        cls.student = CustomUser.objects.create(email='student@example.com', user_type='student',
+                                                first_name='Student', last_name='One')
+        faculties = Faculty.objects.bulk_create([Faculty(name=f'Faculty {i}') for i in range(5)])
+        subjects = Subject.objects.bulk_create([Subject(name=f'Subject {i}', description='') for i in range(20)])
+        faculties[0].subjects.add(*subjects)
+        for i, faculty in enumerate(faculties[1:]):
+            faculty.subjects.add(*subjects[i * 4:(i + 1) * 4])
+        cls.classrooms = Classroom.objects.bulk_create([
+            Classroom(subject=subject, lecturer=cls.lecturers[i % len(cls.lecturers)])
+            for i, subject in enumerate(subjects * 3)
+        ])
+        StudentFaculty.objects.bulk_create([
+            StudentFaculty(student=cls.student, faculty=faculty, status='active' if i == 0 else 'inactive')
+            for i, faculty in enumerate(faculties)
+        ])
+        for classroom in cls.classrooms[:30]:
+            classroom.students.add(cls.student)
+
+    def test_student_profile(self):
+        self.client.force_login(self.student)
+        response = self.client.get(reverse('faculty:profile'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['enrolled_classrooms']), 30)
+        self.assertEqual(len(response.context['subjects']), 20)
+        # a second render is served from the catalog cache
+        self.assertEqual(self.client.get(reverse('faculty:profile')).status_code, 200)
+
+    def test_lecturer_profile(self):
+        self.client.force_login(self.lecturers[0])
+        response = self.client.get(reverse('faculty:profile'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['classrooms']), 12)
+
+    async def test_async_profiles(self):
+        # the ASGI twins are held to the same budget
+        for user in (self.student, self.lecturers[0]):
+            response = await async_views.profile_view(async_get(reverse('faculty:profile'), user))
+            self.assertEqual(response.status_code, 200)
+
+
+@override_settings(ENFORCE_QUERY_BUDGETS=True)
+class HomeworkListQueryBudgetTests(TestCase):
+    """
+    homework_list stays within HOMEWORK_LIST_QUERY_BUDGET on every page, in HTML and
+    JSON, with submitted and pending homework across many classrooms.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        lecturer = CustomUser.objects.create(email='lecturer@example.com', user_type='lecturer')
+        cls.student = CustomUser.objects.create(email='student@example.com', user_type='student')
+        subjects = Subject.objects.bulk_create([Subject(name=f'Subject {i}', description='') for i in range(10)])
+        classrooms = Classroom.objects.bulk_create([Classroom(subject=subject, lecturer=lecturer)
+                                                    for subject in subjects])
+        for classroom in classrooms:
+            classroom.students.add(cls.student)
+        now = timezone.now()
+        homeworks = Homework.objects.bulk_create([
+            Homework(classroom=classrooms[i % len(classrooms)], title=f'Homework {i}', description='',
+                     due_date=now + datetime.timedelta(days=i - 10))
+            for i in range(60)
+        ])
+        StudentHomework.objects.bulk_create([
+            StudentHomework(student=cls.student, homework=homework, classroom=homework.classroom,
+                            homework_url='https://example.com/')
+            for homework in homeworks[::3]
+        ])
+
+    def test_pages(self):
+        self.client.force_login(self.student)
+        seen, cursor = 0, None
+        while True:
+            data = {'format': 'json', 'cursor': cursor} if cursor else {'format': 'json'}
+            page = self.client.get(reverse('faculty:homework_list'), data).json()
+            seen += len(page['results'])
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, 60)
+
+        response = self.client.get(reverse('faculty:homework_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['submitted_homeworks'])
+        self.assertTrue(response.context['unsubmitted_homeworks'])
+
+    async def test_async_pages(self):
+        response = await async_views.homework_list(async_get(reverse('faculty:homework_list'), self.student,
+                                                             format='json'))
+        self.assertEqual(response.status_code, 200)
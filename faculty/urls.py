@@ -1,7 +1,13 @@
+from django.conf import settings
 from django.urls import path, re_path
 from django.views.generic import RedirectView, TemplateView
 from faculty.views import profile_view, join_classroom, classroom_view, \
-    download_file, homework_view, homework_detail, homework_list, create_homework, attendance
+    download_file, homework_view, homework_detail, homework_list, create_homework, attendance, \
+    homework_submissions_view, submission_detail, metrics_view, attendance_report, \
+    faculty_attendance_report, search_view
+
+if settings.ASYNC_VIEWS:
+    from faculty.async_views import profile_view, classroom_view, homework_view, homework_list
 
 app_name = 'faculty'
 
@@ -15,6 +21,15 @@ urlpatterns = [
     path('classroom/<int:classroom_id>/homework/', homework_view, name='homeworks'),
     path('classroom/<int:classroom_id>/homework/<int:homework_id>/', homework_detail, name='homework_detail'),
     path('classroom/<int:classroom_id>/homework/<int:homework_id>/submit/', homework_detail, name='homework_submission'),
+    path('classroom/<int:classroom_id>/homework/<int:homework_id>/submissions/', homework_submissions_view,
+         name='homework_submissions'),
+    path('classroom/<int:classroom_id>/homework/<int:homework_id>/submissions/<int:submission_id>/',
+         submission_detail, name='submission_detail'),
+    path('homeworks/', homework_list, name='homework_list'),
     path('classroom/<int:classroom_id>/attendance/<int:attendance_id>/', attendance, name='attendance'),
+    path('classroom/<int:classroom_id>/attendance/report/', attendance_report, name='attendance_report'),
+    path('faculty/<int:faculty_id>/attendance/report/', faculty_attendance_report, name='faculty_attendance_report'),
+    path('search/', search_view, name='search'),
+    path('metrics/', metrics_view, name='metrics'),
     re_path(r'^.*$', RedirectView.as_view(pattern_name='faculty:home')),
 ]
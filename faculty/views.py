@@ -1,58 +1,52 @@
+import csv
+import json
+import logging
+import os
+import secrets
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
-from faculty.models import StudentFaculty, Classroom, StudentSubject, Homework, StudentHomework
+from faculty.models import Classroom, StudentSubject, Homework, StudentHomework, Faculty, \
+    ClassroomCalendar
 from faculty.forms import StudentProfileForm, ClassroomCreationForm, HomeworkForm, \
-    HomeworkSubmissionForm, ClassroomCalendarForm, StudentAttendanceForm, ClassroomAttendance, ClassroomCalendar
+    HomeworkSubmissionForm, ClassroomCalendarForm, StudentAttendanceForm
 from django.conf import settings
 from django.contrib import messages
-from django.http import HttpResponse
+from django.http import HttpResponse, Http404, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.contrib.auth import authenticate, login, logout
+from faculty.decorators import query_budget
+from faculty.enrollment import enroll, FULL, ALREADY_JOINED
+from faculty.downloads import serve_file
+from faculty.scheduling import find_enrollment_conflicts
+from faculty.dashboard import homework_dashboard, InvalidCursor, homework_submissions, iter_submissions
+from faculty.profile import student_profile, lecturer_profile
+from faculty.metrics import registry
+from faculty.analytics import session_rates, student_rates, weekly_trend, faculty_report
+from faculty.jobs import enqueue
+from faculty.search import KINDS, search
+from faculty.similarity import similar_submissions
+
+logger = logging.getLogger(__name__)
 
 @login_required
+@query_budget(settings.PROFILE_QUERY_BUDGET)
 def profile_view(request):
     user = request.user
 
     if user.is_student():
-        try:
-            student_faculties = StudentFaculty.objects.filter(student=user)
-        except StudentFaculty.DoesNotExist:
-            student_faculties = None
-
-        if student_faculties:
-            student_faculty = [student for student in student_faculties if student.status == 'active']
-            if len(student_faculty):
-                student_faculty = student_faculty[0]
-        else:
-            student_faculty = None
-
         form = StudentProfileForm(request.POST or None)
-        print(student_faculties)
-        print(student_faculty)
         if request.method == 'POST' and form.is_valid():
             obj = form.save(commit=False)
             obj.student = request.user
             obj.save()
             return redirect('faculty:profile')
 
-        subjects = []
-        if student_faculty and student_faculty.faculty:
-            subjects = student_faculty.faculty.subjects.all()
-
-        classrooms = Classroom.objects.filter(subject__in=subjects, is_full=False).exclude(students=user)
-
-        enrolled_classrooms = Classroom.objects.filter(students=user)
-        if settings.DEBUG: print(list(enrolled_classrooms))
-
         context = {
             'user': user,
             'form': form,
-            'subjects': subjects,
-            'classrooms': classrooms,
-            'faculty': student_faculty,
-            'faculties': student_faculties,
-            'enrolled_classrooms': enrolled_classrooms,
             'max_classroom': settings.MAX_STUDENT_CLASSROOM,
             'is_open_to_choose': settings.IS_OPEN_TO_CHOOSE,
+            **student_profile(user),
         }
         return render(request, 'faculty/student_profile.html', context)
 
@@ -63,15 +57,15 @@ def profile_view(request):
             classroom = classroom_creation_form.save(commit=False)
             classroom.lecturer = user
             classroom.save()
+            if classroom.syllabus:
+                enqueue('faculty.process_syllabus', classroom_id=classroom.id)
             return redirect('faculty:profile')
 
-        classrooms = Classroom.objects.filter(lecturer=user)
-
         context = {
             'user': user,
             'classroom_creation_form': classroom_creation_form,
-            'classrooms': classrooms,
             'debug_mode': debug_mode,
+            **lecturer_profile(user),
         }
         return render(request, 'faculty/lecturer_profile.html', context)
 
@@ -79,7 +73,7 @@ def profile_view(request):
 @login_required
 def classroom_view(request, classroom_id):
     user = request.user
-    classroom = get_object_or_404(Classroom, id=classroom_id)
+    classroom = get_object_or_404(Classroom.objects.select_related('subject', 'lecturer'), id=classroom_id)
     calendar_form = ClassroomCalendarForm(classroom=classroom)
     debug = settings.DEBUG
     calendar = classroom.calendar.all()
@@ -100,13 +94,11 @@ def classroom_view(request, classroom_id):
 
         if request.method == 'POST':
             calendar_form = ClassroomCalendarForm(classroom, request.POST)
-            if settings.DEBUG: print(calendar_form.is_valid())
             if calendar_form.is_valid():
                 calendar_form.save(classroom)
                 return redirect('faculty:classroom_view', classroom_id=classroom.id)
-            else:
-                if settings.DEBUG:
-                    print(calendar_form.errors)
+            logger.debug('calendar form invalid classroom=%s errors=%s', classroom.id,
+                         calendar_form.errors.get_json_data())
 
         enrolled_students = classroom.students.all()
         homework_form = HomeworkForm()
@@ -131,33 +123,37 @@ def join_classroom(request, classroom_id):
     classroom = get_object_or_404(Classroom, pk=classroom_id)
 
     if user.is_student():
-        if classroom.is_full:
+        conflicts = find_enrollment_conflicts(user.id, classroom.id)
+        if conflicts:
+            session, existing = conflicts[0]
+            messages.error(request, f'This classroom clashes with your timetable: {session.date} '
+                                    f'{session.start_time} overlaps with {existing}.')
+            return redirect('faculty:profile')
+        try:
+            result = enroll(classroom.id, user)
+        except Classroom.DoesNotExist:
+            # deleted since it was looked up
+            raise Http404('No Classroom matches the given query.')
+        logger.debug('join classroom=%s student=%s result=%s', classroom.id, user.id, result)
+        if result == FULL:
             # Classroom is full, display an error message
             messages.error(request, 'The classroom is full. You cannot join.')
-        elif Classroom.objects.filter(students=user, id=classroom.id).exists():
+        elif result == ALREADY_JOINED:
             # Student has already joined this classroom
             messages.error(request, 'You have already joined this classroom.')
         else:
-            # Student can join the classroom
-            student_subject = classroom.students.add(user)
-            if settings.DEBUG: print('added')
-            # If the classroom is now full, mark it as full
-            if classroom.students.count() >= classroom.max_students:
-                classroom.is_full = True
-                classroom.save()
-
             messages.success(request, 'You have successfully joined the classroom.')
 
     return redirect('faculty:profile')
 
 
 def download_file(request, request_id):
-    file = get_object_or_404(Classroom, pk=request_id)
+    file = get_object_or_404(Classroom.objects.only('id', 'syllabus'), pk=request_id)
+    if not file.syllabus:
+        raise Http404('No syllabus uploaded')
     file_path = file.syllabus.path
-    with open(file_path, 'rb') as f:
-        response = HttpResponse(f.read(), content_type='application/force-download')
-        response['Content-Disposition'] = 'attachment; filename=' + 'syllabus'
-    return response
+    extension = os.path.splitext(file_path)[1]
+    return serve_file(request, file_path, 'syllabus' + extension)
 
 
 @login_required
@@ -229,7 +225,7 @@ def homework_detail(request, classroom_id, homework_id):
                                                          'classroom': classroom})
     # In case user is not lecturer nor student
     if request.user != lecturer:
-        redirect('faculty:profile')
+        return redirect('faculty:profile')
 
     homework_form = HomeworkForm(instance=homework)
 
@@ -239,8 +235,64 @@ def homework_detail(request, classroom_id, homework_id):
             homework_form.save()
 
     return render(request, 'faculty/homework.html', {'homework_form': homework_form,
+                                                     'homework': homework,
                                                      'classroom': classroom})
-    # see submitted hw-s
+
+
+def _submission_row(submission):
+    return {
+        'id': submission.id,
+        'student': {'id': submission.student.id, 'name': str(submission.student), 'email': submission.student.email},
+        'homework_url': submission.homework_url,
+    }
+
+
+@login_required
+def homework_submissions_view(request, classroom_id, homework_id):
+    homework = get_object_or_404(Homework.objects.select_related('classroom'), pk=homework_id,
+                                 classroom_id=classroom_id)
+    if request.user.id != homework.classroom.lecturer_id:
+        messages.error(request, 'You are not the lecturer for this classroom.')
+        return redirect('faculty:profile')
+
+    if request.GET.get('format') == 'jsonl':
+        rows = (json.dumps(_submission_row(submission)) + '\n' for submission in iter_submissions(homework))
+        return StreamingHttpResponse(rows, content_type='application/x-ndjson')
+
+    try:
+        after_id = int(request.GET.get('after', 0))
+    except ValueError:
+        after_id = 0
+    submissions, next_after_id = homework_submissions(homework, after_id, settings.SUBMISSIONS_PAGE_SIZE)
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'results': [_submission_row(submission) for submission in submissions],
+                             'next_after': next_after_id})
+
+    return render(request, 'faculty/submissions.html', {'homework': homework,
+                                                        'classroom': homework.classroom,
+                                                        'submissions': submissions,
+                                                        'next_after': next_after_id})
+
+
+@login_required
+def submission_detail(request, classroom_id, homework_id, submission_id):
+    submission = get_object_or_404(StudentHomework.objects.select_related('student', 'homework__classroom'),
+                                   pk=submission_id, homework_id=homework_id, homework__classroom_id=classroom_id)
+    if request.user.id != submission.homework.classroom.lecturer_id:
+        messages.error(request, 'You are not the lecturer for this classroom.')
+        return redirect('faculty:profile')
+
+    # near-duplicates among all submissions for the subject, from any classroom
+    scores = dict(similar_submissions(submission.id, subject_id=submission.homework.classroom.subject_id))
+    similar = StudentHomework.objects.select_related('student', 'homework__classroom').filter(pk__in=scores)
+    similar = sorted(({'submission': other, 'similarity': scores[other.id],
+                       'own_classroom': other.homework.classroom.lecturer_id == request.user.id}
+                      for other in similar), key=lambda row: -row['similarity'])
+    return render(request, 'faculty/submission_detail.html', {'submission': submission,
+                                                              'homework': submission.homework,
+                                                              'classroom': submission.homework.classroom,
+                                                              'similar': similar})
 
 
 @login_required
@@ -257,19 +309,43 @@ def create_homework(request):
     return render(request, 'faculty/create_homework.html', {'form': form})
 
 
+def dashboard_row(homework):
+    return {
+        'id': homework.id,
+        'title': homework.title,
+        'due_date': homework.due_date,
+        'due_bucket': homework.due_bucket,
+        'submitted': homework.submitted,
+        'submission_id': homework.submission_id,
+        'classroom': {
+            'id': homework.classroom.id,
+            'subject': homework.classroom.subject.name,
+            'lecturer': str(homework.classroom.lecturer),
+        },
+    }
+
+
 @login_required
+@query_budget(settings.HOMEWORK_LIST_QUERY_BUDGET)
 def homework_list(request):
-    classrooms = Classroom.objects.filter(students=request.user)
-    homeworks = Homework.objects.filter(classroom__in=classrooms)
-    submitted_homeworks = StudentHomework.objects.filter(student=request.user)
-    unsubmitted_homeworks = homeworks.exclude(id__in=submitted_homeworks.values('homework_id'))
-    print([unsubmitted_homeworks])
+    if not request.user.is_student():
+        return redirect('faculty:profile')
 
-    if request.user.is_student():
-        if request.method == 'GET':
-            return render(request, 'faculty/all_homeworks.html', {'classrooms': classrooms,
-                                                'submitted_homeworks': submitted_homeworks,
-                                                'unsubmitted_homeworks': unsubmitted_homeworks})
+    try:
+        homeworks, next_cursor = homework_dashboard(request.user, cursor=request.GET.get('cursor'),
+                                                    page_size=settings.HOMEWORK_PAGE_SIZE)
+    except InvalidCursor:
+        return redirect('faculty:homework_list')
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'results': [dashboard_row(homework) for homework in homeworks],
+                             'next_cursor': next_cursor})
+
+    return render(request, 'faculty/all_homeworks.html', {
+        'submitted_homeworks': [homework for homework in homeworks if homework.submitted],
+        'unsubmitted_homeworks': [homework for homework in homeworks if not homework.submitted],
+        'next_cursor': next_cursor,
+    })
 
 
 '''
@@ -308,3 +384,101 @@ def attendance(request, classroom_id, attendance_id):
     return render(request, 'faculty/attendance.html', {'attendance_form': attendance_form, 'title': 'attendance'})
 
 
+@login_required
+def attendance_report(request, classroom_id):
+    classroom = get_object_or_404(Classroom.objects.select_related('subject'), id=classroom_id)
+    if classroom.lecturer_id != request.user.id:
+        messages.error(request, 'You are not the lecturer for this classroom.')
+        return redirect('faculty:profile')
+
+    students = student_rates(classroom)
+    if request.GET.get('format') == 'csv':
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="attendance-{classroom.id}.csv"'
+        writer = csv.writer(response)
+        writer.writerow(['email', 'first_name', 'last_name', 'attended', 'held', 'rate', 'at_risk'])
+        writer.writerows([row['student'].email, row['student'].first_name, row['student'].last_name,
+                          row['attended'], row['held'], row['rate'], row['at_risk']] for row in students)
+        return response
+
+    return render(request, 'faculty/attendance_report.html', {
+        'classroom': classroom,
+        'sessions': session_rates(classroom),
+        'students': students,
+        'trend': weekly_trend([classroom.id]),
+        'threshold': settings.ATTENDANCE_AT_RISK_THRESHOLD,
+    })
+
+
+@login_required
+def faculty_attendance_report(request, faculty_id):
+    if not request.user.is_staff:
+        return HttpResponse(status=403)
+    faculty = get_object_or_404(Faculty, id=faculty_id)
+    return JsonResponse({
+        'faculty': faculty.name,
+        'threshold': settings.ATTENDANCE_AT_RISK_THRESHOLD,
+        'classrooms': faculty_report(faculty.id),
+        'trend': weekly_trend(Classroom.objects.filter(subject__faculty=faculty)),
+    })
+
+
+def _result_url(user, result):
+    if result['kind'] == 'homework':
+        return reverse('faculty:homework_detail', args=[result['classroom_id'], result['object_id']])
+    if result['kind'] == 'submission':
+        if user.is_lecturer():
+            return reverse('faculty:submission_detail',
+                           args=[result['classroom_id'], result['parent_id'], result['object_id']])
+        return reverse('faculty:homework_detail', args=[result['classroom_id'], result['parent_id']])
+    return None
+
+
+@login_required
+def search_view(request):
+    """
+    Full-text search over subjects, homework and submissions (faculty.search). Staff
+    see everything, lecturers their classrooms' homework and submissions, students
+    their classrooms' homework and their own submissions. ?kind= and ?subject= narrow
+    it down, ?format=json returns the results as JSON.
+    """
+    user = request.user
+    text = request.GET.get('q', '').strip()
+    kind = request.GET.get('kind')
+    subject = request.GET.get('subject', '')
+    classroom_ids = owner_id = None
+    if not user.is_staff:
+        if user.is_lecturer():
+            classroom_ids = list(Classroom.objects.filter(lecturer=user).values_list('id', flat=True))
+        else:
+            classroom_ids = list(user.classrooms.values_list('id', flat=True))
+            owner_id = user.id
+
+    results = []
+    if text:
+        results = search(text, kinds=[kind] if kind in KINDS else None, classroom_ids=classroom_ids,
+                         owner_id=owner_id, subject_id=int(subject) if subject.isdigit() else None,
+                         limit=settings.SEARCH_RESULTS)
+        for result in results:
+            result['url'] = _result_url(user, result)
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'query': text, 'results': results})
+    return render(request, 'faculty/search.html', {'query': text, 'kind': kind, 'kinds': list(KINDS),
+                                                   'results': results})
+
+
+def metrics_view(request):
+    """
+    Request metrics and event counters in Prometheus text format, or as JSON with
+    ?format=json. Open to staff and to requests carrying settings.METRICS_TOKEN as a
+    bearer token.
+    """
+    token = settings.METRICS_TOKEN
+    bearer = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not (request.user.is_staff or (token and secrets.compare_digest(bearer, token))):
+        return HttpResponse(status=403)
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'views': registry.snapshot(), 'counters': registry.counter_snapshot(),
+                             'collected': registry.collected()})
+    return HttpResponse(registry.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.contrib.auth.signals import user_logged_in
 
 
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
+
+    def ready(self):
+        from users.signals import update_last_login
+        user_logged_in.disconnect(dispatch_uid='update_last_login')
+        user_logged_in.connect(update_last_login, dispatch_uid='users.update_last_login')
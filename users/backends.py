@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+def user_cache_key(user_id):
+    return f'user:{user_id}'
+
+
+def invalidate_user(user_id):
+    caches[settings.USER_CACHE_ALIAS].delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose get_user(), run by AuthenticationMiddleware on every
+    authenticated request, reads the CustomUser row from the USER_CACHE_ALIAS cache.
+    Entries are dropped when the user is saved or deleted (users.signals) and expire
+    after USER_CACHE_TIMEOUT, which bounds staleness on other processes when the
+    cache is per-process.
+    """
+
+    def get_user(self, user_id):
+        cache = caches[settings.USER_CACHE_ALIAS]
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = get_user_model()._default_manager.get(pk=user_id)
+            except get_user_model().DoesNotExist:
+                return None
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
@@ -1,12 +1,12 @@
 from django.db import models
 
 
-class UserTypeChoices(models.IntegerChoices):
-    STUDENT = 1, "Student"
-    LECTURER = 2, "Lecturer"
-    ADMIN = 3, "Admin"
+class UserTypeChoices(models.TextChoices):
+    STUDENT = 'student', "Student"
+    LECTURER = 'lecturer', "Lecturer"
+    ADMIN = 'admin', "Admin"
 
 
-class UserTypeChoicesForm(models.IntegerChoices):
-    STUDENT = 1, "Student"
-    LECTURER = 2, "Lecturer"
+class UserTypeChoicesForm(models.TextChoices):
+    STUDENT = 'student', "Student"
+    LECTURER = 'lecturer', "Lecturer"
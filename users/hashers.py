@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher
+
+# Parameters come from settings.PASSWORD_HASHER_PARAMS. Changing them makes
+# must_update() true for existing hashes, so users are rehashed on their next login.
+
+
+def _params(name):
+    return settings.PASSWORD_HASHER_PARAMS.get(name, {})
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = _params('pbkdf2').get('iterations', PBKDF2PasswordHasher.iterations)
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    work_factor = _params('scrypt').get('work_factor', ScryptPasswordHasher.work_factor)
+    block_size = _params('scrypt').get('block_size', ScryptPasswordHasher.block_size)
+    parallelism = _params('scrypt').get('parallelism', ScryptPasswordHasher.parallelism)
+    maxmem = _params('scrypt').get('maxmem', ScryptPasswordHasher.maxmem)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    time_cost = _params('argon2').get('time_cost', Argon2PasswordHasher.time_cost)
+    memory_cost = _params('argon2').get('memory_cost', Argon2PasswordHasher.memory_cost)
+    parallelism = _params('argon2').get('parallelism', Argon2PasswordHasher.parallelism)
@@ -0,0 +1,37 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+
+
+def _init_worker(settings_module):
+    # spawned workers (non-fork platforms) start without Django configured
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def password_hasher_pool(workers=None):
+    """
+    Process pool for hash_passwords(); hashing is CPU bound and holds the GIL, so
+    threads would not help.
+    """
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                               initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'djangoProject1.settings'),))
+
+
+def hash_passwords(passwords, pool=None):
+    """
+    Hash a list of raw passwords, in order. Empty passwords become unusable ones.
+    Runs inline when no pool is given.
+    """
+    hashed = [None if password else make_password(None) for password in passwords]
+    to_hash = [(i, password) for i, password in enumerate(passwords) if password]
+    if pool is None:
+        results = map(make_password, (password for _, password in to_hash))
+    else:
+        chunksize = max(1, len(to_hash) // ((os.cpu_count() or 1) * 4))
+        results = pool.map(make_password, (password for _, password in to_hash), chunksize=chunksize)
+    for (i, _), encoded in zip(to_hash, results):
+        hashed[i] = encoded
+    return hashed
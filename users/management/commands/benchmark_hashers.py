@@ -0,0 +1,66 @@
+import json
+import os
+import time
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from users.hashing import hash_passwords, password_hasher_pool
+
+
+def _encode(hasher_path, password):
+    hasher = import_string(hasher_path)()
+    return hasher.encode(password, hasher.salt())
+
+
+class Command(BaseCommand):
+    help = "Compare hashes per second per core for the configured password hashers, inline and in a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=20, help="Passwords hashed per measurement")
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--json', action='store_true', help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        count = options['count']
+        workers = options['workers']
+        passwords = [f'benchmark-password-{i}' for i in range(count)]
+        results = []
+
+        for hasher in get_hashers():
+            path = f'{type(hasher).__module__}.{type(hasher).__qualname__}'
+            try:
+                hasher.encode('probe', hasher.salt())
+            except ValueError as e:
+                # optional library (argon2-cffi, bcrypt) not installed
+                self.stderr.write(f'skipping {path}: {e}')
+                continue
+
+            start = time.perf_counter()
+            for password in passwords:
+                hasher.encode(password, hasher.salt())
+            inline = count / (time.perf_counter() - start)
+
+            with password_hasher_pool(workers) as pool:
+                hash_passwords(passwords[:workers], pool)  # warm the workers up
+                start = time.perf_counter()
+                list(pool.map(_encode, [path] * count, passwords))
+                pooled = count / (time.perf_counter() - start)
+
+            results.append({
+                'hasher': path,
+                'algorithm': hasher.algorithm,
+                'hashes_per_second_inline': round(inline, 2),
+                'hashes_per_second_pool': round(pooled, 2),
+                'hashes_per_second_per_core': round(pooled / workers, 2),
+                'workers': workers,
+            })
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"{'hasher':<50} {'inline/s':>10} {'pool/s':>10} {'per core/s':>11}")
+        for row in results:
+            self.stdout.write(f"{row['hasher']:<50} {row['hashes_per_second_inline']:>10} "
+                              f"{row['hashes_per_second_pool']:>10} {row['hashes_per_second_per_core']:>11}")
@@ -1,5 +1,8 @@
+from itertools import islice
+
 from django.contrib.auth.base_user import BaseUserManager
 from django.utils.translation import gettext_lazy as _
+from users.hashing import hash_passwords, password_hasher_pool
 
 
 class CustomUserManager(BaseUserManager):
@@ -20,6 +23,33 @@ class CustomUserManager(BaseUserManager):
         user.save()
         return user
 
+    def create_users_bulk(self, users, batch_size=1000, pool=None, ignore_conflicts=False):
+        """
+        Create many users at once. `users` is an iterable of dicts with an email, a
+        password and any extra fields. Passwords are hashed across a process pool
+        (pass `pool` to reuse one) and rows are inserted with bulk_create per batch.
+        """
+        own_pool = pool is None
+        if own_pool:
+            pool = password_hasher_pool()
+        created = []
+        try:
+            iterator = iter(users)
+            while batch := list(islice(iterator, batch_size)):
+                passwords = hash_passwords([data.get('password') for data in batch], pool)
+                objs = []
+                for data, password in zip(batch, passwords):
+                    extra_fields = {key: value for key, value in data.items() if key not in ('email', 'password')}
+                    if not data.get('email'):
+                        raise ValueError(_("The Email must be set"))
+                    objs.append(self.model(email=self.normalize_email(data['email']), password=password,
+                                           **extra_fields))
+                created.extend(self.bulk_create(objs, ignore_conflicts=ignore_conflicts))
+        finally:
+            if own_pool:
+                pool.shutdown()
+        return created
+
     def create_superuser(self, email, password, **extra_fields):
         """
         Create and save a SuperUser with the given email and password.
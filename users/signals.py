@@ -0,0 +1,27 @@
+import datetime
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from users.backends import invalidate_user
+from users.models import CustomUser
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+def update_last_login(sender, user, **kwargs):
+    """
+    user_logged_in handler replacing Django's: last_login is written at most once per
+    LAST_LOGIN_UPDATE_INTERVAL seconds per user, with a queryset update that leaves the
+    cached user alone.
+    """
+    now = timezone.now()
+    interval = datetime.timedelta(seconds=settings.LAST_LOGIN_UPDATE_INTERVAL)
+    if user.last_login is None or now - user.last_login >= interval:
+        user.last_login = now
+        CustomUser.objects.filter(pk=user.pk).update(last_login=now)
@@ -1,3 +1,137 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from users.backends import CachedModelBackend
+from users.models import CustomUser
+from users.throttling import SlidingWindowCounter, TokenBucket
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class CachedAuthTests(TestCase):
+    """
+    Authenticated requests read the session and the user from the cache, saves
+    invalidate the cached user and last_login is written at most once per interval.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='staff@example.com', password='secret', user_type='lecturer',
+                                                  is_staff=True)
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_get_user(self):
+        backend = CachedModelBackend()
+        with self.assertNumQueries(1):
+            self.assertEqual(backend.get_user(self.user.pk), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(backend.get_user(self.user.pk).first_name, '')
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(backend.get_user(self.user.pk).first_name, 'Renamed')
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(backend.get_user(self.user.pk))
+        self.assertIsNone(backend.get_user(self.user.pk + 1))
+
+    def test_request(self):
+        self.client.post(reverse('users:login'), {'email': 'staff@example.com', 'password': 'secret'})
+        self.client.get(reverse('faculty:metrics'), {'format': 'json'})
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse('faculty:metrics'), {'format': 'json'}).status_code, 200)
+        tables = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('django_session', tables)
+        self.assertNotIn('users_customuser', tables)
+
+    def test_last_login(self):
+        def login():
+            self.client.post(reverse('users:login'), {'email': 'staff@example.com', 'password': 'secret'})
+            return CustomUser.objects.get(pk=self.user.pk).last_login
+
+        first = login()
+        self.assertIsNotNone(first)
+        self.assertEqual(login(), first)
+        CustomUser.objects.filter(pk=self.user.pk).update(last_login=first - datetime.timedelta(hours=2))
+        self.assertGreaterEqual(login(), first)
+
+
+class ThrottleTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_token_bucket(self):
+        bucket = TokenBucket('test', 3, 0.5, 'default')
+        self.assertEqual([bucket.consume('key', now=100) for _ in range(4)], [0, 0, 0, 2])
+        self.assertEqual(bucket.consume('other', now=100), 0)
+        self.assertEqual(bucket.consume('key', now=101), 1)
+        self.assertEqual(bucket.consume('key', now=102), 0)
+
+    def test_sliding_window(self):
+        counter = SlidingWindowCounter('test', 3, 60, 'default')
+        for now in (125, 130, 140):
+            self.assertEqual(counter.retry_after('key', now=now), 0)
+            counter.hit('key', now=now)
+        # three hits in the window [120, 180): blocked until that window starts to fade
+        self.assertEqual(counter.retry_after('key', now=140), 41)
+        self.assertGreater(counter.retry_after('key', now=180), 0)
+        self.assertEqual(counter.retry_after('key', now=181), 0)
+        counter.clear('key', now=140)
+        self.assertEqual(counter.retry_after('key', now=140), 0)
+
+
+@override_settings(LOGIN_THROTTLE=True, LOGIN_EMAIL_FAILURES=3, LOGIN_IP_BURST=5, LOGIN_IP_PER_MINUTE=1,
+                   PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginThrottleTests(TestCase):
+    """
+    Failed logins are limited per email and all attempts per client IP; a throttled
+    attempt gets a 429 with Retry-After before the password is checked.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='student@example.com', password='correct horse',
+                                                  user_type='student')
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def login(self, password, email='student@example.com', ip='10.0.0.1'):
+        return self.client.post(reverse('users:login'), {'email': email, 'password': password}, REMOTE_ADDR=ip)
+
+    def test_email_failures(self):
+        for _ in range(3):
+            self.assertEqual(self.login('wrong', ip='10.0.0.1').status_code, 200)
+        # the right password from another address is turned away too
+        response = self.login('correct horse', ip='10.0.0.2')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertNotIn('_auth_user_id', self.client.session)
+        # other accounts are unaffected
+        self.assertEqual(self.login('wrong', email='other@example.com', ip='10.0.0.2').status_code, 200)
+
+    def test_success_clears_failures(self):
+        for _ in range(2):
+            self.login('wrong')
+        self.assertRedirects(self.login('correct horse'), reverse('faculty:profile'), fetch_redirect_response=False)
+        self.client.logout()
+        for _ in range(2):
+            self.assertEqual(self.login('wrong').status_code, 200)
+
+    def test_ip_burst(self):
+        for i in range(5):
+            self.assertEqual(self.login('wrong', email=f'user{i}@example.com').status_code, 200)
+        response = self.login('wrong', email='user5@example.com')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn(int(response['Retry-After']), range(55, 61))
+        self.assertEqual(self.login('wrong', email='user5@example.com', ip='10.0.0.2').status_code, 200)
+
+    @override_settings(LOGIN_THROTTLE=False)
+    def test_disabled(self):
+        for _ in range(10):
+            self.assertEqual(self.login('wrong').status_code, 200)
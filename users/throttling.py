@@ -0,0 +1,136 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from faculty.metrics import registry
+
+ATTEMPTS_METRIC = 'lms_login_attempts_total'
+registry.describe(ATTEMPTS_METRIC, 'Login attempts, by whether they reached authenticate() or were throttled.')
+
+
+class TokenBucket:
+    """
+    `capacity` tokens per key, refilled at `rate` tokens per second. The state is one
+    (tokens, updated) pair per key in the cache, expiring once the bucket would be full
+    again. The read-modify-write is not atomic, so concurrent requests may overshoot the
+    limit by a few attempts.
+    """
+
+    def __init__(self, prefix, capacity, rate, cache_alias):
+        self.prefix = prefix
+        self.capacity = capacity
+        self.rate = rate
+        self.cache = caches[cache_alias]
+
+    def consume(self, key, now=None):
+        """
+        Take a token. Returns 0 when one was available, otherwise the seconds until
+        the next one is.
+        """
+        now = time.time() if now is None else now
+        cache_key = f'{self.prefix}:{key}'
+        tokens, updated = self.cache.get(cache_key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            return math.ceil((1 - tokens) / self.rate)
+        self.cache.set(cache_key, (tokens - 1, now), math.ceil(self.capacity / self.rate))
+        return 0
+
+
+class SlidingWindowCounter:
+    """
+    At most `limit` events per key in any `window` seconds, approximated from two fixed
+    windows: the count of the current one plus the previous one's weighted by how much
+    of it still overlaps the sliding window. Two integers per key whatever the traffic,
+    and cache.incr keeps the counts exact on memcached and redis.
+    """
+
+    def __init__(self, prefix, limit, window, cache_alias):
+        self.prefix = prefix
+        self.limit = limit
+        self.window = window
+        self.cache = caches[cache_alias]
+
+    def _keys(self, key, now):
+        index = int(now // self.window)
+        return f'{self.prefix}:{key}:{index}', f'{self.prefix}:{key}:{index - 1}'
+
+    def retry_after(self, key, now=None):
+        """
+        0 while the key is under the limit, otherwise the seconds until the weighted
+        count drops below it.
+        """
+        now = time.time() if now is None else now
+        current_key, previous_key = self._keys(key, now)
+        counts = self.cache.get_many([current_key, previous_key])
+        current, previous = counts.get(current_key, 0), counts.get(previous_key, 0)
+        elapsed = now % self.window
+        if current + previous * (1 - elapsed / self.window) < self.limit:
+            return 0
+        if current >= self.limit:
+            # the current window becomes the previous one and has to fade to the limit
+            return math.floor(self.window - elapsed + self.window * (1 - self.limit / current)) + 1
+        # the previous window's weight falls below (limit - current) / previous
+        return max(1, math.floor(self.window * (1 - (self.limit - current) / previous) - elapsed) + 1)
+
+    def hit(self, key, now=None):
+        current_key, _ = self._keys(key, time.time() if now is None else now)
+        self.cache.add(current_key, 0, 2 * self.window)
+        try:
+            self.cache.incr(current_key)
+        except ValueError:
+            # expired between add and incr
+            self.cache.set(current_key, 1, 2 * self.window)
+
+    def clear(self, key, now=None):
+        self.cache.delete_many(self._keys(key, time.time() if now is None else now))
+
+
+def _email_key(email):
+    return hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+
+def _client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _ip_bucket():
+    return TokenBucket('login-ip', settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE / 60,
+                       settings.LOGIN_THROTTLE_CACHE_ALIAS)
+
+
+def _email_failures():
+    return SlidingWindowCounter('login-email', settings.LOGIN_EMAIL_FAILURES, settings.LOGIN_EMAIL_WINDOW,
+                                settings.LOGIN_THROTTLE_CACHE_ALIAS)
+
+
+def check_login(request, email):
+    """
+    Called before authenticate(): returns the seconds the client should wait when the
+    attempt is throttled, per client IP (token bucket over all attempts) or per email
+    (sliding window over failed attempts), else 0.
+    """
+    if not settings.LOGIN_THROTTLE:
+        return 0
+    retry_after = _email_failures().retry_after(_email_key(email))
+    scope = 'email'
+    if not retry_after:
+        retry_after = _ip_bucket().consume(_client_ip(request))
+        scope = 'ip'
+    if retry_after:
+        registry.increment(ATTEMPTS_METRIC, result='throttled', scope=scope)
+    else:
+        registry.increment(ATTEMPTS_METRIC, result='processed')
+    return retry_after
+
+
+def login_failed(email):
+    if settings.LOGIN_THROTTLE:
+        _email_failures().hit(_email_key(email))
+
+
+def login_succeeded(email):
+    if settings.LOGIN_THROTTLE:
+        _email_failures().clear(_email_key(email))
@@ -2,6 +2,7 @@ from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
 from users.models import CustomUser
 from users.forms import CustomUserCreationForm, LoginForm
+from users.throttling import check_login, login_failed, login_succeeded
 from django.conf import settings
 from django.contrib import messages
 from django.http import HttpResponse
@@ -14,14 +15,13 @@ def register_view(request):
         # Create a form that has request.POST
         form = CustomUserCreationForm(request.POST)
         if form.is_valid():
+            # UserCreationForm.save() has already hashed password1
             user = form.save(commit=False)
-            # Set the user's password securely
             email = form.cleaned_data['email']
             password1 = form.cleaned_data['password1']
             password2 = form.cleaned_data['password2']
 
             if password1 == password2:
-                user.set_password(password1)
                 user.save()
 
                 messages.success(request, f'Your Account has been created {email} ! Proceed to log in')
@@ -43,12 +43,22 @@ def login_view(request):
         if form.is_valid():
             email = form.cleaned_data['email']
             password = form.cleaned_data['password']
+            # turned away before authenticate() spends a password hash on it
+            retry_after = check_login(request, email)
+            if retry_after:
+                form.add_error(field=None, error="Too many login attempts, try again later")
+                response = render(request, 'users/login.html', {'form': form}, status=429)
+                response['Retry-After'] = str(retry_after)
+                return response
+
             user = authenticate(request, email=email, password=password)
 
             if user:
+                login_succeeded(email)
                 login(request, user)
                 return redirect('faculty:profile')
             else:
+                login_failed(email)
                 form.add_error(field=None, error="Invalid username or password")
 
     return render(request, 'users/login.html', {'form': form})